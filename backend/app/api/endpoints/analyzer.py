@@ -1,8 +1,9 @@
 # app/api/endpoints/analyzer.py
-from fastapi import APIRouter, HTTPException
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query
 from app.models.metrics import MetricsResponse
 from app.models.financial import FinancialData
-from app.utils.ratios import calculate_financial_metrics
+from app.utils.ratios import calculate_financial_metrics, unknown_metrics
 from app.utils.logger import app_logger
 
 # Configure module-specific logger
@@ -12,7 +13,12 @@ router = APIRouter()
 
 
 @router.post("/metrics", response_model=MetricsResponse)
-async def get_metrics_data(data: FinancialData):
+async def get_metrics_data(
+    data: FinancialData,
+    fields: Optional[str] = Query(
+        None, description="Comma-separated metrics to calculate, e.g. gross_margin,net_margin"
+    ),
+):
     """
     Calculate financial metrics and prepare data in a format ready to be used with the /insights endpoint.
     
@@ -21,19 +27,28 @@ async def get_metrics_data(data: FinancialData):
     
     Args:
         data: The financial data from the uploaded profit and loss report.
+        fields: Comma-separated names of the metrics to calculate; all metrics when not given.
         
     Returns:
         MetricsResponse: Financial data with metrics, formatted for the /insights endpoint.
         
     Raises:
-        HTTPException: If there's an error calculating metrics or preparing the data.
+        HTTPException: If a requested metric is unknown, or there's an error calculating
+            metrics or preparing the data.
     """
+    selected = None
+    if fields is not None:
+        selected = [name.strip() for name in fields.split(",") if name.strip()]
+        unknown = unknown_metrics(selected)
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown metrics: {', '.join(unknown)}")
+
     try:
         # Get the original data as a dictionary
         financial_data = data.model_dump()
         
         # Calculate metrics
-        metrics = calculate_financial_metrics(financial_data)
+        metrics = calculate_financial_metrics(financial_data, selected)
         
         # Add metrics to the financial data
         financial_data["metrics"] = metrics
@@ -0,0 +1,140 @@
+"""
+Per-organization chart-of-accounts mapping endpoints.
+"""
+import asyncio
+from typing import Dict, Any, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Body
+from app.api.endpoints.auth import get_current_user
+from app.core.mappings import categorizer_cache, categorizer_for, mapping_store
+from app.models.mappings import (
+    CategorizationRequest,
+    CategorizationResponse,
+    CategoryMapping,
+    CategoryMappingUpdate,
+)
+from app.utils.categorization import categorize_accounts
+from app.utils.logger import app_logger
+
+# Configure module-specific logger
+logger = app_logger.getChild('mappings')
+
+router = APIRouter()
+
+
+@router.get("/{organization_id}", response_model=CategoryMapping)
+async def get_category_mappings(
+    organization_id: str,
+    user: Dict[str, Any] = Depends(get_current_user)
+):
+    """
+    Get the current category mappings of an organization.
+
+    Args:
+        organization_id: The organization ID.
+        user: The authenticated user data.
+
+    Returns:
+        CategoryMapping: The latest version of the mappings.
+    """
+    mapping = mapping_store.get(organization_id)
+    if mapping is None:
+        raise HTTPException(status_code=404, detail="The organization has no category mappings")
+    return mapping
+
+
+@router.put("/{organization_id}", response_model=CategoryMapping)
+async def update_category_mappings(
+    organization_id: str,
+    update: CategoryMappingUpdate = Body(...),
+    user: Dict[str, Any] = Depends(get_current_user)
+):
+    """
+    Store a new version of an organization's category mappings.
+
+    The new version replaces the previous one for every later upload of the
+    organization; earlier versions are kept.
+
+    Args:
+        organization_id: The organization ID.
+        update: The complete new mappings.
+        user: The authenticated user data.
+
+    Returns:
+        CategoryMapping: The stored mappings with their version number.
+    """
+    mapping = mapping_store.save(organization_id, update)
+    categorizer_cache.invalidate(organization_id)
+    return mapping
+
+
+@router.get("/{organization_id}/versions", response_model=List[int])
+async def list_category_mapping_versions(
+    organization_id: str,
+    user: Dict[str, Any] = Depends(get_current_user)
+):
+    """
+    List the stored versions of an organization's category mappings.
+
+    Args:
+        organization_id: The organization ID.
+        user: The authenticated user data.
+
+    Returns:
+        List[int]: Version numbers, oldest first.
+    """
+    return mapping_store.versions(organization_id)
+
+
+@router.get("/{organization_id}/versions/{version}", response_model=CategoryMapping)
+async def get_category_mappings_version(
+    organization_id: str,
+    version: int,
+    user: Dict[str, Any] = Depends(get_current_user)
+):
+    """
+    Get a stored version of an organization's category mappings.
+
+    Args:
+        organization_id: The organization ID.
+        version: The version number.
+        user: The authenticated user data.
+
+    Returns:
+        CategoryMapping: That version of the mappings.
+    """
+    mapping = mapping_store.get(organization_id, version)
+    if mapping is None:
+        raise HTTPException(status_code=404, detail="Category mappings version not found")
+    return mapping
+
+
+@router.post("/{organization_id}/categorize", response_model=CategorizationResponse)
+async def categorize_chart_of_accounts(
+    organization_id: str,
+    request: CategorizationRequest = Body(...),
+    version: Optional[int] = None,
+    user: Dict[str, Any] = Depends(get_current_user)
+):
+    """
+    Categorize a whole chart of accounts with an organization's mappings.
+
+    Args:
+        organization_id: The organization ID.
+        request: Columnar account names, codes and sections.
+        version: The mappings version to apply; the latest when not given.
+        user: The authenticated user data.
+
+    Returns:
+        CategorizationResponse: The category and matching rule of each account.
+    """
+    if version is None:
+        version = mapping_store.latest_version(organization_id)
+    elif version not in mapping_store.versions(organization_id):
+        raise HTTPException(status_code=404, detail="Category mappings version not found")
+
+    categorizer = categorizer_for(organization_id, version)
+    # Large charts take a while to scan, so keep the event loop free
+    result = await asyncio.to_thread(
+        categorize_accounts, request.names, request.codes, request.sections, categorizer
+    )
+    return {"organizationId": organization_id, "version": version, **result}
@@ -1,9 +1,10 @@
 """
 Report management endpoints for ProfitLens.
 """
-from typing import Dict, Any, List
-from fastapi import APIRouter, Depends, HTTPException, Body, UploadFile, File, Form
+from typing import Dict, Any, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Body, UploadFile, File, Form, Query
 from uuid import UUID
+import asyncio
 import json
 from app.services.database_service import (
     DatabaseService, 
@@ -12,6 +13,13 @@ from app.services.database_service import (
     TimeSeriesDataCreate
 )
 from app.api.endpoints.auth import get_current_user
+from app.core.aggregates import aggregate_store, category_totals
+from app.core.time_series import DEFAULT_ROLLING_WINDOW, compute_time_series_analytics, time_series_cache
+from app.models.time_series import MetricAggregates, TimeSeriesAnalytics
+from app.utils.logger import app_logger
+
+# Configure module-specific logger
+logger = app_logger.getChild('reports')
 
 
 router = APIRouter()
@@ -116,6 +124,14 @@ async def create_report(
     
     report_data = await DatabaseService.store_report_data(report_data_create)
     
+    # Fold the report's category totals into the organization's cumulative totals
+    try:
+        await asyncio.to_thread(
+            aggregate_store.apply_categories, str(organization_id), period, category_totals(processed_data)
+        )
+    except Exception as e:
+        logger.error(f"Updating category aggregates failed: {str(e)}")
+    
     # Extract key metrics for time series data
     if "metrics" in processed_data:
         time_series_data = []
@@ -201,3 +217,89 @@ async def get_time_series_data(
         List[Dict[str, Any]]: The time series data.
     """
     return await DatabaseService.get_time_series_data(str(organization_id), metric_name)
+
+
+@router.get("/time-series/{organization_id}/analytics", response_model=TimeSeriesAnalytics)
+async def get_time_series_analytics(
+    organization_id: UUID,
+    metrics: Optional[str] = Query(
+        None, description="Comma-separated metrics to return, e.g. gross_margin,net_margin"
+    ),
+    window: int = Query(DEFAULT_ROLLING_WINDOW, ge=1, le=60, description="Periods averaged by the rolling mean"),
+    user: Dict[str, Any] = Depends(get_current_user)
+):
+    """
+    Get growth rates, rolling means, CAGR and volatility of an organization's metrics.
+    
+    Periods are ordered by calendar date rather than by label. Results are
+    cached until new time series data is stored for the organization.
+    
+    Args:
+        organization_id: The organization ID.
+        metrics: Comma-separated names of the metrics to return; all metrics when not given.
+        window: Number of reported periods averaged by the rolling mean.
+        user: The authenticated user data.
+        
+    Returns:
+        TimeSeriesAnalytics: The analytics of each metric, aligned with the periods.
+    """
+    organization = str(organization_id)
+    result = time_series_cache.get(organization, window)
+    if result is None:
+        generation = time_series_cache.generation(organization)
+        rows = await DatabaseService.get_time_series_data(organization)
+        result = await asyncio.to_thread(compute_time_series_analytics, rows, window)
+        time_series_cache.set(organization, window, result, generation)
+    
+    selected = result["metrics"]
+    if metrics is not None:
+        names = [name.strip() for name in metrics.split(",") if name.strip()]
+        selected = {name: selected[name] for name in names if name in selected}
+    
+    return {**result, "organizationId": organization, "metrics": selected}
+
+
+async def seed_aggregates(organization_id: str) -> None:
+    """
+    Fold the history stored before aggregates were maintained into an organization's aggregates.
+    
+    Args:
+        organization_id: The organization ID.
+    """
+    rows = await DatabaseService.get_time_series_data(organization_id)
+    reports = await DatabaseService.get_reports(organization_id)
+    report_data = await DatabaseService.get_report_data_many([report["id"] for report in reports])
+    data_by_report = {item["report_id"]: item.get("data") or {} for item in report_data}
+    # Reports come newest first; a later report for a period replaces an earlier one
+    categories = [
+        (report["period"], category_totals(data_by_report[report["id"]]))
+        for report in reversed(reports)
+        if report["id"] in data_by_report
+    ]
+    await asyncio.to_thread(aggregate_store.seed, organization_id, rows, categories)
+
+
+@router.get("/time-series/{organization_id}/aggregates", response_model=MetricAggregates)
+async def get_time_series_aggregates(
+    organization_id: UUID,
+    user: Dict[str, Any] = Depends(get_current_user)
+):
+    """
+    Get the YTD totals, TTM windows and cumulative category totals of an organization.
+    
+    The aggregates are maintained as data is stored, so reading them does
+    not re-read the organization's history. History stored before they were
+    maintained is folded in on the organization's first request.
+    
+    Args:
+        organization_id: The organization ID.
+        user: The authenticated user data.
+        
+    Returns:
+        MetricAggregates: The organization's aggregates.
+    """
+    organization = str(organization_id)
+    # The store waits on SQLite locks, so it is kept off the event loop
+    if not await asyncio.to_thread(aggregate_store.is_seeded, organization):
+        await seed_aggregates(organization)
+    return await asyncio.to_thread(aggregate_store.get, organization)
@@ -1,10 +1,25 @@
 # app/api/endpoints/upload.py
-from fastapi import APIRouter, UploadFile, File, HTTPException
-import tempfile
+from fastapi import APIRouter, UploadFile, File, HTTPException, Request
+from fastapi.responses import StreamingResponse
+import asyncio
+import json
 import os
-from typing import Dict, Any
+import zipfile
+from datetime import datetime, timezone
+from typing import AsyncIterator, Callable, Dict, Any, List, Optional, Set
+from app.core.config import settings
+from app.core.engines import select_engine
 from app.core.analyzer import analyze_profit_loss
-from app.models.financial import FinancialData
+from app.core.balance_sheet import analyze_balance_sheet
+from app.core.cache import digest_key, result_cache
+from app.core.executor import AnalysisQueueFullError, AnalysisTimeoutError, analysis_executor
+from app.core.mappings import mapping_store
+from app.core.jobs import JOB_COMPLETED, JOB_FAILED, JOB_QUEUED, JOB_RUNNING, JOB_STAGES, JobProgress, job_store
+from app.core.uploads import ArchiveLimitError, UploadedWorkbook, extract_workbooks, receive_upload
+from app.core.sheets import analyze_sheets, consolidate_reports
+from app.core.validation import validation_rule_sets
+from app.models.financial import BalanceSheetData, FinancialData, MultiSheetFinancialData
+from app.models.jobs import UploadJob, UploadJobCreated
 from app.utils.logger import app_logger
 
 # Configure module-specific logger
@@ -12,6 +27,12 @@ logger = app_logger.getChild('upload')
 
 router = APIRouter()
 
+# Interval between job store polls while streaming job progress
+JOB_EVENTS_POLL_SECONDS = 0.25
+
+# Background upload jobs still running
+_job_tasks: Set[asyncio.Task] = set()
+
 
 def validate_financial_data(data: Dict[str, Any]) -> None:
     """
@@ -51,54 +72,575 @@ def validate_financial_data(data: Dict[str, Any]) -> None:
         raise ValueError(error_message)
 
 
+def upload_error(e: Exception) -> HTTPException:
+    """
+    Translate an analysis failure into an HTTP error with a user-friendly message.
+    
+    Args:
+        e: The exception raised while analyzing an upload.
+        
+    Returns:
+        The HTTPException to raise.
+    """
+    if isinstance(e, AnalysisQueueFullError):
+        return HTTPException(status_code=503, detail=str(e))
+    elif isinstance(e, AnalysisTimeoutError):
+        return HTTPException(
+            status_code=504,
+            detail="The file took too long to analyze. Please try again with a smaller report."
+        )
+    elif "Excel file validation failed" in str(e):
+        return HTTPException(
+            status_code=422,
+            detail="The uploaded file doesn't appear to be a valid profit and loss report. "
+                   "Please check the file and try again."
+        )
+    elif "Invalid profit and loss report" in str(e) or "Invalid balance sheet" in str(e):
+        return HTTPException(
+            status_code=422,
+            detail=str(e)
+        )
+    else:
+        return HTTPException(
+            status_code=500,
+            detail=f"An error occurred while processing the file: {str(e)}"
+        )
+
+
+def restamp_cached(result: Dict[str, Any], upload: UploadedWorkbook) -> Dict[str, Any]:
+    """
+    Give a cached analysis result the metadata of the upload it now answers.
+
+    Cached results are shared by every upload of the same workbook, so their
+    upload date and source name are those of the upload that was analyzed.
+
+    Args:
+        result: A copy of the cached result.
+        upload: The received workbook.
+
+    Returns:
+        The result, with its upload date and source updated in place.
+    """
+    result["metadata"].update(
+        uploadDate=datetime.now().strftime("%Y-%m-%d"),
+        source=os.path.basename(upload.name),
+    )
+    return result
+
+
+async def analyze_upload(
+    upload: UploadedWorkbook,
+    multi_period: bool = False,
+    progress: Optional[Callable[[str], None]] = None,
+    organization_id: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Analyze an uploaded profit and loss Excel file.
+    
+    In-memory uploads are parsed straight from their bytes; uploads spooled
+    to disk are parsed from their temporary file.
+    
+    Args:
+        upload: The received workbook.
+        multi_period: Also extract every period column into ``periodValues``.
+        progress: Called with the name of each analysis stage as it starts.
+        organization_id: Organization whose validation rules and category mappings apply.
+        
+    Returns:
+        The analysis result.
+        
+    Raises:
+        HTTPException: With a user-friendly message if the file cannot be analyzed.
+    """
+    filename = upload.filename
+    try:
+        # Re-uploads of the same workbook are answered from the result cache
+        # Results depend on the organization's current category mappings
+        mapping_version = mapping_store.latest_version(organization_id) if organization_id else None
+        cache_key = digest_key(
+            upload.digest,
+            multi_period=multi_period,
+            rules=validation_rule_sets.digest_for(organization_id),
+            # Mapping versions are numbered per organization
+            mappings=f"{organization_id}@{mapping_version}" if mapping_version else None,
+        )
+        cached = result_cache.get(cache_key)
+        if cached is not None:
+            logger.info(f"Returning cached analysis for {filename}")
+            return restamp_cached(cached, upload)
+        
+        # Analyze the profit and loss report in the worker pool
+        result = await analysis_executor.run(
+            analyze_profit_loss,
+            upload.name,
+            multi_period=multi_period,
+            progress=progress,
+            content=upload.content,
+            engine=select_engine(upload.name),
+            organization_id=organization_id,
+            mapping_version=mapping_version,
+        )
+        
+        # Validate the result before returning
+        try:
+            validate_financial_data(result)
+        except ValueError as ve:
+            logger.warning(f"Validation failed for uploaded file {filename}: {str(ve)}")
+            raise HTTPException(
+                status_code=422, 
+                detail=f"The uploaded file appears to be missing important information: {str(ve)}. "
+                       f"Please ensure you're uploading a complete profit and loss report."
+            )
+        
+        result_cache.set(cache_key, result)
+        return result
+    except Exception as e:
+        logger.error(f"Error processing uploaded file {filename}: {str(e)}")
+        raise upload_error(e)
+
+
+async def analyze_balance_sheet_upload(upload: UploadedWorkbook) -> Dict[str, Any]:
+    """
+    Analyze an uploaded balance sheet Excel file.
+    
+    Args:
+        upload: The received workbook.
+        
+    Returns:
+        The balance sheet analysis result.
+        
+    Raises:
+        HTTPException: With a user-friendly message if the file cannot be analyzed.
+    """
+    filename = upload.filename
+    try:
+        cache_key = digest_key(upload.digest, kind="balance_sheet")
+        cached = result_cache.get(cache_key)
+        if cached is not None:
+            logger.info(f"Returning cached balance sheet analysis for {filename}")
+            return restamp_cached(cached, upload)
+        
+        result = await analysis_executor.run(
+            analyze_balance_sheet,
+            upload.name,
+            content=upload.content,
+            engine=select_engine(upload.name),
+        )
+        result_cache.set(cache_key, result)
+        return result
+    except Exception as e:
+        logger.error(f"Error processing uploaded balance sheet {filename}: {str(e)}")
+        raise upload_error(e)
+
+
 @router.post("/", response_model=FinancialData)
-async def upload_file(file: UploadFile = File(...)):
+async def upload_file(
+    file: UploadFile = File(...),
+    balance_sheet: Optional[UploadFile] = File(None),
+    multi_period: bool = False,
+    organization_id: Optional[str] = None,
+):
     """
     Upload and process a profit and loss Excel file.
+
+    Set ``multi_period`` to also extract every period column (e.g. monthly
+    columns plus YTD) into ``periodValues``. Set ``organization_id`` to apply
+    that organization's validation rules and category mappings. A
+    ``balance_sheet`` file uploaded alongside is analyzed too and returned
+    under ``balanceSheet``, supplying the inputs of the balance sheet ratios.
     """
     if not file.filename.endswith(('.xlsx', '.xls')):
         raise HTTPException(status_code=400, detail="Only Excel files are supported")
+    if balance_sheet is not None and not balance_sheet.filename.endswith(('.xlsx', '.xls')):
+        raise HTTPException(status_code=400, detail="Only Excel files are supported")
     
+    upload = await receive_upload(file)
+    balance_sheet_upload = None
     try:
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".xlsx") as temp_file:
-            temp_file.write(await file.read())
-            temp_file_path = temp_file.name
+        # Received inside the try, so a rejected balance sheet still releases the P&L upload
+        if balance_sheet is not None:
+            balance_sheet_upload = await receive_upload(balance_sheet)
+        if balance_sheet_upload is None:
+            return await analyze_upload(
+                upload, multi_period=multi_period, organization_id=organization_id
+            )
         
-        try:
-            # Analyze the profit and loss report
-            result = analyze_profit_loss(temp_file_path)
-            
-            # Validate the result before returning
-            try:
-                validate_financial_data(result)
-            except ValueError as ve:
-                logger.warning(f"Validation failed for uploaded file {file.filename}: {str(ve)}")
-                raise HTTPException(
-                    status_code=422, 
-                    detail=f"The uploaded file appears to be missing important information: {str(ve)}. "
-                           f"Please ensure you're uploading a complete profit and loss report."
-                )
-            
-            return result
-        finally:
-            os.unlink(temp_file_path)  # Clean up temp file
-    except Exception as e:
-        logger.error(f"Error processing uploaded file {file.filename}: {str(e)}")
+        result, balance_sheet_result = await asyncio.gather(
+            analyze_upload(upload, multi_period=multi_period, organization_id=organization_id),
+            analyze_balance_sheet_upload(balance_sheet_upload),
+        )
+        result["balanceSheet"] = balance_sheet_result
+        return result
+    finally:
+        upload.close()
+        if balance_sheet_upload is not None:
+            balance_sheet_upload.close()
+
+
+@router.post("/balance-sheet", response_model=BalanceSheetData)
+async def upload_balance_sheet(file: UploadFile = File(...)):
+    """
+    Upload and process a balance sheet Excel file.
+
+    Returns the extracted sections and the figures used by the balance sheet
+    ratios (ROE, ROA, current and quick ratios).
+    """
+    if not file.filename.endswith(('.xlsx', '.xls')):
+        raise HTTPException(status_code=400, detail="Only Excel files are supported")
+    
+    upload = await receive_upload(file)
+    try:
+        return await analyze_balance_sheet_upload(upload)
+    finally:
+        upload.close()
+
+
+@router.post("/sheets", response_model=MultiSheetFinancialData)
+async def upload_sheets(
+    file: UploadFile = File(...),
+    multi_period: bool = False,
+    consolidate: bool = False,
+    organization_id: Optional[str] = None,
+):
+    """
+    Upload a workbook with one profit and loss sheet per entity.
+
+    Sheets that look like P&L reports are found by parsing only their first
+    rows, then analyzed in the same worker job, so the workbook is sent to
+    the worker pool once. Each qualifying sheet gets its own result or error;
+    set ``consolidate`` to also roll them up into one report.
+    """
+    if not file.filename.endswith(('.xlsx', '.xls')):
+        raise HTTPException(status_code=400, detail="Only Excel files are supported")
+    
+    upload = await receive_upload(file)
+    try:
+        mapping_version = mapping_store.latest_version(organization_id) if organization_id else None
+        cache_key = digest_key(
+            upload.digest,
+            multi_period=multi_period,
+            sheets=True,
+            consolidate=consolidate,
+            rules=validation_rule_sets.digest_for(organization_id),
+            # Mapping versions are numbered per organization
+            mappings=f"{organization_id}@{mapping_version}" if mapping_version else None,
+        )
+        cached = result_cache.get(cache_key)
+        if cached is not None:
+            logger.info(f"Returning cached multi-sheet analysis for {file.filename}")
+            for sheet in cached["sheets"]:
+                if "data" in sheet:
+                    restamp_cached(sheet["data"], upload)
+            if "consolidated" in cached:
+                restamp_cached(cached["consolidated"], upload)
+            return cached
         
-        # Provide a more user-friendly error message
-        if "Excel file validation failed" in str(e):
-            raise HTTPException(
-                status_code=422,
-                detail="The uploaded file doesn't appear to be a valid profit and loss report. "
-                       "Please check the file and try again."
+        # One job finds and analyzes every sheet, so the workbook is sent to a worker once
+        try:
+            sheets = await analysis_executor.run(
+                analyze_sheets,
+                upload.name,
+                content=upload.content,
+                engine=select_engine(upload.name),
+                organization_id=organization_id,
+                multi_period=multi_period,
+                mapping_version=mapping_version,
             )
-        elif "Invalid profit and loss report" in str(e):
+        except Exception as e:
+            logger.error(f"Error analyzing sheets of {file.filename}: {str(e)}")
+            raise upload_error(e)
+        
+        if not sheets:
             raise HTTPException(
                 status_code=422,
-                detail=str(e)
+                detail="No sheet in the uploaded file appears to be a profit and loss report."
             )
-        else:
-            raise HTTPException(
-                status_code=500,
-                detail=f"An error occurred while processing the file: {str(e)}"
-            )
\ No newline at end of file
+        
+        for sheet in sheets:
+            try:
+                if "error" in sheet:
+                    raise ValueError(sheet.pop("error"))
+                validate_financial_data(sheet["data"])
+            except ValueError as e:
+                logger.warning(f"Sheet {sheet['sheetName']} of {file.filename} failed: {str(e)}")
+                sheet.pop("data", None)
+                sheet["error"] = str(upload_error(e).detail)
+        
+        response: Dict[str, Any] = {"sheets": sheets}
+        analyzed = [sheet["data"] for sheet in sheets if "data" in sheet]
+        if consolidate and analyzed:
+            response["consolidated"] = consolidate_reports(analyzed)
+        
+        result_cache.set(cache_key, response)
+        return response
+    finally:
+        upload.close()
+
+
+async def run_upload_job(
+    job_id: str,
+    upload: UploadedWorkbook,
+    multi_period: bool,
+    organization_id: Optional[str] = None,
+) -> None:
+    """
+    Analyze an upload in the background and record the outcome in the job store.
+    
+    Args:
+        job_id: The job to report on.
+        upload: The received workbook, closed once the job ends.
+        multi_period: Also extract every period column into ``periodValues``.
+        organization_id: Organization whose validation rules apply.
+    """
+    progress = JobProgress(job_id, job_store.db_path)
+    try:
+        result = await analyze_upload(
+            upload, multi_period=multi_period, progress=progress, organization_id=organization_id
+        )
+    except HTTPException as e:
+        await asyncio.to_thread(
+            job_store.update, job_id, status=JOB_FAILED, error=str(e.detail), status_code=e.status_code
+        )
+    except Exception as e:
+        logger.error(f"Upload job {job_id} failed: {str(e)}")
+        await asyncio.to_thread(job_store.update, job_id, status=JOB_FAILED, error=str(e), status_code=500)
+    else:
+        await asyncio.to_thread(
+            job_store.update, job_id, status=JOB_COMPLETED, result=result, status_code=200
+        )
+        logger.info(f"Upload job {job_id} completed")
+    finally:
+        upload.close()
+
+
+@router.post("/jobs", response_model=UploadJobCreated, status_code=202)
+async def create_upload_job(
+    request: Request,
+    file: UploadFile = File(...),
+    multi_period: bool = False,
+    organization_id: Optional[str] = None,
+):
+    """
+    Upload a profit and loss Excel file for analysis in the background.
+
+    Returns a job id immediately. Poll ``GET /jobs/{job_id}`` for the status
+    and result, or follow ``GET /jobs/{job_id}/events`` for stage progress.
+    """
+    if not file.filename.endswith(('.xlsx', '.xls')):
+        raise HTTPException(status_code=400, detail="Only Excel files are supported")
+    
+    upload = await receive_upload(file)
+    job_id = await asyncio.to_thread(job_store.create, file.filename)
+    
+    # Keep a reference so the task is not garbage collected while it runs
+    task = asyncio.create_task(run_upload_job(job_id, upload, multi_period, organization_id))
+    _job_tasks.add(task)
+    task.add_done_callback(_job_tasks.discard)
+    
+    return UploadJobCreated(
+        jobId=job_id,
+        status=JOB_QUEUED,
+        statusUrl=str(request.url_for("get_upload_job", job_id=job_id)),
+        eventsUrl=str(request.url_for("stream_upload_job_events", job_id=job_id)),
+    )
+
+
+@router.get("/jobs/{job_id}", response_model=UploadJob)
+async def get_upload_job(job_id: str):
+    """
+    Get the status of an upload job, with the analysis result once it has completed.
+    """
+    job = await asyncio.to_thread(job_store.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Upload job not found")
+    
+    return UploadJob(
+        jobId=job["id"],
+        filename=job["filename"],
+        status=job["status"],
+        stage=job["stage"],
+        stages=JOB_STAGES,
+        result=job["result"],
+        error=job["error"],
+        statusCode=job["status_code"],
+        createdAt=datetime.fromtimestamp(job["created_at"], tz=timezone.utc),
+        updatedAt=datetime.fromtimestamp(job["updated_at"], tz=timezone.utc),
+    )
+
+
+@router.get("/jobs/{job_id}/events")
+async def stream_upload_job_events(job_id: str):
+    """
+    Stream the progress of an upload job as server-sent events.
+
+    Emits a ``progress`` event for each analysis stage, then a ``completed``
+    or ``failed`` event, after which the stream ends. A job abandoned by a
+    restart fails once it passes its deadline, so the stream always ends.
+    """
+    # The job store waits on SQLite locks, so it is kept off the event loop
+    if await asyncio.to_thread(job_store.get, job_id) is None:
+        raise HTTPException(status_code=404, detail="Upload job not found")
+    
+    async def events():
+        reported = 0  # number of stages already reported
+        while True:
+            job = await asyncio.to_thread(job_store.get, job_id)
+            if job is None:
+                return
+            
+            # Stages run in order, so report any that started between two polls
+            finished = job["status"] in (JOB_COMPLETED, JOB_FAILED)
+            if finished and job["status"] == JOB_COMPLETED:
+                current = len(JOB_STAGES)
+            elif job["stage"] in JOB_STAGES:
+                current = JOB_STAGES.index(job["stage"]) + 1
+            else:
+                current = reported
+            for stage in JOB_STAGES[reported:current]:
+                data = {"jobId": job_id, "status": JOB_RUNNING, "stage": stage}
+                yield f"event: progress\ndata: {json.dumps(data)}\n\n"
+            reported = max(reported, current)
+            
+            if finished:
+                data = {"jobId": job_id, "status": job["status"]}
+                if job["error"]:
+                    data["error"] = job["error"]
+                yield f"event: {job['status']}\ndata: {json.dumps(data)}\n\n"
+                return
+            
+            await asyncio.sleep(JOB_EVENTS_POLL_SECONDS)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"},
+    )
+
+
+async def stream_batch_results(
+    workbooks: List[UploadedWorkbook],
+    rejected: List[Dict[str, Any]],
+    multi_period: bool,
+    organization_id: Optional[str] = None,
+) -> AsyncIterator[str]:
+    """
+    Analyze workbooks concurrently and yield one NDJSON line per workbook as each finishes.
+    
+    Args:
+        workbooks: The received workbooks, closed as they are analyzed.
+        rejected: Error lines for files that were not accepted, yielded first.
+        multi_period: Also extract every period column into ``periodValues``.
+        organization_id: Organization whose validation rules apply.
+        
+    Yields:
+        JSON lines with the workbook name and either its result or its error.
+    """
+    # Submit no more jobs than there are workers, so a large batch does not
+    # fill the executor's queue and starve other uploads
+    slots = asyncio.Semaphore(max(analysis_executor.workers, 1))
+    
+    async def analyze_one(upload: UploadedWorkbook) -> Dict[str, Any]:
+        async with slots:
+            try:
+                result = await analyze_upload(
+                    upload, multi_period=multi_period, organization_id=organization_id
+                )
+                return {
+                    "filename": upload.filename,
+                    "status": "ok",
+                    "result": FinancialData.model_validate(result).model_dump(mode="json"),
+                }
+            except HTTPException as e:
+                return {
+                    "filename": upload.filename,
+                    "status": "error",
+                    "statusCode": e.status_code,
+                    "error": str(e.detail),
+                }
+            finally:
+                upload.close()
+    
+    for line in rejected:
+        yield json.dumps(line) + "\n"
+    
+    tasks = [asyncio.create_task(analyze_one(upload)) for upload in workbooks]
+    try:
+        for finished in asyncio.as_completed(tasks):
+            yield json.dumps(await finished) + "\n"
+    finally:
+        # The client may disconnect before every workbook is done
+        for task in tasks:
+            task.cancel()
+        for upload in workbooks:
+            upload.close()
+
+
+@router.post("/batch")
+async def upload_batch(
+    files: List[UploadFile] = File(...),
+    multi_period: bool = False,
+    organization_id: Optional[str] = None,
+):
+    """
+    Upload many profit and loss Excel files at once, directly or inside ZIP archives.
+
+    Workbooks are analyzed in parallel in the worker pool. The response is
+    newline-delimited JSON with one line per workbook, written as each one
+    finishes, so results arrive in completion order rather than upload order.
+    """
+    workbooks: List[UploadedWorkbook] = []
+    rejected: List[Dict[str, Any]] = []
+    # Uncompressed bytes that may still be extracted from this batch's archives
+    extract_budget = settings.BATCH_MAX_EXTRACTED_MB * 1024 * 1024
+    
+    try:
+        for file in files:
+            filename = file.filename or ""
+            if filename.lower().endswith(".zip"):
+                archive = await receive_upload(file)
+                try:
+                    # Archives are checked against the limits before any member is extracted
+                    extracted = await asyncio.to_thread(
+                        extract_workbooks,
+                        archive,
+                        max_files=settings.BATCH_MAX_FILES - len(workbooks),
+                        max_bytes=extract_budget,
+                    )
+                    workbooks.extend(extracted)
+                    extract_budget -= sum(workbook.size for workbook in extracted)
+                except ArchiveLimitError as e:
+                    raise HTTPException(status_code=400, detail=str(e))
+                except zipfile.BadZipFile:
+                    rejected.append({
+                        "filename": filename,
+                        "status": "error",
+                        "statusCode": 400,
+                        "error": "The archive is not a valid ZIP file",
+                    })
+                finally:
+                    archive.close()
+            elif filename.endswith(('.xlsx', '.xls')):
+                workbooks.append(await receive_upload(file))
+            else:
+                rejected.append({
+                    "filename": filename,
+                    "status": "error",
+                    "statusCode": 400,
+                    "error": "Only Excel files and ZIP archives are supported",
+                })
+            
+            if len(workbooks) > settings.BATCH_MAX_FILES:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"A batch may contain at most {settings.BATCH_MAX_FILES} workbooks"
+                )
+    except BaseException:
+        for upload in workbooks:
+            upload.close()
+        raise
+    
+    logger.info(f"Batch upload of {len(workbooks)} workbooks ({len(rejected)} rejected)")
+    return StreamingResponse(
+        stream_batch_results(workbooks, rejected, multi_period, organization_id),
+        media_type="application/x-ndjson",
+    )
@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api.endpoints import analyzer, insights, upload, export, auth, reports
+from app.api.endpoints import analyzer, insights, upload, export, auth, reports, mappings
 
 router = APIRouter()
 router.include_router(auth.router, prefix="/auth", tags=["Authentication"])
@@ -7,4 +7,5 @@ router.include_router(reports.router, prefix="/reports", tags=["Reports"])
 router.include_router(upload.router, prefix="/upload", tags=["Upload"])
 router.include_router(analyzer.router, prefix="/analyzer", tags=["Analyzer"])
 router.include_router(insights.router, prefix="/insights", tags=["Insights"])
-router.include_router(export.router, prefix="/export", tags=["Export"])
\ No newline at end of file
+router.include_router(export.router, prefix="/export", tags=["Export"])
+router.include_router(mappings.router, prefix="/mappings", tags=["Mappings"])
\ No newline at end of file
@@ -0,0 +1,494 @@
+"""
+Incrementally maintained aggregates of stored metrics.
+
+Dashboards need year-to-date totals, trailing-twelve-month figures and
+cumulative category totals, which would otherwise mean re-reading an
+organization's whole history on every load. These aggregates are kept in a
+small SQLite database and updated as data is stored: each new value for a
+period adjusts its fiscal year's YTD total, the metric's TTM window and,
+for reports, the category totals by the difference from the value it
+replaces, so the work per period does not grow with the history.
+
+Storing a value for a metric and period that was stored before replaces it,
+matching the latest-wins reading of the time series analytics. YTD totals
+are kept per period frequency, so a year reported both monthly and
+quarterly is not counted twice, and the TTM window only takes monthly
+values. Amounts are reported as totals; ratios, margins and averages do not
+add up over periods and are reported as the average of their values instead.
+"""
+
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.core.config import settings
+from app.core.time_series import FREQUENCIES, parse_period
+from app.utils.categorization import summarize_categories
+from app.utils.logger import app_logger
+from app.utils.ratios import METRICS
+
+# Configure module-specific logger
+logger = app_logger.getChild("aggregates")
+
+# Months in a trailing-twelve-month window
+TTM_MONTHS = 12
+
+# Version of the tables below; a store with an older version is rebuilt from
+# the stored history, as the aggregates can always be derived from it again
+SCHEMA_VERSION = 2
+
+# Name fragments of metrics outside the registry that are not amounts
+_AVERAGED_NAME_PARTS = ("ratio", "margin", "average", "percent", "rate", "return_on")
+
+_TABLES = (
+    "aggregate_values",
+    "aggregate_ytd",
+    "aggregate_ttm",
+    "aggregate_category_values",
+    "aggregate_categories",
+    "aggregate_organizations",
+)
+
+_SCHEMA = [
+    # Latest value of each metric per period, to compute deltas and TTM drop-offs
+    """
+    CREATE TABLE IF NOT EXISTS aggregate_values (
+        organization_id TEXT NOT NULL,
+        metric_name TEXT NOT NULL,
+        period TEXT NOT NULL,
+        month INTEGER,
+        value REAL NOT NULL,
+        PRIMARY KEY (organization_id, metric_name, period)
+    )
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS aggregate_values_month
+    ON aggregate_values (organization_id, metric_name, month)
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS aggregate_ytd (
+        organization_id TEXT NOT NULL,
+        metric_name TEXT NOT NULL,
+        frequency TEXT NOT NULL,
+        fiscal_year INTEGER NOT NULL,
+        total REAL NOT NULL,
+        count INTEGER NOT NULL,
+        PRIMARY KEY (organization_id, metric_name, frequency, fiscal_year)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS aggregate_ttm (
+        organization_id TEXT NOT NULL,
+        metric_name TEXT NOT NULL,
+        end_month INTEGER NOT NULL,
+        total REAL NOT NULL,
+        count INTEGER NOT NULL,
+        PRIMARY KEY (organization_id, metric_name)
+    )
+    """,
+    # Category totals of each report period, to compute deltas on re-upload
+    """
+    CREATE TABLE IF NOT EXISTS aggregate_category_values (
+        organization_id TEXT NOT NULL,
+        category TEXT NOT NULL,
+        period TEXT NOT NULL,
+        value REAL NOT NULL,
+        PRIMARY KEY (organization_id, category, period)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS aggregate_categories (
+        organization_id TEXT NOT NULL,
+        category TEXT NOT NULL,
+        total REAL NOT NULL,
+        count INTEGER NOT NULL,
+        PRIMARY KEY (organization_id, category)
+    )
+    """,
+    # Organizations whose aggregates include the history stored before them
+    """
+    CREATE TABLE IF NOT EXISTS aggregate_organizations (
+        organization_id TEXT PRIMARY KEY,
+        seeded_at REAL NOT NULL
+    )
+    """,
+]
+
+
+def fiscal_year(period: pd.Period, start_month: int = 1) -> int:
+    """
+    Get the fiscal year a period belongs to, named after the year it ends in.
+
+    Annual periods, such as "FY2024", already name their fiscal year.
+
+    Args:
+        period: A monthly, quarterly or annual period.
+        start_month: First month of the fiscal year.
+
+    Returns:
+        The fiscal year.
+    """
+    if period.freqstr[0] == "Y":
+        return period.year
+    month = period.asfreq("M", how="end")
+    if start_month > 1 and month.month >= start_month:
+        return month.year + 1
+    return month.year
+
+
+def is_additive(metric_name: str) -> bool:
+    """
+    Check whether a metric's values add up over periods.
+
+    Registry metrics computed by dividing one figure by another are ratios;
+    other metrics are judged by their name.
+
+    Args:
+        metric_name: The stored metric name.
+
+    Returns:
+        True for amounts, False for ratios, margins and averages.
+    """
+    metric = METRICS.get(metric_name)
+    if metric is not None:
+        return metric.formula is not np.divide
+    name = metric_name.lower()
+    return not any(part in name for part in _AVERAGED_NAME_PARTS)
+
+
+def _aggregate(metric_name: str, total: float, count: int) -> Dict[str, Any]:
+    """Report an aggregate as a total for amounts or an average for ratios."""
+    if is_additive(metric_name):
+        return {"total": total, "count": count}
+    return {"average": total / count if count else None, "count": count}
+
+
+def category_totals(data: Dict[str, Any]) -> Dict[str, float]:
+    """
+    Get the category totals of processed report data.
+
+    Args:
+        data: Processed report data, e.g. an uploaded analysis result.
+
+    Returns:
+        Total per category, from its ``categorySummary`` or its categorized
+        sections; empty when the data has neither.
+    """
+    summary = data.get("categorySummary")
+    if not isinstance(summary, dict) and isinstance(data.get("sections"), dict):
+        summary = summarize_categories(data)
+    if not isinstance(summary, dict):
+        return {}
+    return {
+        category: float(entry["total"])
+        for category, entry in summary.get("categories", {}).items()
+        if isinstance(entry, dict) and isinstance(entry.get("total"), (int, float))
+    }
+
+
+class AggregateStore:
+    """SQLite-backed aggregates of stored metrics, safe to use from several processes."""
+
+    def __init__(self, db_path: str, fiscal_year_start_month: int = 1):
+        """
+        Initialize the store and create its tables if needed.
+
+        Args:
+            db_path: Path to the SQLite database file.
+            fiscal_year_start_month: First month of the fiscal year YTD totals run from.
+        """
+        self.db_path = db_path
+        self.fiscal_year_start_month = fiscal_year_start_month
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            if version < SCHEMA_VERSION:
+                # Organizations are seeded again from their history on their next request
+                for table in _TABLES:
+                    conn.execute(f"DROP TABLE IF EXISTS {table}")
+                if version:
+                    logger.info(f"Rebuilding aggregate store from schema version {version}")
+            for statement in _SCHEMA:
+                conn.execute(statement)
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection to the database."""
+        return sqlite3.connect(self.db_path, timeout=10)
+
+    def _apply_value(
+        self,
+        conn: sqlite3.Connection,
+        organization_id: str,
+        metric_name: str,
+        period: pd.Period,
+        value: float,
+    ) -> None:
+        """Store one metric value and adjust its YTD and TTM aggregates."""
+        label = str(period)
+        frequency = FREQUENCIES[period.freqstr[0]][0]
+        month = period.ordinal if frequency == "monthly" else None
+
+        row = conn.execute(
+            "SELECT value FROM aggregate_values "
+            "WHERE organization_id = ? AND metric_name = ? AND period = ?",
+            (organization_id, metric_name, label),
+        ).fetchone()
+        delta = value - (row[0] if row else 0.0)
+        added = 0 if row else 1
+
+        conn.execute(
+            "INSERT INTO aggregate_values (organization_id, metric_name, period, month, value) "
+            "VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT (organization_id, metric_name, period) DO UPDATE SET value = excluded.value",
+            (organization_id, metric_name, label, month, value),
+        )
+
+        conn.execute(
+            "INSERT INTO aggregate_ytd "
+            "(organization_id, metric_name, frequency, fiscal_year, total, count) "
+            "VALUES (?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (organization_id, metric_name, frequency, fiscal_year) "
+            "DO UPDATE SET total = total + excluded.total, count = count + excluded.count",
+            (
+                organization_id,
+                metric_name,
+                frequency,
+                fiscal_year(period, self.fiscal_year_start_month),
+                delta,
+                added,
+            ),
+        )
+
+        if month is not None:
+            self._apply_ttm(conn, organization_id, metric_name, month, delta, added)
+
+    def _apply_ttm(
+        self,
+        conn: sqlite3.Connection,
+        organization_id: str,
+        metric_name: str,
+        month: int,
+        delta: float,
+        added: int,
+    ) -> None:
+        """Adjust a metric's TTM window for a changed monthly value."""
+        row = conn.execute(
+            "SELECT end_month, total, count FROM aggregate_ttm "
+            "WHERE organization_id = ? AND metric_name = ?",
+            (organization_id, metric_name),
+        ).fetchone()
+
+        if row is None:
+            total, count, end_month = delta, added, month
+        else:
+            end_month, total, count = row
+            if month > end_month:
+                # The window moves forward: drop the at most 12 months leaving it
+                dropped_total, dropped_count = conn.execute(
+                    "SELECT COALESCE(SUM(value), 0), COUNT(*) FROM aggregate_values "
+                    "WHERE organization_id = ? AND metric_name = ? AND month BETWEEN ? AND ?",
+                    (
+                        organization_id,
+                        metric_name,
+                        end_month - TTM_MONTHS + 1,
+                        min(end_month, month - TTM_MONTHS),
+                    ),
+                ).fetchone()
+                total, count = total - dropped_total + delta, count - dropped_count + added
+                end_month = month
+            elif month > end_month - TTM_MONTHS:
+                total, count = total + delta, count + added
+            else:
+                # Months before the window do not change it
+                return
+
+        conn.execute(
+            "INSERT OR REPLACE INTO aggregate_ttm (organization_id, metric_name, end_month, total, count) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (organization_id, metric_name, end_month, total, count),
+        )
+
+    def apply(self, rows: Iterable[Dict[str, Any]]) -> int:
+        """
+        Update the aggregates with newly stored time series rows.
+
+        Rows whose period label is not a period (e.g. "YTD") are skipped, as
+        they would count the same amounts twice.
+
+        Args:
+            rows: Rows with ``organization_id``, ``period``, ``metric_name``
+                and ``metric_value``, in the order they were stored.
+
+        Returns:
+            Number of rows applied.
+        """
+        parsed: List[Tuple[str, str, pd.Period, float]] = []
+        for row in rows:
+            period = parse_period(str(row["period"]))
+            if period is None:
+                logger.debug(f"Not aggregating period {row['period']!r}")
+                continue
+            parsed.append(
+                (str(row["organization_id"]), row["metric_name"], period, float(row["metric_value"]))
+            )
+        if not parsed:
+            return 0
+
+        with self._connect() as conn:
+            # The write lock is taken up front so concurrent updates apply in turn
+            conn.execute("BEGIN IMMEDIATE")
+            for organization_id, metric_name, period, value in parsed:
+                self._apply_value(conn, organization_id, metric_name, period, value)
+        return len(parsed)
+
+    def apply_categories(self, organization_id: str, period: str, totals: Dict[str, float]) -> None:
+        """
+        Update the cumulative category totals with a stored report.
+
+        A report stored again for the same period replaces the earlier one.
+
+        Args:
+            organization_id: The organization.
+            period: The report period label.
+            totals: Total per category of the report.
+        """
+        if not totals:
+            return
+        # Labels of the same period, e.g. "Jan 2024" and "2024-01", share one key
+        parsed = parse_period(period)
+        if parsed is not None:
+            period = str(parsed)
+
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            for category, value in totals.items():
+                row = conn.execute(
+                    "SELECT value FROM aggregate_category_values "
+                    "WHERE organization_id = ? AND category = ? AND period = ?",
+                    (organization_id, category, period),
+                ).fetchone()
+                delta = value - (row[0] if row else 0.0)
+                added = 0 if row else 1
+                conn.execute(
+                    "INSERT OR REPLACE INTO aggregate_category_values "
+                    "(organization_id, category, period, value) VALUES (?, ?, ?, ?)",
+                    (organization_id, category, period, value),
+                )
+                conn.execute(
+                    "INSERT INTO aggregate_categories (organization_id, category, total, count) "
+                    "VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT (organization_id, category) "
+                    "DO UPDATE SET total = total + excluded.total, count = count + excluded.count",
+                    (organization_id, category, delta, added),
+                )
+
+    def is_seeded(self, organization_id: str) -> bool:
+        """
+        Check whether an organization's aggregates include its earlier history.
+
+        Args:
+            organization_id: The organization.
+
+        Returns:
+            True once ``seed`` has run for the organization.
+        """
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT 1 FROM aggregate_organizations WHERE organization_id = ?",
+                (organization_id,),
+            ).fetchone()
+        return row is not None
+
+    def seed(
+        self,
+        organization_id: str,
+        rows: List[Dict[str, Any]],
+        reports: Iterable[Tuple[str, Dict[str, float]]] = (),
+    ) -> None:
+        """
+        Fold an organization's history into its aggregates, once.
+
+        Values replace those stored for the same period, so rows that were
+        already applied as they were stored are not counted twice.
+
+        Args:
+            organization_id: The organization.
+            rows: Its stored time series rows.
+            reports: Period and category totals of its stored reports.
+        """
+        self.apply(sorted(rows, key=lambda row: row.get("created_at") or ""))
+        for period, totals in reports:
+            self.apply_categories(organization_id, period, totals)
+
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO aggregate_organizations (organization_id, seeded_at) VALUES (?, ?)",
+                (organization_id, time.time()),
+            )
+        logger.info(f"Seeded aggregates of organization {organization_id} from {len(rows)} stored rows")
+
+    def get(self, organization_id: str) -> Dict[str, Any]:
+        """
+        Get an organization's aggregates.
+
+        Args:
+            organization_id: The organization.
+
+        Returns:
+            dict: YTD aggregates per period frequency and fiscal year and the
+            TTM window of each metric, and the cumulative total of each category.
+        """
+        with self._connect() as conn:
+            ytd = conn.execute(
+                "SELECT metric_name, frequency, fiscal_year, total, count FROM aggregate_ytd "
+                "WHERE organization_id = ? ORDER BY metric_name, frequency, fiscal_year",
+                (organization_id,),
+            ).fetchall()
+            ttm = conn.execute(
+                "SELECT metric_name, end_month, total, count FROM aggregate_ttm WHERE organization_id = ?",
+                (organization_id,),
+            ).fetchall()
+            categories = conn.execute(
+                "SELECT category, total, count FROM aggregate_categories "
+                "WHERE organization_id = ? ORDER BY category",
+                (organization_id,),
+            ).fetchall()
+
+        metrics: Dict[str, Dict[str, Any]] = {}
+
+        def metric_entry(metric_name: str) -> Dict[str, Any]:
+            return metrics.setdefault(
+                metric_name, {"additive": is_additive(metric_name), "ytd": {}, "ttm": None}
+            )
+
+        for metric_name, frequency, year, total, count in ytd:
+            years = metric_entry(metric_name)["ytd"].setdefault(frequency, {})
+            years[str(year)] = _aggregate(metric_name, total, count)
+        for metric_name, end_month, total, count in ttm:
+            metric_entry(metric_name)["ttm"] = {
+                "endPeriod": str(pd.Period(ordinal=end_month, freq="M")),
+                **_aggregate(metric_name, total, count),
+            }
+
+        return {
+            "organizationId": organization_id,
+            "fiscalYearStartMonth": self.fiscal_year_start_month,
+            "metrics": metrics,
+            "categories": {
+                category: {"total": total, "count": count} for category, total, count in categories
+            },
+        }
+
+
+# Shared store configured from the application settings
+aggregate_store = AggregateStore(
+    settings.AGGREGATE_STORE_PATH or str(Path(tempfile.gettempdir()) / "pnl_aggregates.sqlite3"),
+    settings.FISCAL_YEAR_START_MONTH,
+)
@@ -9,141 +9,183 @@ import os
 import re
 import traceback
 from datetime import datetime
-from typing import Any, Dict
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Union
 
+import numpy as np
 import pandas as pd
 
+from app.core.config import settings
+from app.core.ingestion import IngestionContext, string_values
+from app.core.mappings import categorizer_for
 from app.core.validation import ExcelFileValidationError, validate_excel_file
 
-# Import account categorization, validation, and logger
-from app.utils.categorization import add_categories_to_accounts
+# Import account categorization, keyword vocabularies, and logger
+from app.utils.categorization import add_categories_to_accounts, summarize_categories
+from app.utils.keywords import BASIS_KEYWORDS, SECTION_KEYWORDS, TOTAL_KEYWORDS
 from app.utils.logger import app_logger
 
 # Configure module-specific logger
 logger = app_logger.getChild("analyzer")
 
-
-def extract_company_and_period(df):
+# Bump when a change alters the analyzer output, so cached results are not reused
+ANALYZER_VERSION = "4"
+
+# Sections holding account lists, and profit lines with the two figures they derive from
+ACCOUNT_SECTIONS = ["tradingIncome", "costOfSales", "operatingExpenses"]
+PROFIT_LINES = {
+    "grossProfit": ("tradingIncome", "costOfSales"),
+    "netProfit": ("grossProfit", "operatingExpenses"),
+}
+
+# Order in which sections appear in a report
+REPORT_SECTIONS = [
+    "tradingIncome",
+    "costOfSales",
+    "grossProfit",
+    "operatingExpenses",
+    "netProfit",
+]
+
+# Pattern used to recognise period column labels such as "Apr 2025", "Q1 2025" or "YTD"
+PERIOD_LABEL_PATTERN = re.compile(
+    r"(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?[\s\-/]*'?\d{2,4}"
+    r"|q[1-4][\s\-/]*(?:fy)?\s*\d{2,4}"
+    r"|(?:fy\s*)?\d{4}(?:\s*[\-/]\s*\d{2,4})?"
+    r"|\d{1,2}[\-/.]\d{1,2}[\-/.]\d{2,4}"
+    r"|ytd|year to date|total",
+    re.IGNORECASE,
+)
+
+# Pattern used to recognise report title rows, which are not the company name
+REPORT_TITLE_PATTERN = r"(?:profit|loss|p&l|income)"
+
+# Pattern used to recognise the reporting period in the report header
+PERIOD_PATTERN = (
+    r"(?:january|february|march|april|may|june|july|august|september|october|november|december)\s+\d{4}"
+    r"|for\s+the\s+\w+\s+ended\s+[\w\s,]+\d{4}"
+    r"|year\s+to\s+date\s+[\w\s,]+\d{4}"
+)
+
+
+def extract_company_and_period(
+    df, context: Optional[IngestionContext] = None, title_pattern: str = REPORT_TITLE_PATTERN
+):
     """
     Extract company name and period from the Excel file.
 
     Args:
         df (pandas.DataFrame): The dataframe containing the P&L data.
+        context (IngestionContext, optional): Shared context with precomputed row text.
+        title_pattern (str): Pattern matching the start of report title rows,
+            which are skipped when looking for the company name.
 
     Returns:
         tuple: (company_name, period) strings.
     """
-    # Try to find company name in the first few rows
-    company_name = None
-    period = None
+    if context is None:
+        context = IngestionContext.from_dataframe(df)
 
-    for i in range(min(10, len(df))):
-        row = df.iloc[i]
-        row_str = " ".join(str(x) for x in row if pd.notna(x))
-
-        # Look for company name (usually in the first rows)
-        if (
-            company_name is None
-            and row_str
-            and not row_str.lower().startswith(("profit", "loss", "p&l", "income"))
-        ):
-            company_name = row_str
-
-        # Look for period indicators
-        period_match = re.search(
-            r"(january|february|march|april|may|june|july|august|september|october|november|december)\s+\d{4}|for\s+the\s+\w+\s+ended\s+[\w\s,]+\d{4}|year\s+to\s+date\s+[\w\s,]+\d{4}",
-            row_str.lower(),
-        )
-        if period_match:
-            period = period_match.group(0).title()
-            break
+    header_texts = context.row_texts.iloc[:10]
+    header_lower = context.row_texts_lower.iloc[:10]
+
+    # Look for period indicators; rows after the first match are not scanned
+    period = None
+    period_matches = header_lower.str.extract(f"({PERIOD_PATTERN})", expand=False)
+    period_rows = period_matches.dropna()
+    if not period_rows.empty:
+        period = period_rows.iloc[0].title()
+        header_texts = header_texts.loc[: period_rows.index[0]]
+        header_lower = header_lower.loc[: period_rows.index[0]]
+
+    # Look for company name (usually in the first rows)
+    company_name = None
+    is_candidate = (header_texts != "") & ~header_lower.str.match(title_pattern)
+    if is_candidate.any():
+        company_name = header_texts[is_candidate].iloc[0]
 
     return company_name, period
 
 
-def identify_basis_type(df):
+def identify_basis_type(df, context: Optional[IngestionContext] = None):
     """
     Identify if the report is on Accrual or Cash basis.
 
     Args:
         df (pandas.DataFrame): The dataframe containing the P&L data.
+        context (IngestionContext, optional): Shared context with precomputed row text.
 
     Returns:
         str: 'Accrual' or 'Cash'.
     """
-    for i in range(min(15, len(df))):
-        row = df.iloc[i]
-        row_str = " ".join(str(x) for x in row if pd.notna(x)).lower()
-        if "accrual basis" in row_str:
-            return "Accrual"
-        elif "cash basis" in row_str:
-            return "Cash"
+    if context is None:
+        context = IngestionContext.from_dataframe(df)
+
+    hits = context.keyword_hits(BASIS_KEYWORDS).iloc[:15]
+    basis_rows = hits.index[hits.any(axis=1)]
+    if len(basis_rows) > 0:
+        return "Accrual" if hits.at[basis_rows[0], "accrual basis"] else "Cash"
 
     # Default to Accrual if not specified
     return "Accrual"
 
 
-def find_section_boundaries(df):
+def find_section_boundaries(
+    df,
+    context: Optional[IngestionContext] = None,
+    section_keywords: Optional[Dict[str, List[str]]] = None,
+    account_sections: Optional[List[str]] = None,
+    excluded_keywords: Optional[Dict[str, List[str]]] = None,
+):
     """
     Find the row indices for each section of the profit and loss report.
 
+    Other statements such as balance sheets reuse the same logic with their
+    own section keywords: account sections span from their first keyword hit
+    to the next section, and every other section is the last row hitting
+    one of its keywords.
+
     Args:
         df (pandas.DataFrame): The dataframe containing the P&L data.
+        context (IngestionContext, optional): Shared context with precomputed row text.
+        section_keywords (dict, optional): Keywords per section, in report
+            order. Defaults to the profit and loss sections.
+        account_sections (list, optional): Sections holding account lists.
+            Defaults to the profit and loss account sections.
+        excluded_keywords (dict, optional): Keywords per section whose rows
+            do not count as hits of that section, e.g. "non-current assets"
+            for "current assets".
 
     Returns:
         dict: Dictionary with section boundaries.
     """
-    sections = {
-        "tradingIncome": {"start": None, "end": None},
-        "costOfSales": {"start": None, "end": None},
-        "grossProfit": {"row": None},
-        "operatingExpenses": {"start": None, "end": None},
-        "netProfit": {"row": None},
-    }
+    if context is None:
+        context = IngestionContext.from_dataframe(df)
+    if section_keywords is None:
+        section_keywords = SECTION_KEYWORDS
+    if account_sections is None:
+        account_sections = ACCOUNT_SECTIONS
+    excluded_keywords = excluded_keywords or {}
 
-    # Keywords to identify each section
-    section_keywords = {
-        "tradingIncome": [
-            "trading income",
-            "revenue",
-            "sales",
-            "income",
-            "operating revenue",
-        ],
-        "costOfSales": ["cost of sales", "cost of goods sold", "cogs", "direct costs"],
-        "grossProfit": ["gross profit", "gross income", "gross margin"],
-        "operatingExpenses": [
-            "operating expenses",
-            "expenses",
-            "overhead",
-            "indirect costs",
-            "administrative expenses",
-        ],
-        "netProfit": [
-            "net profit",
-            "net income",
-            "profit for the period",
-            "net earnings",
-            "net operating profit",
-        ],
+    sections = {
+        section: {"start": None, "end": None} if section in account_sections else {"row": None}
+        for section in section_keywords
     }
 
     # Find the start and end rows for each section
-    for i in range(len(df)):
-        row = df.iloc[i]
-        row_str = " ".join(str(x) for x in row if pd.notna(x)).lower()
-
-        # Check for section headers
-        for section, keywords in section_keywords.items():
-            if any(keyword in row_str for keyword in keywords):
-                if section in ["tradingIncome", "costOfSales", "operatingExpenses"]:
-                    if sections[section]["start"] is None:
-                        sections[section]["start"] = i
-                elif section in ["grossProfit", "netProfit"]:
-                    sections[section]["row"] = i
+    for section, keywords in section_keywords.items():
+        hits = context.keyword_hits(keywords).any(axis=1).to_numpy()
+        if section in excluded_keywords:
+            hits &= ~context.keyword_hits(excluded_keywords[section]).any(axis=1).to_numpy()
+        hit_rows = np.flatnonzero(hits)
+        if len(hit_rows) == 0:
+            continue
+        if section in account_sections:
+            sections[section]["start"] = int(hit_rows[0])
+        else:
+            sections[section]["row"] = int(hit_rows[-1])
 
     # Determine end rows for sections
-    for section in ["tradingIncome", "costOfSales", "operatingExpenses"]:
+    for section in account_sections:
         if sections[section]["start"] is not None:
             # Find the next section start after this one
             next_section_start = len(df)
@@ -181,124 +223,484 @@ def find_section_boundaries(df):
     return sections
 
 
-def extract_accounts(df, start_row, end_row):
+def _rightmost_values(values: np.ndarray) -> np.ndarray:
+    """
+    Get the rightmost non-NaN value of each row of a float matrix.
+
+    Args:
+        values (numpy.ndarray): 2-D float array.
+
+    Returns:
+        numpy.ndarray: One value per row, NaN where the row has no number.
+    """
+    if values.shape[1] == 0:
+        return np.full(values.shape[0], np.nan)
+
+    present = ~np.isnan(values)
+    last = values.shape[1] - 1 - np.argmax(present[:, ::-1], axis=1)
+    rightmost = values[np.arange(values.shape[0]), last]
+    return np.where(present.any(axis=1), rightmost, np.nan)
+
+
+def _first_matching_column(masks: np.ndarray) -> np.ndarray:
+    """
+    Get the index of the first True column in each row, or -1 if none.
+
+    Args:
+        masks (numpy.ndarray): 2-D boolean array.
+
+    Returns:
+        numpy.ndarray: Column index per row.
+    """
+    if masks.shape[1] == 0:
+        return np.full(masks.shape[0], -1)
+    return np.where(masks.any(axis=1), np.argmax(masks, axis=1), -1)
+
+
+def extract_row_value(df, row_index, context: Optional[IngestionContext] = None):
+    """
+    Extract the rightmost numeric value of a single row, e.g. a profit line.
+
+    Args:
+        df (pandas.DataFrame): The dataframe containing the P&L data.
+        row_index (int): Row index.
+        context (IngestionContext, optional): Shared context with precomputed numeric values.
+
+    Returns:
+        float or None: The value, or None if the row holds no number.
+    """
+    if context is None:
+        context = IngestionContext.from_dataframe(df)
+
+    value = _rightmost_values(context.numeric_values[row_index : row_index + 1])[0]
+    return None if np.isnan(value) else float(value)
+
+
+class SectionRows(NamedTuple):
+    """Row positions and labels of the accounts and totals inside a section."""
+
+    account_rows: np.ndarray
+    names: List[str]
+    codes: List[Optional[str]]
+    total_rows: np.ndarray
+
+
+def locate_section_rows(df, start_row, end_row, context: Optional[IngestionContext] = None):
+    """
+    Locate the account and total rows of a section of the profit and loss report.
+
+    Name and code columns are found with string masks over the first three
+    columns; rows containing a total keyword are reported separately.
+
+    Args:
+        df (pandas.DataFrame): The dataframe containing the P&L data.
+        start_row (int): Starting row index (the section header).
+        end_row (int): Ending row index.
+        context (IngestionContext, optional): Shared context with precomputed row data.
+
+    Returns:
+        SectionRows: Account rows with their names and codes, plus total rows.
+    """
+    if context is None:
+        context = IngestionContext.from_dataframe(df)
+
+    # Skip the header row
+    start_row += 1
+    stop_row = end_row + 1
+    if start_row >= stop_row:
+        empty = np.array([], dtype=int)
+        return SectionRows(empty, [], [], empty)
+
+    block = df.iloc[start_row:stop_row]
+    n_cols = block.shape[1]
+
+    # Skip empty rows
+    non_empty = block.notna().any(axis=1).to_numpy()
+
+    # Rows that are likely headers or subtotals only contribute the total
+    is_total = (
+        context.keyword_hits(TOTAL_KEYWORDS).iloc[start_row:stop_row].any(axis=1).to_numpy()
+    )
+
+    # Find account names and codes (usually in the first few columns)
+    name_columns = min(3, n_cols)
+    labels = np.full((len(block), name_columns), None, dtype=object)
+    is_name = np.zeros((len(block), name_columns), dtype=bool)
+    is_code = np.zeros((len(block), name_columns), dtype=bool)
+    for j in range(name_columns):
+        strings = string_values(block.iloc[:, j])
+        if strings.isna().all():
+            continue
+        stripped = strings.str.strip()
+        labels[:, j] = stripped.to_numpy(dtype=object)
+        is_name[:, j] = (stripped.str.len() > 0).to_numpy()
+        is_code[:, j] = stripped.str.fullmatch(r"\d+").eq(True).to_numpy()
+
+    name_column = _first_matching_column(is_name)
+    code_column = _first_matching_column(is_code)
+
+    positions = np.flatnonzero(non_empty & ~is_total & (name_column >= 0))
+    names = [labels[i, name_column[i]] for i in positions]
+    codes = [
+        labels[i, code_column[i]] if code_column[i] >= 0 else None for i in positions
+    ]
+    total_rows = np.flatnonzero(non_empty & is_total) + start_row
+
+    return SectionRows(positions + start_row, names, codes, total_rows)
+
+
+def extract_accounts(df, start_row, end_row, context: Optional[IngestionContext] = None):
     """
     Extract account details from a section of the profit and loss report.
 
+    The section is processed column-wise: values come from the context's
+    numeric matrix (coerced once per sheet), taken from the last value
+    columns of the sheet profile, and the name and code columns are located
+    with masks over the first three columns.
+
     Args:
         df (pandas.DataFrame): The dataframe containing the P&L data.
         start_row (int): Starting row index.
         end_row (int): Ending row index.
+        context (IngestionContext, optional): Shared context with precomputed row data.
 
     Returns:
         tuple: (accounts_list, total_value).
     """
+    if context is None:
+        context = IngestionContext.from_dataframe(df)
+
     accounts = []
     total_value = None
 
-    # Skip the header row
-    start_row += 1
+    section_rows = locate_section_rows(df, start_row, end_row, context)
+    values = context.numeric_values
+    n_cols = values.shape[1]
+
+    # The last total row with a number provides the section total
+    if len(section_rows.total_rows) > 0:
+        totals = _rightmost_values(values[section_rows.total_rows])
+        totals = totals[~np.isnan(totals)]
+        if len(totals) > 0:
+            total_value = float(totals[-1])
+
+    # Find account values in the last value columns, or the last few columns
+    # when the profile found none
+    value_columns = [j for j in context.profile.value_columns if j >= 1][-3:]
+    if not value_columns:
+        value_columns = list(range(max(1, n_cols - 3), n_cols))
+    account_values = _rightmost_values(
+        values[np.ix_(section_rows.account_rows, value_columns)]
+    )
+
+    # Add account to the list if we have both name and value
+    for name, code, value in zip(
+        section_rows.names, section_rows.codes, account_values
+    ):
+        if np.isnan(value):
+            continue
+        account = {"name": name, "value": float(value)}
+        if code is not None:
+            account["code"] = code
+        accounts.append(account)
+
+    return accounts, total_value
+
+
+def _last_values(values: np.ndarray) -> np.ndarray:
+    """
+    Get the last non-NaN value of each column of a float matrix.
+
+    Args:
+        values (numpy.ndarray): 2-D float array.
+
+    Returns:
+        numpy.ndarray: One value per column, NaN where the column has no number.
+    """
+    return _rightmost_values(values.T)
+
+
+def _to_optional_floats(values: np.ndarray) -> List[Any]:
+    """Convert a float array to nested lists with None in place of NaN."""
+    if values.ndim > 1:
+        return [_to_optional_floats(row) for row in values]
+    return [None if np.isnan(v) else float(v) for v in values]
 
-    for i in range(start_row, end_row + 1):
-        row = df.iloc[i]
 
-        # Skip empty rows
-        if all(pd.isna(x) for x in row):
+def _period_label(value) -> Optional[str]:
+    """
+    Get the period label of a header cell, or None if it does not name a period.
+
+    Args:
+        value: The header cell.
+
+    Returns:
+        str or None: The label.
+    """
+    if isinstance(value, datetime):
+        return value.strftime("%b %Y")
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        if float(value).is_integer() and 1900 <= value <= 2100:
+            return str(int(value))
+        return None
+    if isinstance(value, str) and PERIOD_LABEL_PATTERN.fullmatch(value.strip()):
+        return value.strip()
+    return None
+
+
+def find_period_columns(df, sections=None, context: Optional[IngestionContext] = None):
+    """
+    Detect the period header row and the period column it labels.
+
+    The header is looked for above the first section (or in the first 30
+    rows when sections are unknown), including the dataframe's own column
+    labels; the row naming the most periods wins.
+
+    Args:
+        df (pandas.DataFrame): The dataframe containing the P&L data.
+        sections (dict, optional): Section boundaries from find_section_boundaries.
+        context (IngestionContext, optional): Shared context with precomputed row data.
+
+    Returns:
+        tuple: (header_row, {column_index: label}); header_row is -1 when the
+        labels come from the dataframe columns and None when nothing was found.
+    """
+    limit = min(30, len(df))
+    if sections:
+        starts = [
+            bounds["start"]
+            for bounds in sections.values()
+            if bounds.get("start") is not None
+        ]
+        if starts:
+            limit = min(limit, min(starts))
+
+    header_row, period_columns = None, {}
+    candidates = [(-1, list(df.columns))]
+    candidates += [(i, df.iloc[i].tolist()) for i in range(limit)]
+    for row_index, cells in candidates:
+        labels = {}
+        for j, cell in enumerate(cells):
+            # The first column holds account names, never periods
+            label = _period_label(cell) if j > 0 else None
+            if label is not None:
+                labels[j] = label
+        if len(labels) > len(period_columns):
+            header_row, period_columns = row_index, labels
+
+    return header_row, period_columns
+
+
+def extract_period_values(df, sections, context: Optional[IngestionContext] = None):
+    """
+    Extract every period column of the report into accounts x periods arrays.
+
+    Account rows are located the same way as in extract_accounts; their
+    values are sliced from the context's numeric matrix for all period
+    columns at once. Section totals, gross profit and net profit fall back
+    to calculated values per period, mirroring the single-period analysis.
+
+    Args:
+        df (pandas.DataFrame): The dataframe containing the P&L data.
+        sections (dict): Section boundaries from find_section_boundaries.
+        context (IngestionContext, optional): Shared context with precomputed row data.
+
+    Returns:
+        dict or None: Period labels and per-section value matrices, or None if
+        no period columns were found.
+    """
+    if context is None:
+        context = IngestionContext.from_dataframe(df)
+
+    header_row, period_columns = find_period_columns(df, sections, context)
+    if not period_columns:
+        return None
+
+    columns = sorted(period_columns)
+    values = context.numeric_values[:, columns]
+    n_periods = len(columns)
+
+    section_values = {}
+    section_totals = {}
+    for section in ACCOUNT_SECTIONS:
+        bounds = sections[section]
+        if bounds["start"] is None or bounds["end"] is None:
             continue
 
-        # Convert row to string for easier processing
-        row_str = " ".join(str(x) for x in row if pd.notna(x)).lower()
-
-        # Skip rows that are likely headers or subtotals
-        if any(keyword in row_str for keyword in ["total", "subtotal"]):
-            # This might be the total row, try to extract the total value
-            for j in range(len(row) - 1, -1, -1):
-                if pd.notna(row.iloc[j]) and (
-                    isinstance(row.iloc[j], (int, float))
-                    or (
-                        isinstance(row.iloc[j], str)
-                        and row.iloc[j]
-                        .replace(".", "", 1)
-                        .replace("-", "", 1)
-                        .isdigit()
-                    )
-                ):
-                    try:
-                        total_value = float(row.iloc[j])
-                        break
-                    except (ValueError, TypeError):
-                        pass
+        section_rows = locate_section_rows(df, bounds["start"], bounds["end"], context)
+        matrix = values[section_rows.account_rows]
+        has_values = ~np.isnan(matrix).all(axis=1)
+        if not has_values.any():
             continue
+        matrix = matrix[has_values]
+
+        # Ensure we have a valid total (not zero or None) for every period
+        totals = _last_values(values[section_rows.total_rows])
+        if len(section_rows.total_rows) == 0:
+            totals = np.full(n_periods, np.nan)
+        calculated = np.nansum(matrix, axis=0)
+        totals = np.where(np.isnan(totals) | (np.abs(totals) < 0.01), calculated, totals)
+
+        section_totals[section] = totals
+        section_values[section] = {
+            "accounts": [n for n, keep in zip(section_rows.names, has_values) if keep],
+            "codes": [c for c, keep in zip(section_rows.codes, has_values) if keep],
+            "values": _to_optional_floats(matrix),
+            "totals": _to_optional_floats(totals),
+        }
 
-        # Extract account details
-        account_name = None
-        account_code = None
-        account_value = None
-
-        # Find account name (usually in the first few columns)
-        for j in range(min(3, len(row))):
-            if (
-                pd.notna(row.iloc[j])
-                and isinstance(row.iloc[j], str)
-                and len(row.iloc[j].strip()) > 0
-            ):
-                account_name = row.iloc[j].strip()
-                break
-
-        # Find account code (usually a numeric code near the name)
-        for j in range(min(3, len(row))):
-            if (
-                pd.notna(row.iloc[j])
-                and isinstance(row.iloc[j], str)
-                and re.match(r"^\d+$", row.iloc[j].strip())
-            ):
-                account_code = row.iloc[j].strip()
-                break
-
-        # Find account value (usually in the last few columns)
-        for j in range(len(row) - 1, max(0, len(row) - 4), -1):
-            if pd.notna(row.iloc[j]) and (
-                isinstance(row.iloc[j], (int, float))
-                or (
-                    isinstance(row.iloc[j], str)
-                    and row.iloc[j].replace(".", "", 1).replace("-", "", 1).isdigit()
-                )
-            ):
-                try:
-                    account_value = float(row.iloc[j])
-                    break
-                except (ValueError, TypeError):
-                    pass
-
-        # Add account to the list if we have both name and value
-        if account_name and account_value is not None:
-            account = {"name": account_name, "value": account_value}
-            if account_code:
-                account["code"] = account_code
-            accounts.append(account)
+    result = {
+        "periods": [period_columns[j] for j in columns],
+        "sections": section_values,
+    }
 
-    return accounts, total_value
+    # Gross and net profit per period, calculated where the row has no figure
+    for profit, (left, right) in PROFIT_LINES.items():
+        row = sections[profit]["row"]
+        if row is None:
+            continue
+
+        extracted = values[row]
+        calculated = np.full(n_periods, np.nan)
+        if left in section_totals and right in section_totals:
+            calculated = section_totals[left] - section_totals[right]
+        profit_values = np.where(
+            np.isnan(extracted) | (np.abs(extracted) < 0.01), calculated, extracted
+        )
+        section_totals[profit] = profit_values
+        result[profit] = _to_optional_floats(profit_values)
 
+    logger.info(
+        f"Extracted {n_periods} period columns from header row {header_row}: {result['periods']}"
+    )
+    return result
 
-def analyze_profit_loss(file_path: str) -> Dict[str, Any]:
+
+def assemble_report(
+    company_name: Optional[str],
+    period: Optional[str],
+    basis_type: str,
+    source: str,
+    section_accounts: Dict[str, Any],
+    profit_values: Dict[str, Optional[float]],
+    engine: Optional[str] = None,
+) -> Dict[str, Any]:
     """
-    Analyze a profit and loss Excel report and extract structured data.
+    Assemble the structured report from extracted sections and profit lines.
 
     Args:
-        file_path (str): Path to the Excel file.
+        company_name (str, optional): Company name from the report header.
+        period (str, optional): Reporting period from the report header.
+        basis_type (str): 'Accrual' or 'Cash'.
+        source (str): File name shown in the metadata.
+        section_accounts (dict): (accounts, total) per extracted account section.
+        profit_values (dict): Extracted value per profit line whose row was found.
+        engine (str, optional): Reader engine that parsed the workbook.
 
     Returns:
         dict: Structured profit and loss data.
+    """
+    # Create result structure
+    result = {
+        "companyName": company_name if company_name else "Unknown Company",
+        "period": period if period else "Unknown Period",
+        "basisType": basis_type,
+        "reportType": "Complete",
+        "sections": {},
+        "metadata": {
+            "uploadDate": datetime.now().strftime("%Y-%m-%d"),
+            "source": source,
+            "currency": "USD",  # Default, could be extracted from the file
+            "engine": engine,
+        },
+    }
+
+    # Sections are filled in report order, so each profit line can fall back
+    # to the figures above it
+    for section in REPORT_SECTIONS:
+        if section in section_accounts:
+            accounts, total = section_accounts[section]
+            if accounts:
+                # Ensure we have a valid total (not zero or None)
+                if total is None or abs(total) < 0.01:
+                    # Calculate the total from accounts
+                    total = sum(account["value"] for account in accounts)
+
+                result["sections"][section] = {"accounts": accounts, "total": total}
+
+        elif section in profit_values:
+            extracted = profit_values[section]
+
+            # Calculate the profit line from the figures above it
+            calculated = None
+            left, right = PROFIT_LINES[section]
+            if left in result["sections"] and right in result["sections"]:
+                left_value = result["sections"][left]
+                right_value = result["sections"][right]["total"]
+                if isinstance(left_value, dict):
+                    left_value = left_value["total"]
+                if left_value is not None and right_value is not None:
+                    calculated = left_value - right_value
+
+            # Use calculated value if extracted is zero or None
+            if extracted is None or abs(extracted) < 0.01:
+                result["sections"][section] = calculated
+            else:
+                result["sections"][section] = extracted
+
+    return result
+
+
+def categorize_report(
+    result: Dict[str, Any],
+    organization_id: Optional[str] = None,
+    mapping_version: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Add categories to the accounts of an assembled report, and the totals
+    and counts of each category under ``categorySummary``.
+
+    Args:
+        result (dict): Structured profit and loss data.
+        organization_id (str, optional): Organization whose category mappings apply.
+        mapping_version (int, optional): Version of those mappings; the latest when not given.
+
+    Returns:
+        dict: The report with categorized accounts, or unchanged on failure.
+    """
+    try:
+        logger.info("Adding categories to accounts")
+        categorizer = categorizer_for(organization_id, mapping_version)
+        result = add_categories_to_accounts(result, categorizer)
+        result["categorySummary"] = summarize_categories(result)
+        logger.info("Categories added successfully")
+    except Exception as e:
+        logger.error(f"Error adding categories to accounts: {str(e)}")
+        logger.error(traceback.format_exc())
+        # Continue without categories rather than failing completely
+        logger.warning("Continuing without account categorization")
+    return result
+
+
+def ensure_valid(
+    file_path: str,
+    context: IngestionContext,
+    in_memory: bool = False,
+    organization_id: Optional[str] = None,
+) -> None:
+    """
+    Validate the Excel file and log any warnings.
+
+    Args:
+        file_path (str): Path to the Excel file.
+        context (IngestionContext): Context holding the rows to validate.
+        in_memory (bool): The workbook is parsed from memory and file_path is only its name.
+        organization_id (str, optional): Organization whose validation rules apply.
 
     Raises:
         ExcelFileValidationError: If the file fails validation
-        ValueError: If the file cannot be processed
-        Exception: For other unexpected errors
     """
-    logger.info(f"Analyzing profit and loss report: {file_path}")
-
-    # Validate the Excel file before processing
-    validation_result = validate_excel_file(file_path)
+    validation_result = validate_excel_file(file_path, context, in_memory, organization_id)
     if not validation_result.is_valid:
         error_msg = "Excel file validation failed: " + "; ".join(
             validation_result.errors
@@ -311,180 +713,147 @@ def analyze_profit_loss(file_path: str) -> Dict[str, Any]:
         for warning in validation_result.warnings:
             logger.warning(f"Validation warning: {warning}")
 
+
+def analyze_profit_loss(
+    file_path: str,
+    multi_period: bool = False,
+    streaming: Optional[bool] = None,
+    progress: Optional[Callable[[str], None]] = None,
+    content: Optional[bytes] = None,
+    engine: Optional[str] = None,
+    sheet_name: Union[str, int] = 0,
+    organization_id: Optional[str] = None,
+    mapping_version: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Analyze a profit and loss Excel report and extract structured data.
+
+    Args:
+        file_path (str): Path to the Excel file, or its name when ``content`` is given.
+        multi_period (bool): Also extract every period column (e.g. monthly
+            columns plus YTD) into the ``periodValues`` field.
+        streaming (bool, optional): Use the streaming read-only reader instead
+            of loading the whole sheet. By default it is used for .xlsx files
+            larger than ``STREAMING_THRESHOLD_MB`` in single-period mode.
+        progress (callable, optional): Called with the name of each stage
+            (validate, parse, sections, accounts, categorize) as it starts.
+        content (bytes, optional): Workbook bytes to parse from memory instead
+            of reading ``file_path`` from disk.
+        engine (str, optional): Reader engine for ``pd.read_excel``; selected
+            from the workbook format when not given. The streaming reader
+            always uses openpyxl.
+        sheet_name (str or int): Name or position of the worksheet to analyze.
+            A named sheet is reported as ``metadata.sheet``.
+        organization_id (str, optional): Organization whose validation rules
+            and category mappings apply.
+        mapping_version (int, optional): Version of the organization's
+            category mappings; the latest when not given.
+
+    Returns:
+        dict: Structured profit and loss data.
+
+    Raises:
+        ExcelFileValidationError: If the file fails validation
+        ValueError: If the file cannot be processed
+        Exception: For other unexpected errors
+    """
+    logger.info(f"Analyzing profit and loss report: {file_path}")
+
+    in_memory = content is not None
+    if streaming is None:
+        if in_memory:
+            size = len(content)
+        else:
+            size = os.path.getsize(file_path) if os.path.exists(file_path) else 0
+        streaming = (
+            not multi_period
+            and file_path.lower().endswith(".xlsx")
+            and size > settings.STREAMING_THRESHOLD_MB * 1024 * 1024
+        )
+    if streaming:
+        # Imported here because the streaming reader builds on this module
+        from app.core.streaming import analyze_profit_loss_streaming
+
+        result = analyze_profit_loss_streaming(
+            file_path, progress, content, sheet_name, organization_id, mapping_version
+        )
+        if isinstance(sheet_name, str):
+            result["metadata"]["sheet"] = sheet_name
+        return result
+
+    report_stage = progress or (lambda stage: None)
+
+    # Parse the workbook once and share it between validation and analysis
+    context = IngestionContext(
+        file_path=file_path, content=content, engine=engine, sheet_name=sheet_name
+    )
+
+    # Validate the Excel file before processing
+    report_stage("validate")
+    ensure_valid(file_path, context, in_memory, organization_id)
+
     try:
-        # Read the Excel file
-        logger.debug(f"Reading Excel file: {file_path}")
-        df = pd.read_excel(file_path)
-        logger.debug(f"Excel file read successfully, shape: {df.shape}")
+        # Reuse the frame parsed during validation
+        report_stage("parse")
+        df = context.df
 
         # Extract company name and period
-        company_name, period = extract_company_and_period(df)
+        company_name, period = extract_company_and_period(df, context)
         logger.info(f"Extracted company: {company_name}, period: {period}")
 
         # Identify basis type (Accrual or Cash)
-        basis_type = identify_basis_type(df)
+        basis_type = identify_basis_type(df, context)
         logger.info(f"Identified basis type: {basis_type}")
 
         # Find section boundaries
-        sections = find_section_boundaries(df)
+        report_stage("sections")
+        sections = find_section_boundaries(df, context)
         logger.info(f"Found section boundaries: {sections}")
     except Exception as e:
         logger.error(f"Error during initial analysis of {file_path}: {str(e)}")
         logger.error(traceback.format_exc())
         raise
 
-    # Create result structure
-    result = {
-        "companyName": company_name if company_name else "Unknown Company",
-        "period": period if period else "Unknown Period",
-        "basisType": basis_type,
-        "reportType": "Complete",
-        "sections": {},
-        "metadata": {
-            "uploadDate": datetime.now().strftime("%Y-%m-%d"),
-            "source": os.path.basename(file_path),
-            "currency": "USD",  # Default, could be extracted from the file
-        },
+    # Extract account sections and profit lines
+    report_stage("accounts")
+    section_accounts = {}
+    for section in ACCOUNT_SECTIONS:
+        bounds = sections[section]
+        if bounds["start"] is not None and bounds["end"] is not None:
+            section_accounts[section] = extract_accounts(
+                df, bounds["start"], bounds["end"], context
+            )
+
+    profit_values = {
+        profit: extract_row_value(df, sections[profit]["row"], context)
+        for profit in PROFIT_LINES
+        if sections[profit]["row"] is not None
     }
 
-    # Extract trading income
-    if (
-        sections["tradingIncome"]["start"] is not None
-        and sections["tradingIncome"]["end"] is not None
-    ):
-        accounts, total = extract_accounts(
-            df, sections["tradingIncome"]["start"], sections["tradingIncome"]["end"]
-        )
-        if accounts:
-            # Ensure we have a valid total (not zero or None)
-            if total is None or abs(total) < 0.01:
-                # Calculate the total from accounts
-                total = sum(account["value"] for account in accounts)
-
-            result["sections"]["tradingIncome"] = {"accounts": accounts, "total": total}
-
-    # Extract cost of sales
-    if (
-        sections["costOfSales"]["start"] is not None
-        and sections["costOfSales"]["end"] is not None
-    ):
-        accounts, total = extract_accounts(
-            df, sections["costOfSales"]["start"], sections["costOfSales"]["end"]
-        )
-        if accounts:
-            # Ensure we have a valid total (not zero or None)
-            if total is None or abs(total) < 0.01:
-                # Calculate the total from accounts
-                total = sum(account["value"] for account in accounts)
-
-            result["sections"]["costOfSales"] = {"accounts": accounts, "total": total}
-
-    # Extract gross profit
-    if sections["grossProfit"]["row"] is not None:
-        row = df.iloc[sections["grossProfit"]["row"]]
-        gross_profit_extracted = None
-
-        # Try to extract gross profit from the row
-        for i in range(len(row) - 1, -1, -1):
-            if pd.notna(row.iloc[i]) and (
-                isinstance(row.iloc[i], (int, float))
-                or (
-                    isinstance(row.iloc[i], str)
-                    and row.iloc[i].replace(".", "", 1).replace("-", "", 1).isdigit()
-                )
-            ):
-                try:
-                    gross_profit_extracted = float(row.iloc[i])
-                    break
-                except (ValueError, TypeError):
-                    pass
-
-        # Calculate gross profit from income and cost of sales
-        gross_profit_calculated = None
-        if (
-            "tradingIncome" in result["sections"]
-            and "costOfSales" in result["sections"]
-        ):
-            income_total = result["sections"]["tradingIncome"]["total"]
-            cost_total = result["sections"]["costOfSales"]["total"]
-            if income_total is not None and cost_total is not None:
-                gross_profit_calculated = income_total - cost_total
-
-        # Use calculated value if extracted is zero or None
-        if gross_profit_extracted is None or abs(gross_profit_extracted) < 0.01:
-            result["sections"]["grossProfit"] = gross_profit_calculated
+    result = assemble_report(
+        company_name,
+        period,
+        basis_type,
+        os.path.basename(file_path),
+        section_accounts,
+        profit_values,
+        context.engine,
+    )
+
+    # Extract every period column in one pass
+    if multi_period:
+        period_values = extract_period_values(df, sections, context)
+        if period_values:
+            result["periodValues"] = period_values
         else:
-            result["sections"]["grossProfit"] = gross_profit_extracted
+            logger.warning("Multi-period analysis requested but no period columns found")
 
-    # Extract operating expenses
-    if (
-        sections["operatingExpenses"]["start"] is not None
-        and sections["operatingExpenses"]["end"] is not None
-    ):
-        accounts, total = extract_accounts(
-            df,
-            sections["operatingExpenses"]["start"],
-            sections["operatingExpenses"]["end"],
-        )
-        if accounts:
-            # Ensure we have a valid total (not zero or None)
-            if total is None or abs(total) < 0.01:
-                # Calculate the total from accounts
-                total = sum(account["value"] for account in accounts)
-
-            result["sections"]["operatingExpenses"] = {
-                "accounts": accounts,
-                "total": total,
-            }
-
-    # Extract net profit
-    if sections["netProfit"]["row"] is not None:
-        row = df.iloc[sections["netProfit"]["row"]]
-        net_profit_extracted = None
-
-        # Try to extract net profit from the row
-        for i in range(len(row) - 1, -1, -1):
-            if (
-                pd.notna(row.iloc[i])
-                and isinstance(row.iloc[i], (int, float))
-                or (
-                    isinstance(row.iloc[i], str)
-                    and row.iloc[i].replace(".", "", 1).replace("-", "", 1).isdigit()
-                )
-            ):
-                try:
-                    net_profit_extracted = float(row.iloc[i])
-                    break
-                except (ValueError, TypeError):
-                    pass
-
-        # Calculate net profit from gross profit and operating expenses
-        net_profit_calculated = None
-        if (
-            "grossProfit" in result["sections"]
-            and "operatingExpenses" in result["sections"]
-        ):
-            gross_profit = result["sections"]["grossProfit"]
-            operating_expenses_total = result["sections"]["operatingExpenses"]["total"]
-            if gross_profit is not None and operating_expenses_total is not None:
-                net_profit_calculated = gross_profit - operating_expenses_total
-
-        # Use calculated value if extracted is zero or None
-        if net_profit_extracted is None or abs(net_profit_extracted) < 0.01:
-            result["sections"]["netProfit"] = net_profit_calculated
-        else:
-            result["sections"]["netProfit"] = net_profit_extracted
+    if isinstance(sheet_name, str):
+        result["metadata"]["sheet"] = sheet_name
 
     # Add categories to accounts
-    try:
-        logger.info("Adding categories to accounts")
-        result = add_categories_to_accounts(result)
-        logger.info("Categories added successfully")
-    except Exception as e:
-        logger.error(f"Error adding categories to accounts: {str(e)}")
-        logger.error(traceback.format_exc())
-        # Continue without categories rather than failing completely
-        logger.warning("Continuing without account categorization")
+    report_stage("categorize")
+    result = categorize_report(result, organization_id, mapping_version)
 
     logger.info("Analysis completed successfully")
     return result
@@ -0,0 +1,191 @@
+"""
+Balance sheet analysis.
+
+Balance sheets are parsed with the same section machinery as profit and loss
+reports, driven by balance sheet section keywords. Their figures supply the
+inputs of the return and liquidity ratios (ROE, ROA, current and quick
+ratios), which a profit and loss report alone cannot provide.
+"""
+
+import os
+from datetime import datetime
+from typing import Any, Dict, Optional, Union
+
+from app.core.analyzer import (
+    extract_accounts,
+    extract_company_and_period,
+    extract_row_value,
+    find_section_boundaries,
+)
+from app.core.ingestion import IngestionContext
+from app.utils.keywords import (
+    BALANCE_SHEET_EXCLUDED_KEYWORDS,
+    BALANCE_SHEET_KEYWORDS,
+    INVENTORY_KEYWORDS,
+)
+from app.utils.logger import app_logger
+
+# Configure module-specific logger
+logger = app_logger.getChild("balance_sheet")
+
+# Sections holding account lists; the other sections are single total rows
+BALANCE_SHEET_ACCOUNT_SECTIONS = [
+    "currentAssets",
+    "nonCurrentAssets",
+    "currentLiabilities",
+    "nonCurrentLiabilities",
+    "equity",
+]
+
+# Pattern used to recognise balance sheet title rows
+BALANCE_SHEET_TITLE_PATTERN = r"(?:balance sheet|statement of financial position)"
+
+
+def _section_total(sections: Dict[str, Any], section: str) -> Optional[float]:
+    """Get the total of an account section, or None if it was not found."""
+    data = sections.get(section)
+    return data["total"] if data else None
+
+
+def _sum_known(*values: Optional[float]) -> Optional[float]:
+    """Add the values that are known, or None if none is."""
+    known = [value for value in values if value is not None]
+    return sum(known) if known else None
+
+
+def balance_sheet_figures(sections: Dict[str, Any]) -> Dict[str, Optional[float]]:
+    """
+    Derive the ratio inputs from the extracted balance sheet sections.
+
+    Totals printed on the report are preferred. Current assets are total
+    assets less non-current assets when both are known, so asset groups
+    listed outside a "Current Assets" heading, such as Xero's "Bank", are
+    counted.
+
+    Args:
+        sections (dict): Extracted sections, as returned in ``sections`` by
+            ``analyze_balance_sheet``.
+
+    Returns:
+        dict: Total assets, liabilities and equity, current assets and
+        liabilities, and inventory; None where a figure is not available.
+    """
+    non_current_assets = _section_total(sections, "nonCurrentAssets")
+
+    total_assets = sections.get("totalAssets")
+    if total_assets is None:
+        total_assets = _sum_known(_section_total(sections, "currentAssets"), non_current_assets)
+
+    total_liabilities = sections.get("totalLiabilities")
+    if total_liabilities is None:
+        total_liabilities = _sum_known(
+            _section_total(sections, "currentLiabilities"),
+            _section_total(sections, "nonCurrentLiabilities"),
+        )
+
+    total_equity = _section_total(sections, "equity")
+    if total_equity is None and total_assets is not None and total_liabilities is not None:
+        total_equity = total_assets - total_liabilities
+
+    if total_assets is not None and non_current_assets is not None:
+        current_assets = total_assets - non_current_assets
+    else:
+        current_assets = _section_total(sections, "currentAssets")
+
+    inventory = None
+    if "currentAssets" in sections:
+        inventory = sum(
+            account["value"]
+            for account in sections["currentAssets"]["accounts"]
+            if any(keyword in account["name"].lower() for keyword in INVENTORY_KEYWORDS)
+        )
+
+    return {
+        "totalAssets": total_assets,
+        "totalLiabilities": total_liabilities,
+        "totalEquity": total_equity,
+        "currentAssets": current_assets,
+        "currentLiabilities": _section_total(sections, "currentLiabilities"),
+        "inventory": inventory,
+    }
+
+
+def analyze_balance_sheet(
+    file_path: str,
+    content: Optional[bytes] = None,
+    engine: Optional[str] = None,
+    sheet_name: Union[str, int] = 0,
+) -> Dict[str, Any]:
+    """
+    Analyze a balance sheet Excel report and extract structured data.
+
+    Args:
+        file_path (str): Path to the Excel file, or its name when ``content`` is given.
+        content (bytes, optional): Workbook bytes to parse from memory instead
+            of reading ``file_path`` from disk.
+        engine (str, optional): Reader engine for ``pd.read_excel``; selected
+            from the workbook format when not given.
+        sheet_name (str or int): Name or position of the worksheet to analyze.
+
+    Returns:
+        dict: Structured balance sheet data with its ratio inputs under ``figures``.
+
+    Raises:
+        ValueError: If no asset, liability or equity section is found.
+    """
+    logger.info(f"Analyzing balance sheet: {file_path}")
+
+    context = IngestionContext(
+        file_path=file_path, content=content, engine=engine, sheet_name=sheet_name
+    )
+    df = context.df
+
+    company_name, period = extract_company_and_period(
+        df, context, BALANCE_SHEET_TITLE_PATTERN
+    )
+    boundaries = find_section_boundaries(
+        df,
+        context,
+        BALANCE_SHEET_KEYWORDS,
+        BALANCE_SHEET_ACCOUNT_SECTIONS,
+        BALANCE_SHEET_EXCLUDED_KEYWORDS,
+    )
+    logger.info(f"Found balance sheet section boundaries: {boundaries}")
+
+    sections: Dict[str, Any] = {}
+    for section, bounds in boundaries.items():
+        if section in BALANCE_SHEET_ACCOUNT_SECTIONS:
+            if bounds["start"] is None or bounds["end"] is None:
+                continue
+            accounts, total = extract_accounts(df, bounds["start"], bounds["end"], context)
+            if not accounts:
+                continue
+            # Ensure we have a valid total (not zero or None)
+            if total is None or abs(total) < 0.01:
+                total = sum(account["value"] for account in accounts)
+            sections[section] = {"accounts": accounts, "total": total}
+        elif bounds["row"] is not None:
+            value = extract_row_value(df, bounds["row"], context)
+            if value is not None:
+                sections[section] = value
+
+    if not sections:
+        raise ValueError("Invalid balance sheet: no asset, liability or equity sections found")
+
+    metadata = {
+        "uploadDate": datetime.now().strftime("%Y-%m-%d"),
+        "source": os.path.basename(file_path),
+        "currency": "USD",  # Default, could be extracted from the file
+        "engine": context.engine,
+    }
+    if isinstance(sheet_name, str):
+        metadata["sheet"] = sheet_name
+
+    logger.info("Balance sheet analysis completed successfully")
+    return {
+        "companyName": company_name if company_name else "Unknown Company",
+        "period": period if period else "Unknown Period",
+        "sections": sections,
+        "figures": balance_sheet_figures(sections),
+        "metadata": metadata,
+    }
@@ -0,0 +1,188 @@
+"""
+Content-addressed cache of profit and loss analysis results.
+
+Results are keyed on the SHA-256 of the uploaded workbook bytes together with
+the analyzer and categorizer versions and the analysis options, so re-uploading
+the same file returns the stored result instead of analyzing it again. Entries
+live in an in-process LRU tier and, when ``CACHE_DIR`` is set, in an on-disk
+tier shared across restarts and workers. Both tiers expire entries after
+``CACHE_TTL_HOURS``.
+"""
+
+import copy
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from app.core.analyzer import ANALYZER_VERSION
+from app.core.config import settings
+from app.utils.categorization import CATEGORIZER_VERSION
+from app.utils.logger import app_logger
+
+# Configure module-specific logger
+logger = app_logger.getChild("cache")
+
+
+def content_key(content: bytes, **options: Any) -> str:
+    """
+    Build the cache key for a workbook and the options it is analyzed with.
+
+    Args:
+        content: Raw bytes of the uploaded workbook.
+        **options: Analysis options that change the result (e.g. ``multi_period``).
+
+    Returns:
+        Hex digest identifying the analysis result.
+    """
+    return digest_key(hashlib.sha256(content).hexdigest(), **options)
+
+
+def digest_key(digest: str, **options: Any) -> str:
+    """
+    Build the cache key from an already computed SHA-256 of the workbook.
+
+    Args:
+        digest: Hex SHA-256 digest of the workbook bytes.
+        **options: Analysis options that change the result.
+
+    Returns:
+        Hex digest identifying the analysis result.
+    """
+    stamp = f"analyzer={ANALYZER_VERSION};categorizer={CATEGORIZER_VERSION}"
+    flags = ";".join(f"{name}={options[name]}" for name in sorted(options))
+    return hashlib.sha256(f"{digest}|{stamp}|{flags}".encode()).hexdigest()
+
+
+class ResultCache:
+    """
+    Two-tier LRU and on-disk cache of analysis results.
+
+    Stored and returned results are deep copies, so callers may modify what
+    they get back without affecting the cache.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 128,
+        ttl_seconds: float = 24 * 3600,
+        cache_dir: Optional[str] = None,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of results kept in memory.
+            ttl_seconds: Age after which an entry is discarded.
+            cache_dir: Directory for the on-disk tier, or None to disable it.
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        if self.cache_dir is not None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def _expired(self, stored_at: float) -> bool:
+        """Check whether an entry stored at the given time has outlived the TTL."""
+        return time.time() - stored_at > self.ttl_seconds
+
+    def _disk_path(self, key: str) -> Path:
+        """Path of the on-disk entry for a key."""
+        return self.cache_dir / f"{key}.json"
+
+    def _remember(self, key: str, stored_at: float, result: Dict[str, Any]) -> None:
+        """Insert an entry into the in-memory tier, evicting the least recently used."""
+        with self._lock:
+            self._entries[key] = (stored_at, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a result.
+
+        Args:
+            key: Key returned by ``content_key``.
+
+        Returns:
+            A copy of the cached result, or None on a miss.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if self._expired(entry[0]):
+                    del self._entries[key]
+                    entry = None
+                else:
+                    self._entries.move_to_end(key)
+
+        if entry is not None:
+            return copy.deepcopy(entry[1])
+
+        if self.cache_dir is None:
+            return None
+
+        path = self._disk_path(key)
+        try:
+            stored_at = path.stat().st_mtime
+            if self._expired(stored_at):
+                path.unlink(missing_ok=True)
+                return None
+            with open(path, "r", encoding="utf-8") as f:
+                result = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not read cached result {path}: {str(e)}")
+            return None
+
+        self._remember(key, stored_at, result)
+        return copy.deepcopy(result)
+
+    def set(self, key: str, result: Dict[str, Any]) -> None:
+        """
+        Store a result in both tiers.
+
+        Args:
+            key: Key returned by ``content_key``.
+            result: The analysis result.
+        """
+        stored_at = time.time()
+        self._remember(key, stored_at, copy.deepcopy(result))
+
+        if self.cache_dir is None:
+            return
+
+        # Write to a temporary file first so readers never see a partial entry
+        try:
+            fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(result, f, default=str)
+            os.replace(temp_path, self._disk_path(key))
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning(f"Could not write cached result for {key}: {str(e)}")
+
+    def clear(self) -> None:
+        """Remove every entry from both tiers."""
+        with self._lock:
+            self._entries.clear()
+        if self.cache_dir is not None:
+            for path in self.cache_dir.glob("*.json"):
+                path.unlink(missing_ok=True)
+
+
+# Shared cache configured from the application settings
+result_cache = ResultCache(
+    max_entries=settings.CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.CACHE_TTL_HOURS * 3600,
+    cache_dir=settings.CACHE_DIR,
+)
@@ -39,6 +39,51 @@ class Settings(BaseSettings):
     
     # Cache settings
     CACHE_TTL_HOURS: int = 24
+    # Analysis results kept in memory, and optional directory for the on-disk tier
+    CACHE_MAX_ENTRIES: int = 128
+    CACHE_DIR: Optional[str] = None
+    
+    # Analysis worker pool: process count (CPU count when unset, 0 for a thread),
+    # jobs admitted beyond the running ones, per-job timeout, jobs per worker
+    ANALYSIS_WORKERS: Optional[int] = None
+    ANALYSIS_QUEUE_SIZE: int = 16
+    ANALYSIS_TIMEOUT_SECONDS: float = 120
+    ANALYSIS_MAX_TASKS_PER_WORKER: int = 50
+    
+    # Upload job store (SQLite file, temp directory when unset) and how long finished jobs are kept
+    JOB_STORE_PATH: Optional[str] = None
+    JOB_RETENTION_HOURS: int = 24
+    
+    # Uploads larger than this are streamed to a temporary file instead of kept in memory
+    UPLOAD_MEMORY_LIMIT_MB: int = 32
+    
+    # Most workbooks accepted by one batch upload, counting those inside ZIP archives
+    BATCH_MAX_FILES: int = 100
+    # Most bytes extracted from the ZIP archives of one batch upload, by declared member size
+    BATCH_MAX_EXTRACTED_MB: int = 1024
+    
+    # Excel reader engine per format ("calamine", "openpyxl", "xlrd"); unset or "auto"
+    # picks the fastest installed one, measured at startup when benchmarking is enabled
+    EXCEL_ENGINE_XLSX: Optional[str] = None
+    EXCEL_ENGINE_XLS: Optional[str] = None
+    EXCEL_ENGINE_BENCHMARK: bool = False
+    
+    # JSON file with validation rule overrides per organization (registry defaults when unset)
+    VALIDATION_RULES_PATH: Optional[str] = None
+    
+    # Account categorization results memoized by name, code and section
+    CATEGORIZER_CACHE_SIZE: int = 8192
+    # Per-organization category mappings store (SQLite file, temp directory when unset)
+    MAPPING_STORE_PATH: Optional[str] = None
+    
+    # Incrementally maintained metric aggregates (SQLite file, temp directory when unset)
+    # and the first month of the fiscal year that YTD totals run from
+    AGGREGATE_STORE_PATH: Optional[str] = None
+    FISCAL_YEAR_START_MONTH: int = Field(default=1, ge=1, le=12)
+    
+    # Analyzer settings
+    # .xlsx uploads larger than this are analyzed with the streaming read-only reader
+    STREAMING_THRESHOLD_MB: int = 20
     
     # Configure environment variables file
     model_config = SettingsConfigDict(
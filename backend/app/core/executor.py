@@ -0,0 +1,231 @@
+"""
+Process-pool execution of CPU-bound analysis jobs.
+
+Workbook analysis is CPU-bound and synchronous, so running it inside an
+``async def`` endpoint blocks the event loop for every other request. This
+module runs such jobs in a pool of worker processes so they scale across cores
+and keep the loop responsive. The pool admits a bounded number of jobs, gives
+up waiting on a job after a timeout, and replaces each worker after a fixed
+number of jobs to cap memory growth. Workers still running a timed-out job are
+terminated once the other jobs of their pool are done.
+"""
+
+import asyncio
+import os
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional, Set
+
+from app.core.config import settings
+from app.utils.logger import app_logger
+
+# Configure module-specific logger
+logger = app_logger.getChild("executor")
+
+
+class AnalysisQueueFullError(Exception):
+    """Exception raised when too many analysis jobs are already pending."""
+
+    pass
+
+
+class AnalysisTimeoutError(Exception):
+    """Exception raised when an analysis job does not finish in time."""
+
+    pass
+
+
+def _terminate_workers(pool: Executor) -> None:
+    """Shut a pool down and stop its worker processes, including busy ones."""
+    terminate = getattr(pool, "terminate_workers", None)
+    if terminate is not None:
+        # Python 3.14 and later
+        terminate()
+        return
+
+    # Earlier versions have no public way to stop running workers
+    processes = getattr(pool, "_processes", None)
+    pool.shutdown(wait=False, cancel_futures=True)
+    if not isinstance(processes, dict):
+        logger.error(
+            "Cannot terminate stuck analysis workers on this Python version; "
+            "their jobs keep their slots until they end"
+        )
+        return
+    for process in list(processes.values()):
+        process.terminate()
+
+
+class AnalysisExecutor:
+    """
+    Bounded process pool for analysis jobs.
+
+    Up to ``workers + queue_size`` jobs are admitted at once; further jobs are
+    rejected immediately instead of piling up. A slot is only released when
+    the job really finishes in its worker, so jobs that timed out still count
+    against the bound until their worker is free again.
+
+    A job that times out while running cannot be stopped on its own, so its
+    pool is retired: new jobs go to a fresh pool, and once every other job of
+    the retired pool has finished, its workers are terminated. That fails the
+    timed-out jobs and frees their slots. Jobs on the in-process thread pool
+    cannot be terminated and keep their slot until they return.
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        queue_size: int = 16,
+        timeout_seconds: float = 120,
+        max_tasks_per_worker: Optional[int] = 50,
+    ):
+        """
+        Initialize the executor. The worker pool is started on first use.
+
+        Args:
+            workers: Number of worker processes, defaulting to the CPU count.
+                Zero runs jobs on a thread pool in this process instead.
+            queue_size: Jobs admitted beyond the ones being executed.
+            timeout_seconds: Time to wait for a job before giving up on it.
+            max_tasks_per_worker: Jobs a worker runs before it is replaced,
+                or None to keep workers for the lifetime of the pool.
+        """
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.queue_size = queue_size
+        self.timeout_seconds = timeout_seconds
+        self.max_tasks_per_worker = max_tasks_per_worker
+        self._pool: Optional[Executor] = None
+        self._pool_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max(self.workers, 1) + queue_size)
+        # Unfinished jobs per pool, and the timed-out jobs of retired pools
+        self._jobs: Dict[Executor, Set[Future]] = {}
+        self._stuck: Dict[Executor, Set[Future]] = {}
+
+    def _get_pool(self) -> Executor:
+        """Get the worker pool, starting a new one if needed."""
+        with self._pool_lock:
+            if self._pool is None:
+                if self.workers == 0:
+                    logger.info("Running analysis jobs on an in-process thread pool")
+                    self._pool = ThreadPoolExecutor(thread_name_prefix="analysis")
+                else:
+                    logger.info(
+                        f"Starting analysis pool with {self.workers} workers "
+                        f"(queue size {self.queue_size})"
+                    )
+                    self._pool = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        max_tasks_per_child=self.max_tasks_per_worker,
+                    )
+            return self._pool
+
+    def _discard_pool(self, pool: Executor) -> None:
+        """Drop a broken pool so the next job starts a fresh one."""
+        with self._pool_lock:
+            if self._pool is pool:
+                self._pool = None
+            self._jobs.pop(pool, None)
+            self._stuck.pop(pool, None)
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def _job_done(self, pool: Executor, job: Future) -> None:
+        """Free the slot of a finished job and reap its pool if it was retired."""
+        self._slots.release()
+        with self._pool_lock:
+            jobs = self._jobs.get(pool)
+            if jobs is not None:
+                jobs.discard(job)
+        self._reap_pool(pool)
+
+    def _retire_pool(self, pool: Executor, job: Future) -> None:
+        """Stop sending jobs to a pool whose worker is stuck on a timed-out job."""
+        with self._pool_lock:
+            if self._pool is pool:
+                self._pool = None
+            self._stuck.setdefault(pool, set()).add(job)
+        self._reap_pool(pool)
+
+    def _reap_pool(self, pool: Executor) -> None:
+        """Terminate a retired pool once only its timed-out jobs are left."""
+        with self._pool_lock:
+            stuck = self._stuck.get(pool)
+            if stuck is None or not self._jobs.get(pool, set()) <= stuck:
+                return
+            del self._stuck[pool]
+            remaining = self._jobs.pop(pool, set())
+
+        if remaining:
+            logger.warning(f"Terminating analysis workers stuck on {len(remaining)} timed-out jobs")
+        _terminate_workers(pool)
+
+    async def run(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        Run a job in the pool and wait for its result.
+
+        Args:
+            func: Module-level function to run; it and its arguments must be picklable.
+            *args: Positional arguments for the function.
+            **kwargs: Keyword arguments for the function.
+
+        Returns:
+            The function's return value.
+
+        Raises:
+            AnalysisQueueFullError: If the pool has no free slot
+            AnalysisTimeoutError: If the job does not finish within the timeout
+        """
+        if not self._slots.acquire(blocking=False):
+            raise AnalysisQueueFullError("Too many analysis jobs are pending; try again shortly")
+
+        pool = self._get_pool()
+        try:
+            job = pool.submit(func, *args, **kwargs)
+        except BrokenProcessPool:
+            self._slots.release()
+            self._discard_pool(pool)
+            raise
+        except BaseException:
+            self._slots.release()
+            raise
+        with self._pool_lock:
+            self._jobs.setdefault(pool, set()).add(job)
+        job.add_done_callback(lambda done: self._job_done(pool, done))
+        waiter = asyncio.wrap_future(job)
+
+        try:
+            # Shield the job so a timeout only stops waiting for it
+            return await asyncio.wait_for(asyncio.shield(waiter), self.timeout_seconds)
+        except asyncio.TimeoutError:
+            # Nobody waits for the job any more, so its outcome is not worth reporting
+            waiter.add_done_callback(lambda done: done.cancelled() or done.exception())
+            # Drop the job if it is still queued; a running job keeps its slot until
+            # its worker is terminated
+            if not job.cancel() and isinstance(pool, ProcessPoolExecutor):
+                self._retire_pool(pool, job)
+            logger.error(f"Analysis job {getattr(func, '__name__', func)} timed out")
+            raise AnalysisTimeoutError(
+                f"Analysis did not finish within {self.timeout_seconds} seconds"
+            )
+        except BrokenProcessPool:
+            logger.error("Analysis worker died unexpectedly; restarting the pool")
+            self._discard_pool(pool)
+            raise
+
+    def shutdown(self) -> None:
+        """Stop the worker pool, cancelling jobs that have not started."""
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+            self._jobs.clear()
+            self._stuck.clear()
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+# Shared executor configured from the application settings
+analysis_executor = AnalysisExecutor(
+    workers=settings.ANALYSIS_WORKERS,
+    queue_size=settings.ANALYSIS_QUEUE_SIZE,
+    timeout_seconds=settings.ANALYSIS_TIMEOUT_SECONDS,
+    max_tasks_per_worker=settings.ANALYSIS_MAX_TASKS_PER_WORKER,
+)
@@ -0,0 +1,470 @@
+"""
+Workbook ingestion for profit and loss reports.
+
+This module provides the ingestion context that parses an Excel workbook
+once and shares the resulting frame, plus derived per-row and per-column
+data, between validation, section detection, account extraction and
+categorization.
+"""
+
+import io
+from typing import Dict, Iterable, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import (
+    is_bool_dtype,
+    is_numeric_dtype,
+    is_object_dtype,
+    is_string_dtype,
+)
+
+from app.core.engines import select_engine
+from app.utils.keywords import KEYWORD_MATCHER
+from app.utils.logger import app_logger
+
+# Configure module-specific logger
+logger = app_logger.getChild("ingestion")
+
+# Rows at the top of a sheet that hold the report header and first sections,
+# enough for keyword validation and company, period and basis detection
+HEADER_WINDOW_ROWS = 30
+
+# Column roles inferred by SheetProfile
+ROLE_NAME = "name"
+ROLE_CODE = "code"
+ROLE_VALUE = "value"
+ROLE_OTHER = "other"
+ROLE_EMPTY = "empty"
+
+# Leading columns where account names and codes are looked for
+LABEL_COLUMNS = 3
+
+# Share of a column's non-empty cells needed to give it a role
+ROLE_THRESHOLD = 0.5
+CODE_THRESHOLD = 0.9
+
+
+class IngestionContext:
+    """
+    Parsed profit and loss workbook shared across the analysis pipeline.
+
+    The workbook is read lazily on first access to ``df`` and cached, so
+    every stage that receives the same context works on a single parse.
+    """
+
+    def __init__(
+        self,
+        file_path: Optional[str] = None,
+        df: Optional[pd.DataFrame] = None,
+        content: Optional[bytes] = None,
+        engine: Optional[str] = None,
+        sheet_name: Union[str, int] = 0,
+    ):
+        """
+        Initialize the ingestion context.
+
+        Args:
+            file_path: Path to the Excel file to parse on first use.
+            df: An already parsed dataframe, used instead of reading the file.
+            content: Workbook bytes parsed from memory instead of reading
+                ``file_path``, which then only names the workbook.
+            engine: Reader engine for ``pd.read_excel``; selected from the
+                workbook format when not given.
+            sheet_name: Name or position of the worksheet to read.
+
+        Raises:
+            ValueError: If neither a file path nor a dataframe is provided.
+        """
+        if file_path is None and df is None and content is None:
+            raise ValueError("Either file_path, df or content must be provided")
+
+        self.file_path = file_path
+        self.content = content
+        self.engine = engine
+        self.sheet_name = sheet_name
+        if engine is None and df is None and file_path is not None:
+            self.engine = select_engine(file_path)
+        self._df = df
+        self._header_window: Optional[pd.DataFrame] = None
+        self._row_texts: Optional[pd.Series] = None
+        self._row_texts_lower: Optional[pd.Series] = None
+        self._keyword_hits: Dict[str, np.ndarray] = {}
+        self._keyword_rows: Optional[Dict[str, List[int]]] = None
+        self._numeric_values: Optional[np.ndarray] = None
+        self._profile: Optional["SheetProfile"] = None
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame) -> "IngestionContext":
+        """
+        Create a context around an already parsed dataframe.
+
+        Args:
+            df: The dataframe containing the P&L data.
+
+        Returns:
+            IngestionContext wrapping the dataframe.
+        """
+        return cls(df=df)
+
+    @property
+    def df(self) -> pd.DataFrame:
+        """The parsed worksheet, read from disk on first access."""
+        if self._df is None:
+            logger.debug(f"Reading Excel file: {self.file_path} (engine: {self.engine})")
+            if self.content is not None:
+                source = io.BytesIO(self.content)
+            else:
+                source = self.file_path
+            self._df = pd.read_excel(source, sheet_name=self.sheet_name, engine=self.engine)
+            logger.debug(f"Excel file read successfully, shape: {self._df.shape}")
+        return self._df
+
+    @property
+    def is_parsed(self) -> bool:
+        """Whether the full sheet has already been parsed."""
+        return self._df is not None
+
+    def header_window(self) -> pd.DataFrame:
+        """
+        Get the first ``HEADER_WINDOW_ROWS`` rows of the sheet.
+
+        If the full sheet has not been parsed yet, only these rows are read
+        (``nrows``), so a file can be checked without parsing all of it.
+
+        Returns:
+            DataFrame with at most ``HEADER_WINDOW_ROWS`` rows.
+        """
+        if self._df is not None:
+            return self._df.iloc[:HEADER_WINDOW_ROWS]
+
+        if self._header_window is None:
+            logger.debug(f"Reading header window of Excel file: {self.file_path}")
+            source = io.BytesIO(self.content) if self.content is not None else self.file_path
+            self._header_window = pd.read_excel(
+                source, sheet_name=self.sheet_name, engine=self.engine, nrows=HEADER_WINDOW_ROWS
+            )
+        return self._header_window
+
+    @property
+    def row_texts(self) -> pd.Series:
+        """Space-joined text of the non-empty cells of each row, indexed by row position."""
+        if self._row_texts is None:
+            self._row_texts = build_row_texts(self.df)
+        return self._row_texts
+
+    @property
+    def row_texts_lower(self) -> pd.Series:
+        """Lowercase variant of ``row_texts`` used for keyword matching."""
+        if self._row_texts_lower is None:
+            self._row_texts_lower = self.row_texts.str.lower()
+        return self._row_texts_lower
+
+    @property
+    def numeric_values(self) -> np.ndarray:
+        """Float matrix of the sheet with NaN wherever a cell is not a number."""
+        if self._numeric_values is None:
+            self._numeric_values = build_numeric_values(self.df)
+        return self._numeric_values
+
+    @property
+    def profile(self) -> "SheetProfile":
+        """Per-column statistics and roles of the sheet, built from ``numeric_values``."""
+        if self._profile is None:
+            self._profile = SheetProfile.from_dataframe(self.df, self.numeric_values)
+        return self._profile
+
+    @property
+    def keyword_rows(self) -> Dict[str, List[int]]:
+        """Row positions of every shared-matcher keyword, from one scan per row."""
+        if self._keyword_rows is None:
+            keyword_rows: Dict[str, List[int]] = {}
+            for i, text in enumerate(self.row_texts_lower):
+                for keyword in KEYWORD_MATCHER.find_all(text):
+                    keyword_rows.setdefault(keyword, []).append(i)
+            self._keyword_rows = keyword_rows
+        return self._keyword_rows
+
+    def keyword_hits(self, keywords: Iterable[str]) -> pd.DataFrame:
+        """
+        Get the keyword-hit matrix for the given keywords.
+
+        Keywords known to the shared matcher are answered from a single
+        multi-keyword scan of every row; any other keyword falls back to a
+        vectorized substring search. Columns are cached, so repeated queries
+        from different stages only pay for keywords not seen before.
+
+        Args:
+            keywords: Lowercase keywords to look up.
+
+        Returns:
+            Boolean DataFrame with one row per sheet row and one column per keyword.
+        """
+        keywords = list(dict.fromkeys(keywords))
+        for keyword in keywords:
+            if keyword in self._keyword_hits:
+                continue
+            if KEYWORD_MATCHER.covers([keyword]):
+                hits = np.zeros(len(self.row_texts_lower), dtype=bool)
+                hits[self.keyword_rows.get(keyword, [])] = True
+            else:
+                hits = self.row_texts_lower.str.contains(keyword, regex=False).to_numpy()
+            self._keyword_hits[keyword] = hits
+
+        return pd.DataFrame(
+            {keyword: self._keyword_hits[keyword] for keyword in keywords},
+            index=self.row_texts_lower.index,
+            columns=keywords,
+            dtype=bool,
+        )
+
+
+def build_row_texts(df: pd.DataFrame) -> pd.Series:
+    """
+    Build the space-joined text of the non-empty cells of every row.
+
+    The text is assembled column by column with vectorized string operations,
+    producing the same result as joining ``str(x)`` for each non-null cell.
+
+    Args:
+        df: The dataframe containing the P&L data.
+
+    Returns:
+        Series of row strings indexed by row position.
+    """
+    texts = np.full(len(df), "", dtype=object)
+
+    for _, column in df.items():
+        present = column.notna().to_numpy()
+        if not present.any():
+            continue
+
+        if is_numeric_dtype(column) or is_object_dtype(column):
+            cells = column.astype(str).to_numpy(dtype=object)
+        else:
+            # Format datetimes and similar values the way str() does
+            cells = column.astype(object).astype(str).to_numpy(dtype=object)
+
+        separators = np.where(present & (texts != ""), " ", "")
+        texts = np.where(present, texts + separators + cells, texts)
+
+    return pd.Series(texts, index=pd.RangeIndex(len(df)), dtype=object)
+
+
+def string_values(column: pd.Series) -> pd.Series:
+    """
+    Keep only the string cells of a column.
+
+    Args:
+        column: The column to filter.
+
+    Returns:
+        Object series with the strings in place and NaN everywhere else.
+    """
+    empty = pd.Series(np.nan, index=column.index, dtype=object)
+    if not (is_object_dtype(column) or is_string_dtype(column)):
+        return empty
+
+    try:
+        is_string = column.str.len().notna()
+    except AttributeError:
+        # The .str accessor refuses columns without any string values
+        return empty
+    return column.where(is_string)
+
+
+def coerce_numeric(column: pd.Series) -> pd.Series:
+    """
+    Coerce one column to floats, keeping only cells that hold a number.
+
+    Numbers are taken as-is and strings are accepted when they look like a
+    plain decimal (digits with at most one '.' and one '-'), matching the
+    rules the row-wise extraction used. Everything else becomes NaN.
+
+    Args:
+        column: The column to coerce.
+
+    Returns:
+        Float series aligned with the column.
+    """
+    if is_bool_dtype(column):
+        return pd.Series(np.nan, index=column.index)
+    if is_numeric_dtype(column):
+        return column.astype(float)
+    if not (is_object_dtype(column) or is_string_dtype(column)):
+        return pd.Series(np.nan, index=column.index)
+
+    strings = string_values(column)
+    is_string = strings.notna()
+    strings = strings[is_string].astype(str)
+    looks_numeric = (
+        strings.str.replace(".", "", n=1, regex=False)
+        .str.replace("-", "", n=1, regex=False)
+        .str.isdigit()
+    )
+    numbers = pd.to_numeric(column.where(~is_string), errors="coerce")
+    parsed = pd.to_numeric(strings[looks_numeric], errors="coerce")
+    return numbers.fillna(parsed.reindex(column.index)).astype(float)
+
+
+def build_numeric_values(df: pd.DataFrame) -> np.ndarray:
+    """
+    Coerce every column of the sheet to numbers in one columnar pass.
+
+    Args:
+        df: The dataframe containing the P&L data.
+
+    Returns:
+        Float array with the same shape as the dataframe.
+    """
+    values = np.full(df.shape, np.nan, dtype=float)
+    for j, (_, column) in enumerate(df.items()):
+        values[:, j] = coerce_numeric(column).to_numpy(dtype=float)
+    return values
+
+
+class SheetProfile:
+    """
+    Per-column statistics of a worksheet, computed in one vectorized pass.
+
+    Ratios are fractions of the sheet's rows. A cell counts as numeric when
+    ``coerce_numeric`` accepts it, so numeric strings count as numbers, and as
+    a string when it holds anything else. Each column is given a role:
+    ``code`` for whole-number account codes in the label columns, ``name``
+    for text columns, ``value`` for numeric columns, ``empty`` for columns
+    without data and ``other`` for anything else. Codes are told apart from
+    whole-number amounts by being stored as text, or by sitting left of
+    amounts with decimals. A column with no value column to its right holds
+    amounts, never codes.
+    """
+
+    def __init__(
+        self,
+        n_rows: int,
+        null_ratio: np.ndarray,
+        numeric_ratio: np.ndarray,
+        string_ratio: np.ndarray,
+        roles: List[str],
+    ):
+        """
+        Initialize the profile.
+
+        Args:
+            n_rows: Number of rows of the sheet.
+            null_ratio: Share of empty cells per column.
+            numeric_ratio: Share of numeric cells per column.
+            string_ratio: Share of text cells per column.
+            roles: Inferred role per column.
+        """
+        self.n_rows = n_rows
+        self.null_ratio = null_ratio
+        self.numeric_ratio = numeric_ratio
+        self.string_ratio = string_ratio
+        self.roles = roles
+
+    @classmethod
+    def from_dataframe(
+        cls, df: pd.DataFrame, numeric_values: Optional[np.ndarray] = None
+    ) -> "SheetProfile":
+        """
+        Profile the columns of a sheet.
+
+        Args:
+            df: The dataframe containing the sheet.
+            numeric_values: The sheet's numeric matrix from
+                ``build_numeric_values``, computed when not given.
+
+        Returns:
+            SheetProfile of the sheet.
+        """
+        if numeric_values is None:
+            numeric_values = build_numeric_values(df)
+
+        n_rows, n_cols = df.shape
+        present = df.notna().to_numpy()
+        numeric = ~np.isnan(numeric_values)
+        integral = numeric & (numeric_values == np.floor(numeric_values))
+
+        rows = max(n_rows, 1)
+        filled = present.sum(axis=0)
+        numeric_count = numeric.sum(axis=0)
+        text_count = (present & ~numeric).sum(axis=0)
+        integral_count = integral.sum(axis=0)
+
+        roles = []
+        for j in range(n_cols):
+            if filled[j] == 0:
+                roles.append(ROLE_EMPTY)
+            elif numeric_count[j] >= ROLE_THRESHOLD * filled[j]:
+                roles.append(ROLE_VALUE)
+            elif text_count[j] >= ROLE_THRESHOLD * filled[j]:
+                roles.append(ROLE_NAME)
+            else:
+                roles.append(ROLE_OTHER)
+
+        first_fractional = next(
+            (
+                j for j in range(n_cols)
+                if roles[j] == ROLE_VALUE and integral_count[j] < numeric_count[j]
+            ),
+            n_cols,
+        )
+        last_value = max((j for j in range(n_cols) if roles[j] == ROLE_VALUE), default=-1)
+        for j in range(min(LABEL_COLUMNS, n_cols)):
+            if roles[j] != ROLE_VALUE or integral_count[j] < CODE_THRESHOLD * filled[j]:
+                continue
+            # Codes label the amounts that follow them
+            if j == last_value:
+                continue
+            if j < first_fractional:
+                roles[j] = ROLE_CODE
+                continue
+            column = df.iloc[:, j]
+            if is_object_dtype(column):
+                is_text = np.fromiter((type(x) is str for x in column.to_numpy()), bool, n_rows)
+                if (integral[:, j] & is_text).sum() >= CODE_THRESHOLD * filled[j]:
+                    roles[j] = ROLE_CODE
+
+        return cls(
+            n_rows,
+            null_ratio=(n_rows - filled) / rows,
+            numeric_ratio=numeric_count / rows,
+            string_ratio=text_count / rows,
+            roles=roles,
+        )
+
+    @property
+    def null_share(self) -> float:
+        """Share of empty cells over the whole sheet."""
+        return float(self.null_ratio.mean()) if len(self.null_ratio) and self.n_rows else 0.0
+
+    @property
+    def has_numeric_data(self) -> bool:
+        """Whether any cell of the sheet holds a number."""
+        return bool((self.numeric_ratio > 0).any())
+
+    def columns_with_role(self, role: str) -> List[int]:
+        """
+        Get the positions of the columns with a role.
+
+        Args:
+            role: One of the ``ROLE_*`` constants.
+
+        Returns:
+            Column positions, left to right.
+        """
+        return [j for j, r in enumerate(self.roles) if r == role]
+
+    @property
+    def value_columns(self) -> List[int]:
+        """Positions of the numeric columns holding amounts."""
+        return self.columns_with_role(ROLE_VALUE)
+
+    def to_dict(self) -> Dict[str, List]:
+        """Get the per-column statistics as plain lists."""
+        return {
+            "nullRatio": self.null_ratio.tolist(),
+            "numericRatio": self.numeric_ratio.tolist(),
+            "stringRatio": self.string_ratio.tolist(),
+            "roles": list(self.roles),
+        }
@@ -0,0 +1,204 @@
+"""
+Job store for asynchronous upload analysis.
+
+Jobs are kept in a small SQLite database so analysis stages reported from
+worker processes are visible to the API process that serves status requests
+and progress streams. Jobs run as tasks of the API process that accepted
+them, so a restart abandons the unfinished ones; a job still unfinished past
+its deadline is reported as failed when it is next read.
+"""
+
+import json
+import sqlite3
+import tempfile
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+from app.utils.logger import app_logger
+
+# Configure module-specific logger
+logger = app_logger.getChild("jobs")
+
+# Analysis stages in the order they are reported
+JOB_STAGES = ["validate", "parse", "sections", "accounts", "categorize"]
+
+# Job statuses
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+
+# Time beyond the analysis timeout after which an unfinished job counts as abandoned
+JOB_DEADLINE_MARGIN_SECONDS = 60
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS upload_jobs (
+    id TEXT PRIMARY KEY,
+    filename TEXT,
+    status TEXT NOT NULL,
+    stage TEXT,
+    result TEXT,
+    error TEXT,
+    status_code INTEGER,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+)
+"""
+
+_COLUMNS = ["id", "filename", "status", "stage", "result", "error", "status_code", "created_at", "updated_at"]
+
+
+class JobStore:
+    """SQLite-backed store of upload jobs, safe to use from several processes."""
+
+    def __init__(
+        self, db_path: str, retention_hours: float = 24, deadline_seconds: Optional[float] = None
+    ):
+        """
+        Initialize the store and create its table if needed.
+
+        Args:
+            db_path: Path to the SQLite database file.
+            retention_hours: Age after which finished jobs are removed.
+            deadline_seconds: Age after which an unfinished job is failed as
+                abandoned, or None to wait for it indefinitely.
+        """
+        self.db_path = db_path
+        self.retention_seconds = retention_hours * 3600
+        self.deadline_seconds = deadline_seconds
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection to the database."""
+        return sqlite3.connect(self.db_path, timeout=10)
+
+    def create(self, filename: Optional[str] = None) -> str:
+        """
+        Create a queued job.
+
+        Args:
+            filename: Name of the uploaded file.
+
+        Returns:
+            The new job id.
+        """
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "DELETE FROM upload_jobs WHERE updated_at < ? AND status IN (?, ?)",
+                (now - self.retention_seconds, JOB_COMPLETED, JOB_FAILED),
+            )
+            conn.execute(
+                "INSERT INTO upload_jobs (id, filename, status, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (job_id, filename, JOB_QUEUED, now, now),
+            )
+        logger.info(f"Created upload job {job_id} for {filename}")
+        return job_id
+
+    def update(self, job_id: str, **fields: Any) -> None:
+        """
+        Update fields of a job.
+
+        Args:
+            job_id: The job id.
+            **fields: Columns to set; ``result`` is stored as JSON.
+        """
+        if "result" in fields and fields["result"] is not None:
+            fields["result"] = json.dumps(fields["result"], default=str)
+        fields["updated_at"] = time.time()
+
+        assignments = ", ".join(f"{name} = ?" for name in fields if name in _COLUMNS)
+        values = [value for name, value in fields.items() if name in _COLUMNS]
+        with self._connect() as conn:
+            conn.execute(f"UPDATE upload_jobs SET {assignments} WHERE id = ?", (*values, job_id))
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a job.
+
+        Args:
+            job_id: The job id.
+
+        Returns:
+            The job fields, with ``result`` decoded, or None if there is no such job.
+            An unfinished job past the store's deadline is failed first.
+        """
+        with self._connect() as conn:
+            row = conn.execute(
+                f"SELECT {', '.join(_COLUMNS)} FROM upload_jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+
+        job = dict(zip(_COLUMNS, row))
+        if job["result"] is not None:
+            job["result"] = json.loads(job["result"])
+        if (
+            self.deadline_seconds is not None
+            and job["status"] in (JOB_QUEUED, JOB_RUNNING)
+            and job["created_at"] < time.time() - self.deadline_seconds
+        ):
+            # The process running the job ended before it did, e.g. on a restart
+            logger.warning(f"Upload job {job_id} passed its deadline unfinished")
+            job.update(
+                status=JOB_FAILED,
+                error="The job was abandoned before it finished; upload the file again",
+                status_code=500,
+                updated_at=time.time(),
+            )
+            with self._connect() as conn:
+                # Unless it finished in the meantime
+                conn.execute(
+                    "UPDATE upload_jobs SET status = ?, error = ?, status_code = ?, updated_at = ? "
+                    "WHERE id = ? AND status IN (?, ?)",
+                    (JOB_FAILED, job["error"], 500, job["updated_at"], job_id, JOB_QUEUED, JOB_RUNNING),
+                )
+        return job
+
+
+class JobProgress:
+    """
+    Picklable progress callback that records the current stage of a job.
+
+    Passed to ``analyze_profit_loss`` so stages reported inside a worker
+    process are written to the shared job store.
+    """
+
+    def __init__(self, job_id: str, db_path: str):
+        """
+        Initialize the callback.
+
+        Args:
+            job_id: The job to report on.
+            db_path: Path to the job store database.
+        """
+        self.job_id = job_id
+        self.db_path = db_path
+
+    def __call__(self, stage: str) -> None:
+        """Record that the job has reached a stage."""
+        try:
+            with sqlite3.connect(self.db_path, timeout=10) as conn:
+                conn.execute(
+                    "UPDATE upload_jobs SET status = ?, stage = ?, updated_at = ? WHERE id = ?",
+                    (JOB_RUNNING, stage, time.time(), self.job_id),
+                )
+        except sqlite3.Error as e:
+            # Progress is informational; never fail the analysis over it
+            logger.warning(f"Could not record stage {stage} of job {self.job_id}: {str(e)}")
+
+
+# Shared job store configured from the application settings
+job_store = JobStore(
+    settings.JOB_STORE_PATH or str(Path(tempfile.gettempdir()) / "pnl_upload_jobs.sqlite3"),
+    retention_hours=settings.JOB_RETENTION_HOURS,
+    deadline_seconds=settings.ANALYSIS_TIMEOUT_SECONDS + JOB_DEADLINE_MARGIN_SECONDS,
+)
@@ -0,0 +1,285 @@
+"""
+Per-organization chart-of-accounts mappings.
+
+Organizations can override the built-in account categorization rules with
+their own keywords, code ranges and section categories. Each edit is stored
+as a new version in a small SQLite database, shared by the API process and
+the analysis workers. Compiled categorizers are cached per organization and
+version, so an edit takes effect on the next analysis without a restart,
+and unchanged mappings are never recompiled.
+"""
+
+import json
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.models.mappings import CategoryMapping, CategoryMappingUpdate
+from app.utils.categorization import (
+    ACCOUNT_CATEGORIES,
+    CODE_RANGES,
+    SECTION_CATEGORIES,
+    Categorizer,
+    account_categorizer,
+)
+from app.utils.logger import app_logger
+
+# Configure module-specific logger
+logger = app_logger.getChild("mappings")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS category_mappings (
+    organization_id TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    mapping TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (organization_id, version)
+)
+"""
+
+
+class MappingStore:
+    """SQLite-backed store of versioned category mappings, safe to use from several processes."""
+
+    def __init__(self, db_path: str):
+        """
+        Initialize the store and create its table if needed.
+
+        Args:
+            db_path: Path to the SQLite database file.
+        """
+        self.db_path = db_path
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection to the database."""
+        return sqlite3.connect(self.db_path, timeout=10)
+
+    def save(self, organization_id: str, update: CategoryMappingUpdate) -> CategoryMapping:
+        """
+        Store a new version of an organization's mappings.
+
+        Args:
+            organization_id: The organization.
+            update: The complete new mappings.
+
+        Returns:
+            The stored mappings with their version number.
+        """
+        now = time.time()
+        mapping = update.model_dump(mode="json")
+        with self._connect() as conn:
+            # The write lock is taken up front so concurrent saves get distinct versions
+            conn.execute("BEGIN IMMEDIATE")
+            (latest,) = conn.execute(
+                "SELECT COALESCE(MAX(version), 0) FROM category_mappings WHERE organization_id = ?",
+                (organization_id,),
+            ).fetchone()
+            version = latest + 1
+            conn.execute(
+                "INSERT INTO category_mappings (organization_id, version, mapping, created_at) "
+                "VALUES (?, ?, ?, ?)",
+                (organization_id, version, json.dumps(mapping), now),
+            )
+        logger.info(f"Stored category mappings version {version} for organization {organization_id}")
+        return CategoryMapping(
+            organizationId=organization_id, version=version, createdAt=now, **mapping
+        )
+
+    def latest_version(self, organization_id: str) -> Optional[int]:
+        """
+        Get the current version of an organization's mappings.
+
+        Args:
+            organization_id: The organization.
+
+        Returns:
+            The latest version, or None if the organization has no mappings.
+        """
+        with self._connect() as conn:
+            (version,) = conn.execute(
+                "SELECT MAX(version) FROM category_mappings WHERE organization_id = ?",
+                (organization_id,),
+            ).fetchone()
+        return version
+
+    def versions(self, organization_id: str) -> List[int]:
+        """
+        List the stored versions of an organization's mappings.
+
+        Args:
+            organization_id: The organization.
+
+        Returns:
+            Version numbers, oldest first.
+        """
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT version FROM category_mappings WHERE organization_id = ? ORDER BY version",
+                (organization_id,),
+            ).fetchall()
+        return [version for (version,) in rows]
+
+    def get(self, organization_id: str, version: Optional[int] = None) -> Optional[CategoryMapping]:
+        """
+        Get a version of an organization's mappings.
+
+        Args:
+            organization_id: The organization.
+            version: The version to get; the latest when not given.
+
+        Returns:
+            The mappings, or None if there is no such version.
+        """
+        query = "SELECT version, mapping, created_at FROM category_mappings WHERE organization_id = ?"
+        params: Tuple[Any, ...] = (organization_id,)
+        if version is None:
+            query += " ORDER BY version DESC LIMIT 1"
+        else:
+            query += " AND version = ?"
+            params += (version,)
+
+        with self._connect() as conn:
+            row = conn.execute(query, params).fetchone()
+        if row is None:
+            return None
+
+        version, mapping, created_at = row
+        return CategoryMapping(
+            organizationId=organization_id,
+            version=version,
+            createdAt=created_at,
+            **json.loads(mapping),
+        )
+
+
+def build_categorizer(mapping: CategoryMappingUpdate) -> Categorizer:
+    """
+    Compile an organization's mappings over the built-in rules.
+
+    The organization's keywords are checked before the built-in ones, its
+    code ranges replace the built-in ranges when given, and its section
+    categories are merged over the built-in ones.
+
+    Args:
+        mapping: The organization's mappings.
+
+    Returns:
+        The compiled categorizer.
+    """
+    account_categories = dict(mapping.accountCategories)
+    for keyword, category in ACCOUNT_CATEGORIES.items():
+        account_categories.setdefault(keyword, category)
+
+    if mapping.codeRanges is None:
+        code_ranges = CODE_RANGES
+    else:
+        code_ranges = {(r.start, r.end): r.category for r in mapping.codeRanges}
+
+    section_categories: Dict[str, Dict[str, str]] = {
+        section: dict(categories) for section, categories in SECTION_CATEGORIES.items()
+    }
+    for section, categories in mapping.sectionCategories.items():
+        section_categories.setdefault(section, {}).update(categories)
+
+    return Categorizer(account_categories, code_ranges, section_categories)
+
+
+class CategorizerCache:
+    """LRU of compiled categorizers keyed by organization and mappings version."""
+
+    def __init__(self, store: MappingStore, max_entries: int = 32):
+        """
+        Initialize the cache.
+
+        Args:
+            store: Store the mappings are loaded from.
+            max_entries: Maximum number of compiled categorizers kept.
+        """
+        self.store = store
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, int], Categorizer]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, organization_id: Optional[str], version: Optional[int] = None) -> Categorizer:
+        """
+        Get the categorizer for an organization's mappings.
+
+        Args:
+            organization_id: The organization, or None for the built-in rules.
+            version: The mappings version; the latest when not given.
+
+        Returns:
+            The compiled categorizer, or the shared built-in one when the
+            organization has no mappings.
+        """
+        if organization_id is None:
+            return account_categorizer
+        if version is None:
+            version = self.store.latest_version(organization_id)
+            if version is None:
+                return account_categorizer
+
+        key = (organization_id, version)
+        with self._lock:
+            categorizer = self._entries.get(key)
+            if categorizer is not None:
+                self._entries.move_to_end(key)
+                return categorizer
+
+        mapping = self.store.get(organization_id, version)
+        if mapping is None:
+            logger.warning(
+                f"Category mappings version {version} of organization {organization_id} not found; "
+                "using the built-in rules"
+            )
+            return account_categorizer
+
+        categorizer = build_categorizer(mapping)
+        logger.info(f"Compiled category mappings version {version} for organization {organization_id}")
+        with self._lock:
+            self._entries[key] = categorizer
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return categorizer
+
+    def invalidate(self, organization_id: str) -> None:
+        """
+        Drop every compiled version of an organization's mappings.
+
+        Args:
+            organization_id: The organization.
+        """
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == organization_id]:
+                del self._entries[key]
+
+
+# Shared store and categorizer cache configured from the application settings
+mapping_store = MappingStore(
+    settings.MAPPING_STORE_PATH or str(Path(tempfile.gettempdir()) / "pnl_category_mappings.sqlite3")
+)
+categorizer_cache = CategorizerCache(mapping_store)
+
+
+def categorizer_for(organization_id: Optional[str], version: Optional[int] = None) -> Categorizer:
+    """
+    Get the categorizer that applies to an organization.
+
+    Args:
+        organization_id: The organization, or None for the built-in rules.
+        version: The mappings version; the latest when not given.
+
+    Returns:
+        The compiled categorizer.
+    """
+    return categorizer_cache.get(organization_id, version)
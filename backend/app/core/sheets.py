@@ -0,0 +1,192 @@
+"""
+Multi-sheet profit and loss workbooks.
+
+Consolidated workbooks often hold one P&L sheet per entity alongside notes or
+summary sheets. This module finds the sheets that look like P&L reports by
+running the validator's header-window rules on their first rows, and rolls per-sheet analysis results up into a
+consolidated report.
+"""
+
+import io
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+from app.core.analyzer import ACCOUNT_SECTIONS, PROFIT_LINES, REPORT_SECTIONS, analyze_profit_loss
+from app.core.engines import select_engine
+from app.core.ingestion import HEADER_WINDOW_ROWS, IngestionContext
+from app.core.validation import ProfitLossExcelValidator, ValidationResult, validation_rule_sets
+from app.utils.categorization import summarize_categories
+from app.utils.logger import app_logger
+
+# Configure module-specific logger
+logger = app_logger.getChild("sheets")
+
+
+def looks_like_profit_loss(df: pd.DataFrame, validator: ProfitLossExcelValidator) -> bool:
+    """
+    Check whether the first rows of a sheet look like a profit and loss report.
+
+    The validator's header-window rules, with the organization's overrides,
+    must pass as they would when the sheet is validated. Unless the
+    organization disables the section keyword rule, at least one of its
+    sections must also be found, to tell reports from notes sheets that
+    merely mention a required keyword.
+
+    Args:
+        df: The first rows of the sheet.
+        validator: Validator configured for the organization.
+
+    Returns:
+        True if the sheet looks like a P&L report.
+    """
+    if df.empty:
+        return False
+
+    context = IngestionContext.from_dataframe(df)
+    rules = [rule for rule in validator.active_rules() if rule.header_window]
+    result = ValidationResult()
+    if not validator.run_rules(rules, context, result) or not result.is_valid:
+        return False
+
+    if not any(rule.name == "section_keywords" for rule in rules):
+        return True
+    return any(validator.find_sections(context).values())
+
+
+def find_profit_loss_sheets(
+    file_path: str,
+    content: Optional[bytes] = None,
+    engine: Optional[str] = None,
+    organization_id: Optional[str] = None,
+) -> List[str]:
+    """
+    Find the sheets of a workbook that look like profit and loss reports.
+
+    Only the first ``HEADER_WINDOW_ROWS`` rows of each sheet are parsed.
+
+    Args:
+        file_path: Path to the Excel file, or its name when ``content`` is given.
+        content: Workbook bytes to read instead of the file.
+        engine: Reader engine; selected from the workbook format when not given.
+        organization_id: Organization whose validation rules apply.
+
+    Returns:
+        Names of the qualifying sheets, in workbook order.
+    """
+    validator = validation_rule_sets.validator_for(
+        file_path, organization_id, in_memory=content is not None
+    )
+    source = io.BytesIO(content) if content is not None else file_path
+    with pd.ExcelFile(source, engine=engine or select_engine(file_path)) as workbook:
+        sheets = [
+            name
+            for name in workbook.sheet_names
+            if looks_like_profit_loss(workbook.parse(name, nrows=HEADER_WINDOW_ROWS), validator)
+        ]
+
+    logger.info(f"Found {len(sheets)} profit and loss sheets in {file_path}: {sheets}")
+    return sheets
+
+
+def analyze_sheets(
+    file_path: str,
+    content: Optional[bytes] = None,
+    engine: Optional[str] = None,
+    organization_id: Optional[str] = None,
+    **options: Any,
+) -> List[Dict[str, Any]]:
+    """
+    Find the profit and loss sheets of a workbook and analyze each of them.
+
+    Runs as one job, so a workbook sent to a worker process crosses the
+    process boundary once rather than once per sheet.
+
+    Args:
+        file_path: Path to the Excel file, or its name when ``content`` is given.
+        content: Workbook bytes to read instead of the file.
+        engine: Reader engine; selected from the workbook format when not given.
+        organization_id: Organization whose validation rules and category mappings apply.
+        **options: Further ``analyze_profit_loss`` options, e.g. ``multi_period``.
+
+    Returns:
+        One entry per qualifying sheet, in workbook order, with its
+        ``sheetName`` and either its analysis ``data`` or its ``error`` message.
+    """
+    engine = engine or select_engine(file_path)
+    results = []
+    for name in find_profit_loss_sheets(file_path, content, engine, organization_id):
+        try:
+            data = analyze_profit_loss(
+                file_path,
+                content=content,
+                engine=engine,
+                sheet_name=name,
+                organization_id=organization_id,
+                **options,
+            )
+            results.append({"sheetName": name, "data": data})
+        except Exception as e:
+            # Exceptions are reported as messages, as not all of them survive pickling
+            logger.warning(f"Sheet {name} of {file_path} failed: {str(e)}")
+            results.append({"sheetName": name, "error": str(e)})
+    return results
+
+
+def _common(values: List[Any], mixed: str) -> Any:
+    """Get the value shared by all items, or ``mixed`` when they differ."""
+    distinct = list(dict.fromkeys(values))
+    return distinct[0] if len(distinct) == 1 else mixed
+
+
+def consolidate_reports(reports: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Roll several analyzed P&L reports up into one consolidated report.
+
+    Accounts with the same name in the same section are summed, keeping the
+    category of their first occurrence; section totals and profit lines are
+    summed across reports. The category summary is recomputed from the
+    merged accounts.
+
+    Args:
+        reports: Analysis results, e.g. one per entity sheet.
+
+    Returns:
+        dict: Consolidated profit and loss data.
+    """
+    sections: Dict[str, Any] = {}
+    for section in REPORT_SECTIONS:
+        present = [r["sections"][section] for r in reports if r["sections"].get(section) is not None]
+        if not present:
+            continue
+
+        if section in PROFIT_LINES:
+            sections[section] = sum(present)
+        elif section in ACCOUNT_SECTIONS:
+            accounts: Dict[str, Dict[str, Any]] = {}
+            for data in present:
+                for account in data["accounts"]:
+                    merged = accounts.get(account["name"])
+                    if merged is None:
+                        accounts[account["name"]] = dict(account)
+                    else:
+                        merged["value"] += account["value"]
+            sections[section] = {
+                "accounts": list(accounts.values()),
+                "total": sum(data["total"] for data in present),
+            }
+
+    metadata = dict(reports[0]["metadata"]) if reports else {}
+    metadata.pop("sheet", None)
+
+    companies = list(dict.fromkeys(r["companyName"] for r in reports))
+    consolidated = {
+        "companyName": _common(companies, f"Consolidated ({len(companies)} entities)"),
+        "period": _common([r["period"] for r in reports], "Multiple periods"),
+        "basisType": _common([r["basisType"] for r in reports], "Mixed"),
+        "reportType": "Consolidated",
+        "sections": sections,
+        "metadata": metadata,
+    }
+    consolidated["categorySummary"] = summarize_categories(consolidated)
+    return consolidated
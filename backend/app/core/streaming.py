@@ -0,0 +1,332 @@
+"""
+Streaming analysis of large profit and loss workbooks.
+
+This module reads .xlsx files with openpyxl's read-only mode and detects
+sections and extracts accounts incrementally. Besides the header window, at
+most ``SECTION_WINDOW_ROWS`` rows of each open section are held; once a
+section outgrows its window, the buffered rows are turned into accounts and
+dropped. The worst case is therefore every section opening at once and each
+holding a full window of rows as wide as the sheet, plus the extracted
+accounts, which are part of the result anyway. A section longer than the
+window has its value columns profiled one window at a time, so it can differ
+from the in-memory path if its column layout only becomes clear across
+windows.
+"""
+
+import io
+import os
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+import openpyxl
+import pandas as pd
+
+from app.core.analyzer import (
+    ACCOUNT_SECTIONS,
+    PROFIT_LINES,
+    assemble_report,
+    categorize_report,
+    ensure_valid,
+    extract_accounts,
+    extract_company_and_period,
+    extract_row_value,
+    identify_basis_type,
+)
+from app.core.ingestion import HEADER_WINDOW_ROWS, IngestionContext
+from app.utils.keywords import KEYWORD_MATCHER, SECTION_KEYWORDS
+from app.utils.logger import app_logger
+
+# Configure module-specific logger
+logger = app_logger.getChild("streaming")
+
+# Rows assigned to a section when no later section follows it
+TRAILING_SECTION_ROWS = 20
+
+# Rows of an open section buffered before its accounts are extracted; must
+# exceed TRAILING_SECTION_ROWS
+SECTION_WINDOW_ROWS = 1000
+
+_SECTION_KEYWORD_SETS = {
+    section: frozenset(keywords) for section, keywords in SECTION_KEYWORDS.items()
+}
+
+
+def iter_sheet_rows(
+    file_path: str, content: Optional[bytes] = None, sheet_name: Union[str, int] = 0
+) -> Iterator[Tuple[Any, ...]]:
+    """
+    Iterate over the cell values of a worksheet in read-only mode.
+
+    Args:
+        file_path: Path to the .xlsx file.
+        content: Workbook bytes to read instead of the file.
+        sheet_name: Name or position of the worksheet.
+
+    Yields:
+        Tuple of cell values per row.
+    """
+    source = io.BytesIO(content) if content is not None else file_path
+    workbook = openpyxl.load_workbook(source, read_only=True, data_only=True)
+    try:
+        if isinstance(sheet_name, str):
+            worksheet = workbook[sheet_name]
+        else:
+            worksheet = workbook.worksheets[sheet_name]
+        # The stored dimension can be missing or wrong (e.g. "A1"), and read-only
+        # mode would otherwise clip every row to it
+        worksheet.reset_dimensions()
+        yield from worksheet.iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+
+class _OpenSection:
+    """Rows of a section whose end has not been seen yet."""
+
+    def __init__(self, name: str, start: int):
+        self.name = name
+        self.start = start
+        # The section header followed by the rows not yet extracted
+        self.rows: List[List[Any]] = []
+        # Rows after the header already extracted into accounts
+        self.flushed = 0
+        self.accounts: List[Dict[str, Any]] = []
+        self.total: Optional[float] = None
+        # The first rows, kept once the section has been flushed in case
+        # nothing follows it and it is capped at TRAILING_SECTION_ROWS
+        self.head: List[List[Any]] = []
+
+
+class StreamingProfitLossReader:
+    """
+    Incremental profit and loss analysis over a stream of sheet rows.
+
+    Row numbering follows ``pd.read_excel``: the first non-empty row is the
+    column header and data rows are counted from zero after it. A section
+    starts at the first row matching its keywords and ends just before the
+    next section header or profit line; when nothing follows, it is capped at
+    ``TRAILING_SECTION_ROWS`` rows, as in find_section_boundaries. Unlike the
+    in-memory path, a section is closed by the first profit line after it
+    rather than the last one in the sheet, which only differs when a profit
+    line keyword repeats inside a section.
+    """
+
+    def __init__(
+        self,
+        file_path: str,
+        progress: Optional[Callable[[str], None]] = None,
+        in_memory: bool = False,
+        organization_id: Optional[str] = None,
+        mapping_version: Optional[int] = None,
+    ):
+        """
+        Initialize the reader.
+
+        Args:
+            file_path: Path to the .xlsx file.
+            progress: Called with the name of each analysis stage as it starts.
+            in_memory: The rows come from memory and file_path is only the workbook name.
+            organization_id: Organization whose validation rules and category mappings apply.
+            mapping_version: Version of the organization's category mappings.
+        """
+        self.file_path = file_path
+        self.in_memory = in_memory
+        self.organization_id = organization_id
+        self.mapping_version = mapping_version
+        self.report_stage = progress or (lambda stage: None)
+        self.width = 0
+        self.header_window: List[List[Any]] = []
+        self.starts: Dict[str, Optional[int]] = {s: None for s in ACCOUNT_SECTIONS}
+        self.open_sections: List[_OpenSection] = []
+        self.section_accounts: Dict[str, Any] = {}
+        self.profit_values: Dict[str, Optional[float]] = {}
+        self.last_row = -1
+
+    def _frame(self, rows: List[List[Any]]) -> pd.DataFrame:
+        """Build a dataframe padded to the sheet width, or the widest row if wider."""
+        width = max([self.width, *(len(row) for row in rows)])
+        return pd.DataFrame(
+            [row + [None] * (width - len(row)) for row in rows],
+            columns=range(width),
+        )
+
+    def _extract(self, rows: List[List[Any]]) -> Tuple[List[Dict[str, Any]], Optional[float]]:
+        """Extract the accounts of section rows, the first being its header."""
+        frame = self._frame(rows)
+        return extract_accounts(frame, 0, len(frame) - 1, IngestionContext.from_dataframe(frame))
+
+    def _flush_section(self, section: _OpenSection) -> None:
+        """Extract the buffered rows of an open section and drop them."""
+        if not section.head:
+            section.head = section.rows[: TRAILING_SECTION_ROWS + 1]
+        accounts, total = self._extract(section.rows)
+        section.accounts.extend(accounts)
+        if total is not None:
+            section.total = total
+        section.flushed += len(section.rows) - 1
+        del section.rows[1:]
+
+    def _close_section(self, section: _OpenSection, end: int) -> None:
+        """Extract the accounts of an open section ending at row ``end``."""
+        rows = end - section.start
+        if section.flushed and rows <= TRAILING_SECTION_ROWS:
+            # Capped trailing section, all within the kept head
+            self.section_accounts[section.name] = self._extract(section.head[: rows + 1])
+        else:
+            accounts, total = self._extract(section.rows[: rows - section.flushed + 1])
+            self.section_accounts[section.name] = (
+                section.accounts + accounts,
+                total if total is not None else section.total,
+            )
+        logger.debug(
+            f"Section {section.name}: rows {section.start}-{end}, "
+            f"{len(self.section_accounts[section.name][0])} accounts"
+        )
+
+    def _validate_header(self) -> None:
+        """Validate the file against the header window."""
+        context = IngestionContext.from_dataframe(self._frame(self.header_window))
+        self.report_stage("validate")
+        ensure_valid(self.file_path, context, self.in_memory, self.organization_id)
+        self.report_stage("parse")
+
+    def feed(self, index: int, row: List[Any]) -> None:
+        """
+        Process one data row.
+
+        Args:
+            index: Data row index (0 is the first row after the column header).
+            row: Cell values of the row.
+        """
+        self.last_row = index
+        # Rows are only as long as their last cell, so the sheet widens as they come in
+        self.width = max(self.width, len(row))
+
+        if index < HEADER_WINDOW_ROWS:
+            self.header_window.append(row)
+            if index == HEADER_WINDOW_ROWS - 1:
+                self._validate_header()
+
+        text = " ".join(str(x) for x in row if x is not None)
+        hits = KEYWORD_MATCHER.find_all(text)
+
+        new_starts = [
+            s for s in ACCOUNT_SECTIONS
+            if self.starts[s] is None and hits & _SECTION_KEYWORD_SETS[s]
+        ]
+        profit_lines = [p for p in PROFIT_LINES if hits & _SECTION_KEYWORD_SETS[p]]
+
+        # A new section header or profit line ends every open section
+        if new_starts or profit_lines:
+            for section in self.open_sections:
+                self._close_section(section, index - 1)
+            self.open_sections = []
+
+        for section in new_starts:
+            self.starts[section] = index
+            self.open_sections.append(_OpenSection(section, index))
+
+        for profit in profit_lines:
+            # The last matching row wins, as in find_section_boundaries
+            self.profit_values[profit] = extract_row_value(self._frame([row]), 0)
+
+        for section in self.open_sections:
+            section.rows.append(row)
+            if len(section.rows) > SECTION_WINDOW_ROWS:
+                self._flush_section(section)
+
+    def finish(self) -> Dict[str, Any]:
+        """
+        Close the remaining sections and assemble the report.
+
+        Returns:
+            dict: Structured profit and loss data.
+        """
+        if self.last_row < HEADER_WINDOW_ROWS - 1:
+            self._validate_header()
+
+        # Sections and accounts are extracted while rows stream in; only the
+        # sections still open at the end of the sheet remain
+        self.report_stage("sections")
+        self.report_stage("accounts")
+        for section in self.open_sections:
+            end = min(section.start + TRAILING_SECTION_ROWS, self.last_row)
+            self._close_section(section, end)
+        self.open_sections = []
+
+        header = self._frame(self.header_window)
+        header_context = IngestionContext.from_dataframe(header)
+        company_name, period = extract_company_and_period(header, header_context)
+        basis_type = identify_basis_type(header, header_context)
+        logger.info(f"Extracted company: {company_name}, period: {period}")
+        logger.info(f"Identified basis type: {basis_type}")
+
+        result = assemble_report(
+            company_name,
+            period,
+            basis_type,
+            os.path.basename(self.file_path),
+            self.section_accounts,
+            self.profit_values,
+            engine="openpyxl",
+        )
+        self.report_stage("categorize")
+        return categorize_report(result, self.organization_id, self.mapping_version)
+
+
+def analyze_profit_loss_streaming(
+    file_path: str,
+    progress: Optional[Callable[[str], None]] = None,
+    content: Optional[bytes] = None,
+    sheet_name: Union[str, int] = 0,
+    organization_id: Optional[str] = None,
+    mapping_version: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Analyze a profit and loss .xlsx report without loading the whole sheet.
+
+    Validation runs against the header window (the first
+    ``HEADER_WINDOW_ROWS`` data rows) before the rest of the file is read.
+    Peak memory is bounded by the header window and a window of rows per
+    open section.
+
+    Args:
+        file_path (str): Path to the .xlsx file.
+        progress (callable, optional): Called with the name of each stage as it starts.
+        content (bytes, optional): Workbook bytes to read instead of the file.
+        sheet_name (str or int): Name or position of the worksheet to analyze.
+        organization_id (str, optional): Organization whose validation rules
+            and category mappings apply.
+        mapping_version (int, optional): Version of the organization's
+            category mappings; the latest when not given.
+
+    Returns:
+        dict: Structured profit and loss data.
+
+    Raises:
+        ExcelFileValidationError: If the file fails validation
+    """
+    logger.info(f"Streaming analysis of profit and loss report: {file_path}")
+
+    rows = iter_sheet_rows(file_path, content, sheet_name)
+
+    # Like pd.read_excel, the first non-empty row holds the column labels
+    header = None
+    for row in rows:
+        if any(x is not None for x in row):
+            header = row
+            break
+
+    reader = StreamingProfitLossReader(
+        file_path,
+        progress,
+        in_memory=content is not None,
+        organization_id=organization_id,
+        mapping_version=mapping_version,
+    )
+    reader.width = len(header) if header else 0
+    for index, row in enumerate(rows):
+        reader.feed(index, list(row))
+
+    result = reader.finish()
+    logger.info("Streaming analysis completed successfully")
+    return result
@@ -0,0 +1,347 @@
+"""
+Time-series analytics over stored metrics.
+
+Stored time series rows carry free-text period labels ("Jan 2024",
+"2024-01", "Q1 2024", "FY2024", ...), so ordering them as strings puts
+periods out of sequence. This module parses the labels into calendar
+periods, pivots an organization's rows into a metrics × periods matrix and
+computes growth rates, rolling means, CAGR and volatility for every metric
+at once with NumPy. Results are cached per organization until new data is
+stored for it.
+"""
+
+import re
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.utils.logger import app_logger
+
+# Configure module-specific logger
+logger = app_logger.getChild("time_series")
+
+# Default number of periods averaged by the rolling mean
+DEFAULT_ROLLING_WINDOW = 3
+
+# Name and length in months of each period frequency
+FREQUENCIES = {
+    "M": ("monthly", 1),
+    "Q": ("quarterly", 3),
+    "Y": ("annual", 12),
+}
+
+_MONTHS = {
+    month: number
+    for number, month in enumerate(
+        ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"], 1
+    )
+}
+
+_QUARTER = re.compile(r"\bq([1-4])[\s\-/]*(?:fy)?\s*'?(\d{4}|\d{2})\b|\b(\d{4})[\s\-/]*q([1-4])\b")
+_ISO_MONTH = re.compile(r"^(\d{4})[\-/.](\d{1,2})(?:[\-/.]\d{1,2})?$")
+_MONTH_NAME = re.compile(
+    r"\b(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?"
+    r"[\s\-/,]*(?:\d{1,2}(?:st|nd|rd|th)?,?\s+)?'?(\d{4}|\d{2})\b"
+)
+_NUMERIC_DATE = re.compile(r"\b(\d{1,2})[\-/.](\d{1,2})[\-/.](\d{4}|\d{2})\b")
+_NUMERIC_MONTH = re.compile(r"^(\d{1,2})[\-/](\d{4})$")
+_YEAR = re.compile(r"^(?:fy|year|financial year)?\s*'?(\d{4})(?:\s*[\-/]\s*(\d{4}|\d{2}))?$")
+
+
+def _year(text: str) -> int:
+    """Expand a two-digit year to 20xx."""
+    year = int(text)
+    return year + 2000 if year < 100 else year
+
+
+@lru_cache(maxsize=4096)
+def parse_period(label: str) -> Optional[pd.Period]:
+    """
+    Parse a period label into a calendar period.
+
+    Recognises months ("Jan 2024", "January 2024", "Jan-24", "2024-01",
+    "01/2024", "For the month ended May 31, 2025"), quarters ("Q1 2024",
+    "2024 Q1") and years ("2024", "FY2024", "FY2023/24"). Numeric dates are
+    read day first. A financial year spanning two calendar years is the
+    year it ends in.
+
+    Args:
+        label: The period label.
+
+    Returns:
+        A monthly, quarterly or annual period, or None if the label is not
+        a period (e.g. "YTD").
+    """
+    text = label.strip().lower()
+
+    match = _QUARTER.search(text)
+    if match:
+        quarter, year = (match.group(1), match.group(2)) if match.group(1) else (match.group(4), match.group(3))
+        return pd.Period(year=_year(year), quarter=int(quarter), freq="Q")
+
+    match = _ISO_MONTH.match(text)
+    if match and 1 <= int(match.group(2)) <= 12:
+        return pd.Period(year=int(match.group(1)), month=int(match.group(2)), freq="M")
+
+    match = _MONTH_NAME.search(text)
+    if match:
+        return pd.Period(year=_year(match.group(2)), month=_MONTHS[match.group(1)], freq="M")
+
+    match = _NUMERIC_DATE.search(text)
+    if match and 1 <= int(match.group(2)) <= 12:
+        return pd.Period(year=_year(match.group(3)), month=int(match.group(2)), freq="M")
+
+    match = _NUMERIC_MONTH.match(text)
+    if match and 1 <= int(match.group(1)) <= 12:
+        return pd.Period(year=int(match.group(2)), month=int(match.group(1)), freq="M")
+
+    match = _YEAR.match(text)
+    if match:
+        year = _year(match.group(2)) if match.group(2) else int(match.group(1))
+        return pd.Period(year=year, freq="Y")
+
+    return None
+
+
+def _growth(values: np.ndarray, lag: int) -> np.ndarray:
+    """Percentage change of each column from the column ``lag`` places before it."""
+    growth = np.full_like(values, np.nan)
+    if 0 < lag < values.shape[1]:
+        previous = values[:, :-lag]
+        np.divide(
+            values[:, lag:] - previous,
+            np.abs(previous),
+            out=growth[:, lag:],
+            where=previous != 0,
+        )
+    return growth * 100
+
+
+def _volatility(growth: np.ndarray) -> np.ndarray:
+    """Sample standard deviation of each row, ignoring NaN; NaN with fewer than two values."""
+    valid = ~np.isnan(growth)
+    count = valid.sum(axis=1)
+    filled = np.where(valid, growth, 0.0)
+    mean = np.divide(filled.sum(axis=1), count, out=np.zeros(len(count)), where=count > 0)
+    squares = np.where(valid, (growth - mean[:, None]) ** 2, 0.0).sum(axis=1)
+    return np.sqrt(np.divide(squares, count - 1, out=np.full(len(count), np.nan), where=count > 1))
+
+
+def _cagr(values: np.ndarray, months_per_period: int) -> np.ndarray:
+    """Compound annual growth rate from the first to the last value of each row, in percent."""
+    cagr = np.full(values.shape[0], np.nan)
+    valid = ~np.isnan(values)
+    has_values = valid.any(axis=1)
+    if not has_values.any():
+        return cagr
+
+    rows = np.arange(values.shape[0])
+    first = valid.argmax(axis=1)
+    last = values.shape[1] - 1 - valid[:, ::-1].argmax(axis=1)
+    years = (last - first) * months_per_period / 12
+    start = values[rows, first]
+    end = values[rows, last]
+
+    # Growth compounds only between positive values, and annualizing a span
+    # shorter than a year would magnify it
+    defined = has_values & (years >= 1) & (start > 0) & (end > 0)
+    np.power(
+        np.divide(end, start, out=np.ones_like(end), where=defined),
+        np.divide(1, years, out=np.zeros_like(years), where=defined),
+        out=cagr,
+        where=defined,
+    )
+    return np.where(defined, (cagr - 1) * 100, np.nan)
+
+
+def _to_list(values: np.ndarray) -> List[Optional[float]]:
+    """Convert an array to a list with None in place of NaN."""
+    items = values.astype(object)
+    items[np.isnan(values)] = None
+    return items.tolist()
+
+
+def compute_time_series_analytics(
+    rows: List[Dict[str, Any]], window: int = DEFAULT_ROLLING_WINDOW
+) -> Dict[str, Any]:
+    """
+    Compute trend analytics for stored time series rows.
+
+    The rows are pivoted into a metrics × periods matrix over a complete
+    calendar grid, so growth rates compare calendar periods even when some
+    are missing: month-over-month growth needs monthly data and is null
+    otherwise, and year-over-year growth compares each period with the same
+    period a year before. Rolling means and volatility run over the reported
+    periods, volatility being the sample standard deviation of the growth
+    between consecutive reported periods. CAGR needs positive first and last
+    values at least a year apart. Growth, CAGR and volatility are
+    percentages. Labels that are not periods are left out and listed under
+    ``unparsedPeriods``; when a metric has several values for a period the
+    most recently stored one is used.
+
+    Args:
+        rows: Stored rows with ``period``, ``metric_name``, ``metric_value``
+            and, optionally, ``created_at``.
+        window: Number of reported periods averaged by the rolling mean.
+
+    Returns:
+        dict: Periods in calendar order, the data frequency, the unparsed
+        period labels and the analytics of each metric.
+    """
+    result: Dict[str, Any] = {
+        "periods": [],
+        "frequency": None,
+        "window": window,
+        "unparsedPeriods": [],
+        "metrics": {},
+    }
+    if not rows:
+        return result
+
+    df = pd.DataFrame(rows)
+    if "created_at" in df:
+        df = df.sort_values("created_at", kind="stable")
+
+    # Labels repeat across metrics, so each distinct one is parsed once
+    label_codes, labels = pd.factorize(df["period"].astype(str))
+    parsed = [parse_period(label) for label in labels]
+    result["unparsedPeriods"] = [label for label, period in zip(labels, parsed) if period is None]
+    known = np.array([period is not None for period in parsed], dtype=bool)
+    df, label_codes = df[known[label_codes]], label_codes[known[label_codes]]
+    if df.empty:
+        return result
+
+    # Mixed frequencies are compared month by month, at the end of each period
+    kinds = {period.freqstr[0] for period in parsed if period is not None}
+    kind = kinds.pop() if len(kinds) == 1 else "M"
+    frequency, months_per_period = FREQUENCIES[kind]
+    label_ordinals = np.array(
+        [-1 if period is None else period.asfreq(kind, how="end").ordinal for period in parsed],
+        dtype=np.int64,
+    )
+
+    # Pivot into a metrics x periods grid over every calendar period in range
+    ordinals = label_ordinals[label_codes]
+    start = int(ordinals.min())
+    columns = ordinals - start
+    metric_codes, metric_names = pd.factorize(df["metric_name"], sort=True)
+    width = int(columns.max()) + 1
+    # The most recently stored value of a metric for a period wins
+    latest = ~pd.Series(metric_codes * width + columns).duplicated(keep="last").to_numpy()
+    grid = np.full((len(metric_names), width), np.nan)
+    grid[metric_codes[latest], columns[latest]] = df["metric_value"].to_numpy(dtype=float)[latest]
+    reported = np.unique(columns)
+
+    month_over_month = _growth(grid, 1) if kind == "M" else np.full_like(grid, np.nan)
+    year_over_year = _growth(grid, 12 // months_per_period)
+
+    values = grid[:, reported]
+    rolling = (
+        pd.DataFrame(values.T).rolling(window, min_periods=window).mean().to_numpy().T
+    )
+    volatility = _volatility(_growth(values, 1))
+    cagr = _cagr(grid, months_per_period)
+
+    result["periods"] = [
+        str(pd.Period(ordinal=int(column) + start, freq=kind)) for column in reported
+    ]
+    result["frequency"] = frequency
+    for i, name in enumerate(metric_names):
+        result["metrics"][name] = {
+            "values": _to_list(values[i]),
+            "momGrowth": _to_list(month_over_month[i, reported]),
+            "yoyGrowth": _to_list(year_over_year[i, reported]),
+            "rollingMean": _to_list(rolling[i]),
+            "cagr": _to_list(cagr[i:i + 1])[0],
+            "volatility": _to_list(volatility[i:i + 1])[0],
+        }
+    return result
+
+
+class TimeSeriesAnalyticsCache:
+    """LRU of computed analytics keyed by organization and options, invalidated when new data is stored."""
+
+    def __init__(self, max_entries: int = 64):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of analytics results kept.
+        """
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, int], Dict[str, Any]]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def generation(self, organization_id: str) -> int:
+        """
+        Get the data generation of an organization, bumped by each invalidation.
+
+        Args:
+            organization_id: The organization.
+
+        Returns:
+            The current generation, to pass back to ``set``.
+        """
+        with self._lock:
+            return self._generations.get(organization_id, 0)
+
+    def get(self, organization_id: str, window: int) -> Optional[Dict[str, Any]]:
+        """
+        Get cached analytics.
+
+        Args:
+            organization_id: The organization.
+            window: The rolling mean window.
+
+        Returns:
+            The analytics, or None if they are not cached.
+        """
+        key = (organization_id, window)
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+            return result
+
+    def set(self, organization_id: str, window: int, result: Dict[str, Any], generation: int) -> None:
+        """
+        Cache analytics computed from the data of a given generation.
+
+        Results computed from data that changed in the meantime are not cached.
+
+        Args:
+            organization_id: The organization.
+            window: The rolling mean window.
+            result: The analytics.
+            generation: The organization's generation before its data was loaded.
+        """
+        with self._lock:
+            if self._generations.get(organization_id, 0) != generation:
+                return
+            key = (organization_id, window)
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, organization_id: str) -> None:
+        """
+        Drop every cached result of an organization after new data is stored.
+
+        Args:
+            organization_id: The organization.
+        """
+        with self._lock:
+            self._generations[organization_id] = self._generations.get(organization_id, 0) + 1
+            for key in [key for key in self._entries if key[0] == organization_id]:
+                del self._entries[key]
+        logger.debug(f"Invalidated time series analytics of organization {organization_id}")
+
+
+# Shared cache of the API process
+time_series_cache = TimeSeriesAnalyticsCache()
@@ -0,0 +1,259 @@
+"""
+Receiving uploaded workbooks for analysis.
+
+Uploads, and workbooks inside uploaded ZIP archives, are read in chunks and
+hashed on the fly. Workbooks up to ``UPLOAD_MEMORY_LIMIT_MB`` are kept in
+memory and parsed from their bytes without a temporary file; larger ones are
+streamed chunk by chunk to a temporary file, so memory stays bounded
+regardless of the upload size. Handing an in-memory workbook to the process
+pool pickles a copy of its bytes for the worker, once per job, whereas a
+spooled workbook only passes its path. ZIP archives are checked against their member count and declared
+uncompressed sizes before anything is extracted, and no member may grow past
+its declared size, so an archive cannot fill memory or disk.
+"""
+
+import hashlib
+import io
+import os
+import shutil
+import tempfile
+import zipfile
+from typing import BinaryIO, List, Optional
+
+from fastapi import UploadFile
+
+from app.core.config import settings
+from app.utils.logger import app_logger
+
+# Configure module-specific logger
+logger = app_logger.getChild("uploads")
+
+# Size of the chunks read from the upload stream
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+class ArchiveLimitError(ValueError):
+    """Raised when a ZIP archive holds more workbooks or more bytes than allowed."""
+
+
+class UploadedWorkbook:
+    """
+    A received workbook, held either in memory or in a temporary file.
+
+    Exactly one of ``content`` and ``path`` is set. When the workbook is on
+    disk, its file keeps the uploaded base name, so the extension matches the
+    upload and the analysis reports the original name as its source.
+    """
+
+    def __init__(
+        self,
+        filename: str,
+        digest: str,
+        size: int,
+        content: Optional[bytes] = None,
+        path: Optional[str] = None,
+    ):
+        """
+        Initialize the workbook.
+
+        Args:
+            filename: Name of the uploaded file.
+            digest: Hex SHA-256 digest of the workbook bytes.
+            size: Size of the workbook in bytes.
+            content: Workbook bytes when held in memory.
+            path: Path to the temporary file when spooled to disk.
+        """
+        self.filename = filename
+        self.digest = digest
+        self.size = size
+        self.content = content
+        self.path = path
+
+    @property
+    def name(self) -> str:
+        """Path to analyze: the temporary file, or the upload name for in-memory workbooks."""
+        return self.path or os.path.basename(self.filename)
+
+    def close(self) -> None:
+        """Release the workbook, removing its temporary file if there is one."""
+        if self.path is not None:
+            shutil.rmtree(os.path.dirname(self.path), ignore_errors=True)
+            self.path = None
+        self.content = None
+
+
+def _spool_path(filename: str) -> str:
+    """Create a private temporary directory and return a path in it named after the upload."""
+    directory = tempfile.mkdtemp(prefix="upload_")
+    return os.path.join(directory, os.path.basename(filename) or "upload.xlsx")
+
+
+class _WorkbookSpooler:
+    """Collects workbook chunks in memory, moving them to disk past the memory limit."""
+
+    def __init__(
+        self, filename: str, memory_limit: Optional[int] = None, max_size: Optional[int] = None
+    ):
+        """
+        Initialize the spooler.
+
+        Args:
+            filename: Name of the workbook.
+            memory_limit: Largest workbook kept in memory, in bytes. Defaults
+                to ``UPLOAD_MEMORY_LIMIT_MB``.
+            max_size: Largest workbook accepted, in bytes; unlimited when not given.
+        """
+        if memory_limit is None:
+            memory_limit = settings.UPLOAD_MEMORY_LIMIT_MB * 1024 * 1024
+
+        self.filename = filename
+        self.memory_limit = memory_limit
+        self.sha256 = hashlib.sha256()
+        self.buffer = io.BytesIO()
+        self.spool: Optional[BinaryIO] = None
+        self.path: Optional[str] = None
+        self.size = 0
+        self.max_size = max_size
+
+    def write(self, chunk: bytes) -> None:
+        """
+        Add a chunk of the workbook.
+
+        Raises:
+            ArchiveLimitError: If the workbook grows past ``max_size``.
+        """
+        self.size += len(chunk)
+        if self.max_size is not None and self.size > self.max_size:
+            raise ArchiveLimitError(f"{self.filename} is larger than its declared size")
+        self.sha256.update(chunk)
+
+        if self.spool is None and self.size > self.memory_limit:
+            # Too large for memory: move what was read so far to disk
+            self.path = _spool_path(self.filename)
+            self.spool = open(self.path, "wb")
+            self.spool.write(self.buffer.getbuffer())
+            self.buffer = io.BytesIO()
+            logger.info(f"Spooling upload {self.filename} to disk")
+
+        if self.spool is None:
+            self.buffer.write(chunk)
+        else:
+            self.spool.write(chunk)
+
+    def finish(self) -> UploadedWorkbook:
+        """Complete the workbook once every chunk has been written."""
+        digest = self.sha256.hexdigest()
+        if self.spool is not None:
+            self.spool.close()
+            return UploadedWorkbook(self.filename, digest, self.size, path=self.path)
+        return UploadedWorkbook(self.filename, digest, self.size, content=self.buffer.getvalue())
+
+    def abort(self) -> None:
+        """Discard the workbook after a failure."""
+        if self.spool is not None:
+            self.spool.close()
+        if self.path is not None:
+            shutil.rmtree(os.path.dirname(self.path), ignore_errors=True)
+
+
+async def receive_upload(
+    file: UploadFile, memory_limit: Optional[int] = None
+) -> UploadedWorkbook:
+    """
+    Read an upload in chunks, hashing it and keeping it in memory or on disk.
+
+    Args:
+        file: The uploaded file.
+        memory_limit: Largest upload kept in memory, in bytes. Defaults to
+            ``UPLOAD_MEMORY_LIMIT_MB``.
+
+    Returns:
+        The received workbook. Call ``close`` once it is no longer needed.
+    """
+    spooler = _WorkbookSpooler(file.filename, memory_limit)
+    try:
+        while True:
+            chunk = await file.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            spooler.write(chunk)
+    except BaseException:
+        spooler.abort()
+        raise
+    return spooler.finish()
+
+
+def _is_workbook(info: zipfile.ZipInfo) -> bool:
+    """Check whether an archive member is an Excel workbook to extract."""
+    base = os.path.basename(info.filename)
+    return not (
+        info.is_dir()
+        or info.filename.startswith("__MACOSX/")
+        or base.startswith((".", "~$"))
+        or not base.lower().endswith((".xlsx", ".xls"))
+    )
+
+
+def extract_workbooks(
+    archive: UploadedWorkbook,
+    memory_limit: Optional[int] = None,
+    max_files: Optional[int] = None,
+    max_bytes: Optional[int] = None,
+) -> List[UploadedWorkbook]:
+    """
+    Extract the Excel workbooks from a received ZIP archive.
+
+    Directories, hidden files, Office lock files, macOS metadata and
+    non-Excel members are skipped. Each workbook is named by its path inside
+    the archive and held in memory or on disk like a direct upload. The
+    limits are checked against the archive's directory before anything is
+    extracted, and a member that inflates past its declared size is rejected
+    as soon as it does.
+
+    Args:
+        archive: The received ZIP archive.
+        memory_limit: Largest workbook kept in memory, in bytes.
+        max_files: Most workbooks to extract; unlimited when not given.
+        max_bytes: Most uncompressed bytes to extract; unlimited when not given.
+
+    Returns:
+        The extracted workbooks. Call ``close`` on each once it is no longer needed.
+
+    Raises:
+        zipfile.BadZipFile: If the archive is not a valid ZIP file
+        ArchiveLimitError: If the archive exceeds ``max_files`` or ``max_bytes``.
+    """
+    source = io.BytesIO(archive.content) if archive.content is not None else archive.path
+    workbooks: List[UploadedWorkbook] = []
+    try:
+        with zipfile.ZipFile(source) as zf:
+            members = [info for info in zf.infolist() if _is_workbook(info)]
+            if max_files is not None and len(members) > max_files:
+                raise ArchiveLimitError(
+                    f"{archive.filename} holds {len(members)} workbooks, more than the "
+                    f"{max(max_files, 0)} still allowed in this batch"
+                )
+            declared = sum(info.file_size for info in members)
+            if max_bytes is not None and declared > max_bytes:
+                raise ArchiveLimitError(
+                    f"{archive.filename} would extract to {declared} bytes, more than the "
+                    f"{max(max_bytes, 0)} still allowed in this batch"
+                )
+
+            for info in members:
+                spooler = _WorkbookSpooler(info.filename, memory_limit, max_size=info.file_size)
+                try:
+                    with zf.open(info) as member:
+                        for chunk in iter(lambda: member.read(UPLOAD_CHUNK_SIZE), b""):
+                            spooler.write(chunk)
+                except BaseException:
+                    spooler.abort()
+                    raise
+                workbooks.append(spooler.finish())
+    except BaseException:
+        for workbook in workbooks:
+            workbook.close()
+        raise
+
+    logger.info(f"Extracted {len(workbooks)} workbooks from {archive.filename}")
+    return workbooks
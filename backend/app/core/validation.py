@@ -3,14 +3,36 @@ Data validation module for profit and loss reports.
 
 This module provides functions for validating Excel files
 and ensuring they contain valid profit and loss data.
+
+Validation is a registry of named rules, each with a relative cost and a
+severity. Rules run cheapest first and stop at the first failing fatal rule.
+Their severity, cost and enabled state, as well as the validator's
+thresholds, can be overridden per organization in the JSON file named by
+``VALIDATION_RULES_PATH``:
+
+    {
+        "default": {"rules": {"empty_cells": {"severity": "warning"}}},
+        "organizations": {
+            "<organization id>": {
+                "rules": {"section_keywords": {"enabled": false}},
+                "options": {"min_rows": 5}
+            }
+        }
+    }
 """
 
+import hashlib
+import json
 import os
-from typing import Dict, List, Tuple
+import time
+from typing import Any, Callable, Dict, List, Literal, NamedTuple, Optional, Tuple
 
 import pandas as pd
-from pydantic import BaseModel, Field, ValidationError, field_validator
+from pydantic import BaseModel, Field, ValidationError, ValidationInfo, field_validator
 
+from app.core.config import settings
+from app.core.ingestion import HEADER_WINDOW_ROWS, IngestionContext
+from app.utils.keywords import REQUIRED_KEYWORDS, VALIDATION_SECTION_KEYWORDS
 from app.utils.logger import app_logger
 
 # Configure module-specific logger
@@ -33,6 +55,39 @@ class ValidationResult(BaseModel):
     warnings: List[str] = Field(
         default_factory=list, description="List of validation warnings"
     )
+    timings: Dict[str, float] = Field(
+        default_factory=dict,
+        description="Milliseconds spent in each rule that ran, in run order, and in "
+        "reading the header window (header_window) and the full sheet (parse)",
+    )
+
+
+# Rule severities: a failing fatal rule stops validation, an error rule makes
+# the file invalid and a warning rule only reports
+SEVERITY_FATAL = "fatal"
+SEVERITY_ERROR = "error"
+SEVERITY_WARNING = "warning"
+
+Severity = Literal["fatal", "error", "warning"]
+
+
+class ValidationRule(NamedTuple):
+    """A named validation check with its relative cost and severity."""
+
+    name: str
+    check: Callable[["ProfitLossExcelValidator", IngestionContext], List[str]]
+    cost: float
+    severity: str
+    # Whether the first HEADER_WINDOW_ROWS rows are enough to decide the rule
+    header_window: bool = False
+
+
+class RuleOverride(BaseModel):
+    """Configured changes to a registered validation rule."""
+
+    enabled: bool = Field(True, description="Whether the rule runs")
+    severity: Optional[Severity] = Field(None, description="Severity replacing the default")
+    cost: Optional[float] = Field(None, description="Relative cost replacing the default")
 
 
 class ProfitLossExcelValidator(BaseModel):
@@ -42,50 +97,32 @@ class ProfitLossExcelValidator(BaseModel):
     This model validates Excel files to ensure they contain valid profit and loss data.
     """
 
+    in_memory: bool = Field(
+        False, description="The workbook is parsed from memory and file_path is only its name"
+    )
     file_path: str = Field(..., description="Path to the Excel file")
     min_rows: int = Field(10, description="Minimum number of rows required")
     min_cols: int = Field(2, description="Minimum number of columns required")
     required_keywords: List[str] = Field(
-        default_factory=lambda: [
-            "profit",
-            "loss",
-            "income",
-            "expense",
-            "revenue",
-            "sales",
-        ],
+        default_factory=lambda: list(REQUIRED_KEYWORDS),
         description="At least one of these keywords must be present in the file",
     )
     section_keywords: Dict[str, List[str]] = Field(
         default_factory=lambda: {
-            "income": [
-                "trading income",
-                "revenue",
-                "sales",
-                "income",
-                "operating revenue",
-            ],
-            "expenses": [
-                "operating expenses",
-                "expenses",
-                "overhead",
-                "indirect costs",
-            ],
-            "profit": [
-                "gross profit",
-                "net profit",
-                "net income",
-                "profit for the period",
-            ],
+            section: list(keywords)
+            for section, keywords in VALIDATION_SECTION_KEYWORDS.items()
         },
         description="Keywords to identify essential P&L sections",
     )
+    rules: Dict[str, RuleOverride] = Field(
+        default_factory=dict, description="Overrides of the registered rules, by rule name"
+    )
 
     @field_validator("file_path")
     @classmethod
-    def file_must_exist(cls, v):
+    def file_must_exist(cls, v, info: ValidationInfo):
         """Validate that the file exists and is an Excel file."""
-        if not os.path.exists(v):
+        if not info.data.get("in_memory") and not os.path.exists(v):
             raise ValueError(f"File not found: {v}")
 
         if not v.lower().endswith((".xlsx", ".xls")):
@@ -93,16 +130,17 @@ class ProfitLossExcelValidator(BaseModel):
 
         return v
 
-    def validate_file_structure(self, df: pd.DataFrame) -> List[str]:
+    def validate_dimensions(self, context: IngestionContext) -> List[str]:
         """
-        Validate the basic structure of the Excel file.
+        Check the sheet has enough rows and columns.
 
         Args:
-            df: DataFrame containing the Excel data
+            context: Ingestion context of the sheet
 
         Returns:
-            List of error messages, empty if valid
+            List of error messages
         """
+        df = context.df
         errors = []
 
         # Check minimum dimensions
@@ -120,78 +158,193 @@ class ProfitLossExcelValidator(BaseModel):
         if df.empty:
             errors.append("File contains no data")
 
-        # Check for too many NaN values (>80% of cells)
-        nan_percentage = df.isna().sum().sum() / (df.shape[0] * df.shape[1]) * 100
-        if nan_percentage > 80:
-            errors.append(f"File contains too many empty cells ({nan_percentage:.1f}%)")
-
         return errors
 
-    def validate_content(self, df: pd.DataFrame) -> Tuple[List[str], List[str]]:
+    def validate_empty_cells(self, context: IngestionContext) -> List[str]:
         """
-        Validate the content of the Excel file to ensure it's a P&L report.
+        Check the sheet is not mostly empty cells (>80%).
 
         Args:
-            df: DataFrame containing the Excel data
+            context: Ingestion context of the sheet
 
         Returns:
-            Tuple of (errors, warnings)
+            List of error messages
         """
-        errors = []
-        warnings = []
+        nan_percentage = context.profile.null_share * 100
+        if nan_percentage > 80:
+            return [f"File contains too many empty cells ({nan_percentage:.1f}%)"]
+        return []
+
+    def validate_keywords(self, context: IngestionContext) -> List[str]:
+        """
+        Check for the required keywords in the first 20 rows.
+
+        Args:
+            context: Ingestion context of the rows to check
 
-        # Check for required keywords
-        found_keywords = []
-        for i in range(min(20, len(df))):  # Check first 20 rows
-            row_str = " ".join(str(x).lower() for x in df.iloc[i] if pd.notna(x))
-            for keyword in self.required_keywords:
-                if keyword in row_str:
-                    found_keywords.append(keyword)
+        Returns:
+            List of error messages
+        """
+        keyword_hits = context.keyword_hits(self.required_keywords).iloc[:20]
+        found_keywords = [
+            keyword for keyword, found in keyword_hits.any(axis=0).items() if found
+        ]
 
         if not found_keywords:
-            errors.append(
+            return [
                 "File does not appear to be a profit and loss report. "
                 f"None of the required keywords ({', '.join(self.required_keywords)}) were found."
-            )
+            ]
+        return []
 
-        # Check for essential P&L sections
-        found_sections = {section: False for section in self.section_keywords}
+    def find_sections(self, context: IngestionContext) -> Dict[str, bool]:
+        """
+        Look for each essential P&L section in the first 30 rows.
 
-        for i in range(min(30, len(df))):  # Check first 30 rows
-            row_str = " ".join(str(x).lower() for x in df.iloc[i] if pd.notna(x))
-            for section, keywords in self.section_keywords.items():
-                if any(keyword in row_str for keyword in keywords):
-                    found_sections[section] = True
+        Args:
+            context: Ingestion context of the rows to check
+
+        Returns:
+            Whether each section's keywords were found, by section
+        """
+        return {
+            section: bool(context.keyword_hits(keywords).iloc[:30].to_numpy().any())
+            for section, keywords in self.section_keywords.items()
+        }
+
+    def validate_sections(self, context: IngestionContext) -> List[str]:
+        """
+        Check for the essential P&L sections in the first 30 rows.
+
+        Args:
+            context: Ingestion context of the rows to check
+
+        Returns:
+            List of messages naming the missing sections
+        """
+        found_sections = self.find_sections(context)
 
         missing_sections = [
             section for section, found in found_sections.items() if not found
         ]
         if missing_sections:
-            warnings.append(
+            return [
                 f"Could not identify the following essential sections: {', '.join(missing_sections)}. "
                 "The analysis may be incomplete."
-            )
+            ]
+        return []
 
-        # Check for numeric data
-        numeric_cols = 0
-        for col in df.columns:
-            if (
-                pd.api.types.is_numeric_dtype(df[col])
-                or df[col].apply(lambda x: isinstance(x, (int, float))).any()
-            ):
-                numeric_cols += 1
+    def validate_numeric_data(self, context: IngestionContext) -> List[str]:
+        """
+        Check that the sheet contains numeric data.
 
-        if numeric_cols == 0:
-            errors.append(
+        Args:
+            context: Ingestion context of the sheet
+
+        Returns:
+            List of error messages
+        """
+        if not context.profile.has_numeric_data:
+            return [
                 "No numeric data found in the file. A profit and loss report should contain financial figures."
-            )
+            ]
+        return []
+
+    def validate_file_structure(self, df: pd.DataFrame) -> List[str]:
+        """
+        Validate the basic structure of the Excel file.
+
+        Args:
+            df: DataFrame containing the Excel data
+
+        Returns:
+            List of error messages, empty if valid
+        """
+        context = IngestionContext.from_dataframe(df)
+        return self.validate_dimensions(context) + self.validate_empty_cells(context)
+
+    def validate_content(
+        self, df: pd.DataFrame, context: Optional[IngestionContext] = None
+    ) -> Tuple[List[str], List[str]]:
+        """
+        Validate the content of the Excel file to ensure it's a P&L report.
+
+        Args:
+            df: DataFrame containing the Excel data
+            context: Optional ingestion context holding precomputed row text
+
+        Returns:
+            Tuple of (errors, warnings)
+        """
+        if context is None:
+            context = IngestionContext.from_dataframe(df)
+
+        errors = self.validate_keywords(context) + self.validate_numeric_data(context)
+        return errors, self.validate_sections(context)
+
+    def active_rules(self) -> List[ValidationRule]:
+        """
+        Get the enabled rules with their overrides applied, cheapest first.
+
+        Returns:
+            The rules to run, in run order
+        """
+        rules = []
+        for name, rule in VALIDATION_RULES.items():
+            override = self.rules.get(name)
+            if override is not None:
+                if not override.enabled:
+                    continue
+                rule = rule._replace(
+                    **override.model_dump(include={"severity", "cost"}, exclude_none=True)
+                )
+            rules.append(rule)
+        return sorted(rules, key=lambda rule: rule.cost)
+
+    def run_rules(
+        self, rules: List[ValidationRule], context: IngestionContext, result: ValidationResult
+    ) -> bool:
+        """
+        Run rules in order, recording their messages and timings in the result.
 
-        return errors, warnings
+        Args:
+            rules: The rules to run
+            context: Ingestion context of the rows to check
+            result: Result to add messages and timings to
 
-    def validate(self) -> ValidationResult:
+        Returns:
+            False if a fatal rule failed and validation should stop
+        """
+        for rule in rules:
+            start = time.perf_counter()
+            messages = rule.check(self, context)
+            result.timings[rule.name] = round((time.perf_counter() - start) * 1000, 3)
+
+            if not messages:
+                continue
+            if rule.severity == SEVERITY_WARNING:
+                result.warnings.extend(messages)
+                continue
+
+            result.errors.extend(messages)
+            result.is_valid = False
+            if rule.severity == SEVERITY_FATAL:
+                logger.info(f"Validation stopped by fatal rule {rule.name}")
+                return False
+        return True
+
+    def validate(self, context: Optional[IngestionContext] = None) -> ValidationResult:
         """
         Validate the Excel file.
 
+        Rules that the header window decides are run first on that window
+        alone, so files failing them are rejected without parsing the whole
+        sheet. The remaining rules then run on the full sheet.
+
+        Args:
+            context: Optional ingestion context; when given, its parsed frame is
+                reused (and populated) instead of reading the file again
+
         Returns:
             ValidationResult object with validation results
 
@@ -201,23 +354,34 @@ class ProfitLossExcelValidator(BaseModel):
         logger.info(f"Validating Excel file: {self.file_path}")
 
         try:
-            # Try to read the Excel file
-            df = pd.read_excel(self.file_path)
-
-            # Validate structure
-            structure_errors = self.validate_file_structure(df)
-
-            # Validate content
-            content_errors, warnings = self.validate_content(df)
-
-            # Combine all errors
-            all_errors = structure_errors + content_errors
-
-            # Create validation result
-            result = ValidationResult(
-                is_valid=len(all_errors) == 0, errors=all_errors, warnings=warnings
-            )
-
+            if context is None:
+                context = IngestionContext(file_path=self.file_path)
+
+            result = ValidationResult()
+            rules = self.active_rules()
+
+            if not context.is_parsed:
+                start = time.perf_counter()
+                window = context.header_window()
+                result.timings["header_window"] = round((time.perf_counter() - start) * 1000, 3)
+                if len(window) < HEADER_WINDOW_ROWS:
+                    # The window is the whole sheet
+                    probe_rules, rules = rules, []
+                else:
+                    probe_rules = [rule for rule in rules if rule.header_window]
+                    rules = [rule for rule in rules if not rule.header_window]
+                if not self.run_rules(probe_rules, IngestionContext.from_dataframe(window), result):
+                    rules = []
+
+            if rules and result.is_valid:
+                # Read the Excel file (once, shared through the context)
+                if not context.is_parsed:
+                    start = time.perf_counter()
+                    context.df
+                    result.timings["parse"] = round((time.perf_counter() - start) * 1000, 3)
+                self.run_rules(rules, context, result)
+
+            logger.info(f"Validation rule timings (ms): {result.timings}")
             if result.is_valid:
                 logger.info(f"File validation successful: {self.file_path}")
                 if result.warnings:
@@ -233,7 +397,194 @@ class ProfitLossExcelValidator(BaseModel):
             raise ExcelFileValidationError(f"Error reading Excel file: {str(e)}")
 
 
-def validate_excel_file(file_path: str) -> ValidationResult:
+# Registered validation rules with their default cost and severity. Costs are
+# relative: the dimension check reads the sheet shape, the keyword rules share
+# one scan of the row text and the cell rules share the column profile.
+VALIDATION_RULES: Dict[str, ValidationRule] = {
+    rule.name: rule
+    for rule in [
+        ValidationRule(
+            "dimensions", ProfitLossExcelValidator.validate_dimensions, 1, SEVERITY_FATAL
+        ),
+        ValidationRule(
+            "required_keywords",
+            ProfitLossExcelValidator.validate_keywords,
+            10,
+            SEVERITY_FATAL,
+            header_window=True,
+        ),
+        ValidationRule(
+            "section_keywords",
+            ProfitLossExcelValidator.validate_sections,
+            11,
+            SEVERITY_WARNING,
+            header_window=True,
+        ),
+        ValidationRule(
+            "empty_cells", ProfitLossExcelValidator.validate_empty_cells, 20, SEVERITY_ERROR
+        ),
+        ValidationRule(
+            "numeric_data", ProfitLossExcelValidator.validate_numeric_data, 21, SEVERITY_ERROR
+        ),
+    ]
+}
+
+
+class RuleSetConfig(BaseModel):
+    """Validation settings of one organization, or the default ones."""
+
+    rules: Dict[str, RuleOverride] = Field(
+        default_factory=dict, description="Overrides of the registered rules, by rule name"
+    )
+    options: Dict[str, Any] = Field(
+        default_factory=dict,
+        description="Validator settings such as min_rows, min_cols or required_keywords",
+    )
+
+    def merged(self, other: "RuleSetConfig") -> "RuleSetConfig":
+        """Get this configuration with the fields set in ``other`` taking precedence."""
+        rules = dict(self.rules)
+        for name, override in other.rules.items():
+            base = rules.get(name, RuleOverride())
+            rules[name] = base.model_copy(update=override.model_dump(exclude_unset=True))
+        return RuleSetConfig(rules=rules, options={**self.options, **other.options})
+
+
+class ValidationRuleSets:
+    """Validation rule configuration per organization, loaded from a JSON file."""
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Initialize the rule sets.
+
+        Args:
+            path: JSON file with a ``default`` entry and an ``organizations``
+                mapping; without one every organization uses the registry defaults.
+        """
+        self.path = path
+        self.default = RuleSetConfig()
+        self.organizations: Dict[str, RuleSetConfig] = {}
+        self._digests: Dict[str, str] = {}
+        if path:
+            self.load()
+
+    def _parse(self, name: str, data: Dict[str, Any]) -> RuleSetConfig:
+        """Parse one rule set, dropping unknown rules and validator options."""
+        config = RuleSetConfig.model_validate(data)
+        for rule in [r for r in config.rules if r not in VALIDATION_RULES]:
+            logger.warning(f"Ignoring unknown validation rule {rule} in rule set {name}")
+            del config.rules[rule]
+        allowed = set(ProfitLossExcelValidator.model_fields) - {"file_path", "in_memory", "rules"}
+        for option in [o for o in config.options if o not in allowed]:
+            logger.warning(f"Ignoring unknown validation option {option} in rule set {name}")
+            del config.options[option]
+        return config
+
+    def load(self) -> None:
+        """
+        Read the rule sets from the configured file.
+
+        Raises:
+            OSError: If the file cannot be read
+            ValueError: If the file is not valid rule set JSON
+        """
+        with open(self.path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+
+        self.default = self._parse("default", data.get("default", {}))
+        self.organizations = {
+            str(organization_id): self._parse(str(organization_id), config)
+            for organization_id, config in data.get("organizations", {}).items()
+        }
+        self._digests = {}
+        logger.info(
+            f"Loaded validation rules from {self.path} "
+            f"({len(self.organizations)} organization overrides)"
+        )
+
+    def name_for(self, organization_id: Optional[str] = None) -> str:
+        """
+        Get the name of the rule set that applies to an organization.
+
+        Args:
+            organization_id: The organization, or None for the default rules
+
+        Returns:
+            The organization id if it has its own rules, "default" otherwise
+        """
+        if organization_id is not None and str(organization_id) in self.organizations:
+            return str(organization_id)
+        return "default"
+
+    def digest_for(self, organization_id: Optional[str] = None) -> str:
+        """
+        Get a digest of the validation settings that apply to an organization.
+
+        Unlike the rule set name, the digest changes when the rules file is
+        edited, so results validated under earlier rules are not reused.
+
+        Args:
+            organization_id: The organization, or None for the default rules
+
+        Returns:
+            Hex SHA-256 of the resolved settings
+        """
+        name = self.name_for(organization_id)
+        if name not in self._digests:
+            settings_json = json.dumps(
+                self.config_for(organization_id).model_dump(mode="json"), sort_keys=True, default=str
+            )
+            self._digests[name] = hashlib.sha256(settings_json.encode()).hexdigest()
+        return self._digests[name]
+
+    def validator_for(
+        self, file_path: str, organization_id: Optional[str] = None, in_memory: bool = False
+    ) -> ProfitLossExcelValidator:
+        """
+        Build a validator with the settings that apply to an organization.
+
+        Args:
+            file_path: Path to the Excel file, or its name when ``in_memory``
+            organization_id: The organization, or None for the default rules
+            in_memory: The workbook is held in memory and file_path is only its name
+
+        Returns:
+            The configured validator
+
+        Raises:
+            ValidationError: If the file path or the configured options are invalid
+        """
+        config = self.config_for(organization_id)
+        return ProfitLossExcelValidator(
+            file_path=file_path, in_memory=in_memory, rules=config.rules, **config.options
+        )
+
+    def config_for(self, organization_id: Optional[str] = None) -> RuleSetConfig:
+        """
+        Get the validation settings that apply to an organization.
+
+        Args:
+            organization_id: The organization, or None for the default rules
+
+        Returns:
+            The default settings with the organization's overrides applied
+        """
+        name = self.name_for(organization_id)
+        if name == "default":
+            return self.default
+        return self.default.merged(self.organizations[name])
+
+
+# Shared rule sets configured from the application settings
+validation_rule_sets = ValidationRuleSets(settings.VALIDATION_RULES_PATH)
+
+
+def validate_excel_file(
+    file_path: str,
+    context: Optional[IngestionContext] = None,
+    in_memory: bool = False,
+    organization_id: Optional[str] = None,
+) -> ValidationResult:
     """
     Validate an Excel file to ensure it contains valid profit and loss data.
 
@@ -241,6 +592,9 @@ def validate_excel_file(file_path: str) -> ValidationResult:
 
     Args:
         file_path: Path to the Excel file
+        context: Optional ingestion context shared with the analyzer
+        in_memory: The workbook is held by the context and file_path is only its name
+        organization_id: Organization whose validation rules apply
 
     Returns:
         ValidationResult object with validation results
@@ -249,8 +603,8 @@ def validate_excel_file(file_path: str) -> ValidationResult:
         ExcelFileValidationError: If the file cannot be read or validated
     """
     try:
-        validator = ProfitLossExcelValidator(file_path=file_path)
-        return validator.validate()
+        validator = validation_rule_sets.validator_for(file_path, organization_id, in_memory)
+        return validator.validate(context)
     except ValidationError as e:
         logger.error(f"Validation error: {str(e)}")
         return ValidationResult(is_valid=False, errors=[f"Invalid file: {str(e)}"])
@@ -19,10 +19,47 @@ class PnLSections(BaseModel):
     operatingExpenses: PnLSection
     netProfit: float
 
+class PnLPeriodSection(BaseModel):
+    accounts: List[str]
+    codes: List[Optional[str]]
+    values: List[List[Optional[float]]]  # accounts x periods
+    totals: List[Optional[float]]
+
+class PnLPeriodValues(BaseModel):
+    periods: List[str]
+    sections: Dict[str, PnLPeriodSection]
+    grossProfit: Optional[List[Optional[float]]] = None
+    netProfit: Optional[List[Optional[float]]] = None
+
 class PnLMetadata(BaseModel):
     uploadDate: str
     source: str
     currency: str
+    engine: Optional[str] = None  # Excel reader engine that parsed the file
+    sheet: Optional[str] = None  # Worksheet analyzed, for multi-sheet uploads
+
+class CategoryTotal(BaseModel):
+    total: float
+    count: int
+
+class CategorySummary(BaseModel):
+    categories: Dict[str, CategoryTotal]  # Across all sections
+    sections: Dict[str, Dict[str, CategoryTotal]]
+
+class BalanceSheetFigures(BaseModel):
+    totalAssets: Optional[float] = None
+    totalLiabilities: Optional[float] = None
+    totalEquity: Optional[float] = None
+    currentAssets: Optional[float] = None
+    currentLiabilities: Optional[float] = None
+    inventory: Optional[float] = None
+
+class BalanceSheetData(BaseModel):
+    companyName: str
+    period: str
+    sections: Dict[str, Any]  # Account sections and total rows found in the report
+    figures: BalanceSheetFigures  # Inputs of the balance sheet ratios
+    metadata: PnLMetadata
 
 class FinancialData(BaseModel):
     companyName: str
@@ -31,6 +68,18 @@ class FinancialData(BaseModel):
     reportType: str
     sections: PnLSections
     metadata: PnLMetadata
+    periodValues: Optional[PnLPeriodValues] = None
+    categorySummary: Optional[CategorySummary] = None
+    balanceSheet: Optional[BalanceSheetData] = None  # Balance sheet uploaded with the report
+
+class SheetFinancialData(BaseModel):
+    sheetName: str
+    data: Optional[FinancialData] = None
+    error: Optional[str] = None
+
+class MultiSheetFinancialData(BaseModel):
+    sheets: List[SheetFinancialData]
+    consolidated: Optional[FinancialData] = None
 
 class FinancialMetrics(BaseModel):
     gross_margin: float
@@ -0,0 +1,24 @@
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import datetime
+from app.models.financial import FinancialData
+
+class UploadJobCreated(BaseModel):
+    """Model for the response to an asynchronous upload."""
+    jobId: str
+    status: str
+    statusUrl: str
+    eventsUrl: str
+
+class UploadJob(BaseModel):
+    """Model for the status of an asynchronous upload job."""
+    jobId: str
+    filename: Optional[str] = None
+    status: str  # queued, running, completed or failed
+    stage: Optional[str] = None  # current analysis stage while running
+    stages: List[str]
+    result: Optional[FinancialData] = None
+    error: Optional[str] = None
+    statusCode: Optional[int] = None  # HTTP status the synchronous upload would have returned
+    createdAt: datetime
+    updatedAt: datetime
@@ -0,0 +1,77 @@
+from pydantic import BaseModel, Field, field_validator, model_validator
+from typing import Dict, List, Optional, Union
+from datetime import datetime
+
+class CodeRange(BaseModel):
+    """Model for an inclusive range of account codes mapped to a category."""
+    start: int
+    end: int
+    category: str
+
+    @model_validator(mode='after')
+    def check_order(self):
+        if self.end < self.start:
+            raise ValueError(f"Code range end {self.end} is before its start {self.start}")
+        return self
+
+class CategoryMappingUpdate(BaseModel):
+    """Model for a new version of an organization's chart-of-accounts mappings."""
+    # Name keyword -> category, checked before the built-in keywords
+    accountCategories: Dict[str, str] = Field(default_factory=dict)
+    # Replaces the built-in code ranges when given
+    codeRanges: Optional[List[CodeRange]] = None
+    # Section -> {"default": category, keyword: category}, merged over the built-in ones
+    sectionCategories: Dict[str, Dict[str, str]] = Field(default_factory=dict)
+
+    @field_validator('accountCategories')
+    @classmethod
+    def lowercase_keywords(cls, v):
+        # Names are matched in lowercase
+        return {keyword.lower(): category for keyword, category in v.items() if keyword}
+
+    @field_validator('sectionCategories')
+    @classmethod
+    def lowercase_section_keywords(cls, v):
+        return {
+            section: {keyword.lower(): category for keyword, category in mapping.items() if keyword}
+            for section, mapping in v.items()
+        }
+
+    @field_validator('codeRanges')
+    @classmethod
+    def check_overlaps(cls, v):
+        if v:
+            ranges = sorted(v, key=lambda r: r.start)
+            for previous, current in zip(ranges, ranges[1:]):
+                if current.start <= previous.end:
+                    raise ValueError(f"Code ranges overlap at code {current.start}")
+        return v
+
+class CategoryMapping(CategoryMappingUpdate):
+    """Model for a stored version of an organization's chart-of-accounts mappings."""
+    organizationId: str
+    version: int
+    createdAt: datetime
+
+class CategorizationRequest(BaseModel):
+    """Model for a columnar chart of accounts to categorize in bulk."""
+    names: List[str]
+    # Aligned with names when given
+    codes: Optional[List[Optional[Union[str, int]]]] = None
+    sections: Optional[List[str]] = None
+
+    @model_validator(mode='after')
+    def check_lengths(self):
+        for field in ('codes', 'sections'):
+            values = getattr(self, field)
+            if values is not None and len(values) != len(self.names):
+                raise ValueError(f"Expected {len(self.names)} {field}, got {len(values)}")
+        return self
+
+class CategorizationResponse(BaseModel):
+    """Model for the categories of a chart of accounts, in request order."""
+    organizationId: str
+    # Mappings version applied; None when the built-in rules were used
+    version: Optional[int] = None
+    categories: List[str]
+    rules: List[str]
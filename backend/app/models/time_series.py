@@ -0,0 +1,41 @@
+from pydantic import BaseModel
+from typing import Dict, List, Optional
+
+class MetricTrend(BaseModel):
+    """Model for the analytics of one metric, with lists aligned with the periods."""
+    values: List[Optional[float]]
+    momGrowth: List[Optional[float]]  # Percent change from the previous month
+    yoyGrowth: List[Optional[float]]  # Percent change from the same period a year before
+    rollingMean: List[Optional[float]]
+    cagr: Optional[float] = None  # Compound annual growth rate over at least a year, in percent
+    volatility: Optional[float] = None  # Standard deviation of period-over-period growth, in percent
+
+class TimeSeriesAnalytics(BaseModel):
+    """Model for the trend analytics of an organization's stored metrics."""
+    organizationId: str
+    periods: List[str]  # Calendar order, e.g. "2024-01", "2024Q1" or "2024"
+    frequency: Optional[str] = None  # monthly, quarterly or annual
+    window: int  # Periods averaged by the rolling mean
+    unparsedPeriods: List[str]  # Stored labels that are not periods, e.g. "YTD"
+    metrics: Dict[str, MetricTrend]
+
+class AggregateTotal(BaseModel):
+    total: Optional[float] = None  # Sum of the values, for amounts
+    average: Optional[float] = None  # Mean of the values, for ratios, margins and averages
+    count: int  # Periods included
+
+class TrailingTotal(AggregateTotal):
+    endPeriod: str  # Latest month of the trailing twelve months
+
+class MetricAggregate(BaseModel):
+    """Model for the maintained aggregates of one metric."""
+    additive: bool  # Amounts are totalled; ratios, margins and averages are averaged
+    ytd: Dict[str, Dict[str, AggregateTotal]]  # Per frequency, then per fiscal year named after the year it ends in
+    ttm: Optional[TrailingTotal] = None  # Monthly data only
+
+class MetricAggregates(BaseModel):
+    """Model for the incrementally maintained aggregates of an organization."""
+    organizationId: str
+    fiscalYearStartMonth: int
+    metrics: Dict[str, MetricAggregate]
+    categories: Dict[str, AggregateTotal]  # Cumulative across stored reports
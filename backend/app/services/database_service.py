@@ -2,13 +2,20 @@
 Database service for ProfitLens.
 Handles database operations for reports, report data, and time series data.
 """
+import asyncio
 from typing import Dict, Any, List, Optional
 from fastapi import HTTPException
 from datetime import datetime
+from app.core.aggregates import aggregate_store
 from app.core.supabase_client import get_supabase_client
+from app.core.time_series import time_series_cache
+from app.utils.logger import app_logger
 from pydantic import BaseModel, Field, UUID4
 from uuid import UUID
 
+# Configure module-specific logger
+logger = app_logger.getChild('database')
+
 
 class ReportCreate(BaseModel):
     """Report creation model."""
@@ -178,6 +185,32 @@ class DatabaseService:
         except Exception as e:
             raise HTTPException(status_code=400, detail=f"Failed to fetch report data: {str(e)}")
     
+    @staticmethod
+    async def get_report_data_many(report_ids: List[str]) -> List[Dict[str, Any]]:
+        """
+        Get the report data of several reports in one query.
+        
+        Args:
+            report_ids: The report IDs.
+            
+        Returns:
+            List[Dict[str, Any]]: The report data found, in no particular order.
+            
+        Raises:
+            HTTPException: If fetching report data fails.
+        """
+        if not report_ids:
+            return []
+        
+        try:
+            supabase = get_supabase_client()
+            
+            response = supabase.table('report_data').select("*").in_("report_id", report_ids).execute()
+            
+            return response.data
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"Failed to fetch report data: {str(e)}")
+    
     @staticmethod
     async def store_time_series_data(time_series_data: List[TimeSeriesDataCreate]) -> List[Dict[str, Any]]:
         """
@@ -208,9 +241,19 @@ class DatabaseService:
             
             response = supabase.table('time_series_data').upsert(data_to_insert).execute()
             
-            return response.data
+            # Analytics computed from the previous data are now stale
+            for organization_id in {item["organization_id"] for item in data_to_insert}:
+                time_series_cache.invalidate(organization_id)
         except Exception as e:
             raise HTTPException(status_code=400, detail=f"Storing time series data failed: {str(e)}")
+        
+        # The data is stored either way; stale aggregates are logged rather than failing the request
+        try:
+            await asyncio.to_thread(aggregate_store.apply, data_to_insert)
+        except Exception as e:
+            logger.error(f"Updating metric aggregates failed: {str(e)}")
+        
+        return response.data
     
     @staticmethod
     async def get_time_series_data(organization_id: str, metric_name: Optional[str] = None) -> List[Dict[str, Any]]:
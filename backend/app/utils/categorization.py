@@ -3,10 +3,22 @@ Account categorization system for profit and loss reports.
 
 This module provides functionality to categorize financial accounts based on
 account names and codes, grouping them into meaningful business categories.
+
+Rules are compiled once into a ``Categorizer``: account codes are looked up
+by bisecting the sorted code ranges, names are scanned once with a combined
+keyword pattern, and results are memoized by (normalized name, code, section),
+since charts of accounts repeat heavily across uploads.
 """
 
 import re
-from typing import Any, Dict, List, Optional
+from bisect import bisect_right
+from functools import lru_cache
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.core.config import settings
 
 # Import the application logger
 from app.utils.logger import app_logger
@@ -14,6 +26,9 @@ from app.utils.logger import app_logger
 # Configure module-specific logger
 logger = app_logger.getChild("categorization")
 
+# Bump when a change alters category assignments, so cached results are not reused
+CATEGORIZER_VERSION = "1"
+
 
 # Define category mapping based on common account names and patterns
 ACCOUNT_CATEGORIES = {
@@ -115,6 +130,308 @@ SECTION_CATEGORIES = {
 }
 
 
+class CategoryMatch(NamedTuple):
+    """Category assigned to an account and the rule that assigned it."""
+
+    category: str
+    # "code:<start>-<end>", "keyword:<keyword>", "section:<section>:<keyword>"
+    # or "default:<section>"
+    rule: str
+
+
+# Most digits of a code looked up in the code ranges; longer digit runs are not
+# account codes, and up to this length every code fits in a 64-bit integer
+MAX_CODE_DIGITS = 18
+
+
+def code_text(account_code: Any) -> Optional[str]:
+    """
+    Get the text of an account code, the first normalization step of ``normalize_code``.
+
+    Args:
+        account_code: The account code, e.g. "4-000" or 4000.
+
+    Returns:
+        Strings as they are, integers in decimal, and None for anything else.
+    """
+    if isinstance(account_code, str):
+        return account_code
+    if isinstance(account_code, (int, np.integer)) and not isinstance(account_code, bool):
+        return str(account_code)
+    if account_code is not None:
+        logger.warning(
+            f"Account code is not a string or integer: {type(account_code)}, value: {account_code}"
+        )
+    return None
+
+
+def normalize_code(account_code: Any) -> Optional[int]:
+    """
+    Get the number of an account code, ignoring any non-numeric characters.
+
+    ``Categorizer.match_many`` applies the same rules to whole columns.
+
+    Args:
+        account_code: The account code, e.g. "4000", "4-000" or 4000.
+
+    Returns:
+        The code as an integer, or None if it is neither a string nor an
+        integer, or holds no digits or more than ``MAX_CODE_DIGITS``.
+    """
+    text = code_text(account_code)
+    if text is None:
+        return None
+
+    clean_code = re.sub(r"[^0-9]", "", text)
+    if not clean_code or len(clean_code) > MAX_CODE_DIGITS:
+        return None
+    return int(clean_code)
+
+
+class Categorizer:
+    """
+    Compiled account categorization rules with a memo of past results.
+
+    A code inside one of the code ranges decides the category. Otherwise the
+    earliest keyword of ``account_categories`` found in the lowercase name
+    does, unless the section maps that keyword to a category of its own.
+    Accounts matching nothing get the section's default category.
+    """
+
+    def __init__(
+        self,
+        account_categories: Optional[Dict[str, str]] = None,
+        code_ranges: Optional[Dict[Tuple[int, int], str]] = None,
+        section_categories: Optional[Dict[str, Dict[str, str]]] = None,
+        cache_size: Optional[int] = None,
+    ):
+        """
+        Compile the rules.
+
+        Args:
+            account_categories: Category per name keyword, earliest first.
+                Defaults to ``ACCOUNT_CATEGORIES``.
+            code_ranges: Category per inclusive (start, end) code range.
+                Defaults to ``CODE_RANGES``.
+            section_categories: Default category and keyword overrides per
+                section. Defaults to ``SECTION_CATEGORIES``.
+            cache_size: Results memoized. Defaults to ``CATEGORIZER_CACHE_SIZE``.
+
+        Raises:
+            ValueError: If two code ranges overlap.
+        """
+        self.account_categories = dict(
+            ACCOUNT_CATEGORIES if account_categories is None else account_categories
+        )
+        self.code_ranges = dict(CODE_RANGES if code_ranges is None else code_ranges)
+        self.section_categories = {
+            section: dict(mapping)
+            for section, mapping in (
+                SECTION_CATEGORIES if section_categories is None else section_categories
+            ).items()
+        }
+
+        # Code ranges sorted by start, for bisection
+        ranges = sorted(self.code_ranges.items())
+        for ((_, end), _), ((start, _), _) in zip(ranges, ranges[1:]):
+            if start <= end:
+                raise ValueError(f"Account code ranges overlap at code {start}")
+        self._range_starts = [start for (start, _), _ in ranges]
+        self._ranges = ranges
+
+        self._priority = {keyword: i for i, keyword in enumerate(self.account_categories)}
+        self._matcher = None
+
+        if cache_size is None:
+            cache_size = settings.CATEGORIZER_CACHE_SIZE
+        self._match = lru_cache(maxsize=cache_size)(self._match_uncached)
+
+    @property
+    def matcher(self):
+        """Combined keyword pattern over the name keywords, compiled on first use."""
+        if self._matcher is None:
+            # Imported here because app.utils.keywords compiles ACCOUNT_CATEGORIES itself
+            from app.utils.keywords import KeywordMatcher
+
+            self._matcher = KeywordMatcher(self.account_categories)
+        return self._matcher
+
+    def _code_category(self, code: int) -> Optional[CategoryMatch]:
+        """Get the category of the code range holding a code, if any."""
+        i = bisect_right(self._range_starts, code) - 1
+        if i >= 0:
+            (start, end), category = self._ranges[i]
+            if code <= end:
+                return CategoryMatch(category, f"code:{start}-{end}")
+        return None
+
+    def _match_uncached(self, name: str, code: Optional[int], section: str) -> CategoryMatch:
+        """Categorize a normalized account; memoized by ``_match``."""
+        if code is not None:
+            match = self._code_category(code)
+            if match is not None:
+                return match
+
+        # The earliest keyword in account_categories wins
+        keyword = min(
+            (hit for hit in self.matcher.find_all(name) if hit in self._priority),
+            key=self._priority.__getitem__,
+            default=None,
+        )
+        return self._keyword_category(keyword, section)
+
+    def _keyword_category(self, keyword: Optional[str], section: str) -> CategoryMatch:
+        """Get the category of the best keyword found in a name, or the section default."""
+        section_mapping = self.section_categories.get(section, {})
+        if keyword is not None:
+            # Check if there's a section-specific override for this keyword
+            if keyword in section_mapping:
+                return CategoryMatch(section_mapping[keyword], f"section:{section}:{keyword}")
+            return CategoryMatch(self.account_categories[keyword], f"keyword:{keyword}")
+
+        # If no match found, return the default category for the section
+        return CategoryMatch(section_mapping.get("default", "Uncategorized"), f"default:{section}")
+
+    def match(self, name: str, code: Any, section: str) -> CategoryMatch:
+        """
+        Categorize an account and report the rule that decided it.
+
+        Args:
+            name: The account name.
+            code: The account code, if any.
+            section: The section the account belongs to.
+
+        Returns:
+            The category and the matching rule.
+        """
+        return self._match(name.strip().lower(), normalize_code(code), section)
+
+    def categorize(self, name: str, code: Any, section: str) -> str:
+        """
+        Categorize an account.
+
+        Args:
+            name: The account name.
+            code: The account code, if any.
+            section: The section the account belongs to.
+
+        Returns:
+            The category string for the account.
+        """
+        return self.match(name, code, section).category
+
+    def match_many(
+        self,
+        names: Sequence[str],
+        codes: Optional[Sequence[Any]] = None,
+        sections: Optional[Sequence[str]] = None,
+    ) -> Tuple[List[str], List[str]]:
+        """
+        Categorize a whole chart of accounts at once.
+
+        Codes are normalized and looked up in the code ranges for all rows in
+        one vectorized pass, and the names of the rows no range decides are
+        scanned for keywords in a single pass. The shared memo is bypassed, so
+        a large chart does not evict the results of report categorization.
+
+        Args:
+            names: Account names.
+            codes: Account codes aligned with ``names``; strings or integers.
+            sections: Section of each account aligned with ``names``.
+
+        Returns:
+            Tuple of the category and the matching rule of each account.
+
+        Raises:
+            ValueError: If ``codes`` or ``sections`` differ in length from ``names``.
+        """
+        count = len(names)
+        if codes is not None and len(codes) != count:
+            raise ValueError(f"Expected {count} account codes, got {len(codes)}")
+        if sections is not None and len(sections) != count:
+            raise ValueError(f"Expected {count} sections, got {len(sections)}")
+
+        categories: List[Optional[str]] = [None] * count
+        rules: List[Optional[str]] = [None] * count
+
+        undecided = np.ones(count, dtype=bool)
+        if codes is not None and self._ranges and count:
+            # Same rules as normalize_code, applied to the whole column
+            digits = pd.Series(
+                [code_text(code) for code in codes], dtype="string"
+            ).str.replace(r"[^0-9]", "", regex=True)
+            lengths = digits.str.len()
+            digits = digits.mask((lengths == 0) | (lengths > MAX_CODE_DIGITS))
+            numbers = pd.to_numeric(digits, errors="coerce").astype("Int64")
+            has_code = numbers.notna().to_numpy()
+            numbers = numbers.to_numpy(dtype=np.int64, na_value=-1)
+
+            # Codes are non-negative and shorter than int64, so clipping the
+            # range bounds to int64 does not change any comparison
+            low, high = np.iinfo(np.int64).min, np.iinfo(np.int64).max
+            starts = np.array(
+                [min(max(start, low), high) for start in self._range_starts], dtype=np.int64
+            )
+            ends = np.array(
+                [min(max(end, low), high) for (_, end), _ in self._ranges], dtype=np.int64
+            )
+            slots = np.searchsorted(starts, numbers, side="right") - 1
+            in_range = has_code & (slots >= 0) & (numbers <= ends[np.clip(slots, 0, None)])
+
+            range_matches = [
+                CategoryMatch(category, f"code:{start}-{end}")
+                for (start, end), category in self._ranges
+            ]
+            for i in np.flatnonzero(in_range).tolist():
+                categories[i], rules[i] = range_matches[slots[i]]
+            undecided = ~in_range
+
+        # Rows without a deciding code are matched by name in one keyword scan
+        rows = np.flatnonzero(undecided)
+        hit_rows, hit_keywords = self.matcher.find_all_many(
+            [names[i].strip() for i in rows.tolist()]
+        )
+        keywords = list(self.account_categories)
+        priorities = np.fromiter(
+            (self._priority.get(keyword, len(keywords)) for keyword in hit_keywords),
+            dtype=np.intp,
+            count=len(hit_keywords),
+        )
+        known = priorities < len(keywords)
+        hit_rows, priorities = hit_rows[known], priorities[known]
+
+        # The earliest keyword in account_categories wins
+        best = np.full(len(rows), -1, dtype=np.intp)
+        if len(hit_rows):
+            order = np.lexsort((priorities, hit_rows))
+            first_rows, first = np.unique(hit_rows[order], return_index=True)
+            best[first_rows] = priorities[order][first]
+
+        memo: Dict[Tuple[int, str], CategoryMatch] = {}
+        for i, keyword_index in zip(rows.tolist(), best.tolist()):
+            section = sections[i] if sections is not None else ""
+            match = memo.get((keyword_index, section))
+            if match is None:
+                match = memo[(keyword_index, section)] = self._keyword_category(
+                    keywords[keyword_index] if keyword_index >= 0 else None, section
+                )
+            categories[i], rules[i] = match
+
+        return categories, rules
+
+    def cache_info(self):
+        """Hit and miss counts of the result memo."""
+        return self._match.cache_info()
+
+    def cache_clear(self) -> None:
+        """Forget every memoized result."""
+        self._match.cache_clear()
+
+
+# Shared categorizer compiled from the built-in rules
+account_categorizer = Categorizer()
+
+
 def categorize_account(account: Dict[str, Any], section: str) -> str:
     """
     Categorize an account based on its name, code, and section.
@@ -126,75 +443,54 @@ def categorize_account(account: Dict[str, Any], section: str) -> str:
     Returns:
         The category string for the account.
     """
-    account_name = account.get("name", "").lower()
-    account_code = account.get("code")
-
-    logger.debug(
-        f"Categorizing account: {account_name}, code: {account_code}, section: {section}"
+    return account_categorizer.categorize(
+        account.get("name", ""), account.get("code"), section
     )
 
-    # Try to categorize by account code if available
-    if account_code:
-        try:
-            # Ensure account_code is a string before attempting conversion
-            if isinstance(account_code, str):
-                # Remove any non-numeric characters
-                clean_code = re.sub(r"[^0-9]", "", account_code)
-                if clean_code:
-                    code_num = int(clean_code)
-                    logger.debug(f"Checking code ranges for code: {code_num}")
-                    for (start, end), category in CODE_RANGES.items():
-                        if start <= code_num <= end:
-                            logger.info(
-                                f"Categorized '{account_name}' as '{category}' based on code {code_num}"
-                            )
-                            return category
-            else:
-                logger.warning(
-                    f"Account code is not a string: {type(account_code)}, value: {account_code}"
-                )
-        except (ValueError, TypeError) as e:
-            # If code is not a valid integer, log the error and continue with name-based categorization
-            logger.warning(f"Error processing account code '{account_code}': {str(e)}")
 
-    # Check for section-specific categories
-    section_mapping = SECTION_CATEGORIES.get(section, {})
-    logger.debug(f"Using section mapping for {section}")
+def categorize_accounts(
+    names: Sequence[str],
+    codes: Optional[Sequence[Any]] = None,
+    sections: Optional[Sequence[str]] = None,
+    categorizer: Optional[Categorizer] = None,
+) -> Dict[str, List[str]]:
+    """
+    Categorize a columnar chart of accounts.
 
-    # Try to find a match in the account name
-    for keyword, category in ACCOUNT_CATEGORIES.items():
-        if keyword in account_name:
-            # Check if there's a section-specific override for this keyword
-            if keyword in section_mapping:
-                result = section_mapping[keyword]
-                logger.info(
-                    f"Categorized '{account_name}' as '{result}' based on section-specific keyword '{keyword}'"
-                )
-                return result
+    Args:
+        names: Account names.
+        codes: Account codes aligned with ``names``, if known.
+        sections: Section of each account aligned with ``names``, if known.
+        categorizer: Rules to apply; the built-in ones when not given.
 
-            logger.info(
-                f"Categorized '{account_name}' as '{category}' based on keyword '{keyword}'"
-            )
-            return category
+    Returns:
+        Dictionary with the ``categories`` and matching ``rules`` of the
+        accounts, in input order.
+    """
+    if categorizer is None:
+        categorizer = account_categorizer
 
-    # If no match found, return the default category for the section
-    default_category = section_mapping.get("default", "Uncategorized")
-    logger.info(
-        f"Using default category '{default_category}' for '{account_name}' in section '{section}'"
-    )
-    return default_category
+    categories, rules = categorizer.match_many(names, codes, sections)
+    logger.info(f"Categorized {len(names)} accounts in bulk")
+    return {"categories": categories, "rules": rules}
 
 
-def add_categories_to_accounts(data: Dict[str, Any]) -> Dict[str, Any]:
+def add_categories_to_accounts(
+    data: Dict[str, Any], categorizer: Optional[Categorizer] = None
+) -> Dict[str, Any]:
     """
     Add category field to all accounts in the profit and loss data.
 
     Args:
         data: The profit and loss data dictionary.
+        categorizer: Rules to apply; the built-in ones when not given.
 
     Returns:
         Updated profit and loss data with categories added to accounts.
     """
+    if categorizer is None:
+        categorizer = account_categorizer
+
     # Create a deep copy to avoid modifying the original
     result = data.copy()
     sections = result.get("sections", {})
@@ -205,14 +501,16 @@ def add_categories_to_accounts(data: Dict[str, Any]) -> Dict[str, Any]:
     for section_name, section_data in sections.items():
         if isinstance(section_data, dict) and "accounts" in section_data:
             account_count = len(section_data["accounts"])
-            logger.info(
+            logger.debug(
                 f"Processing {account_count} accounts in section '{section_name}'"
             )
 
             for i, account in enumerate(section_data["accounts"]):
                 try:
                     # Add category to the account
-                    account["category"] = categorize_account(account, section_name)
+                    account["category"] = categorizer.categorize(
+                        account.get("name", ""), account.get("code"), section_name
+                    )
                 except Exception as e:
                     # Log error but continue processing other accounts
                     logger.error(
@@ -222,7 +520,11 @@ def add_categories_to_accounts(data: Dict[str, Any]) -> Dict[str, Any]:
                     # Set a default category to avoid further errors
                     account["category"] = "Uncategorized"
 
-    logger.info("Finished adding categories to all accounts")
+    cache = categorizer.cache_info()
+    logger.info(
+        f"Finished adding categories to all accounts "
+        f"(categorizer cache: {cache.hits} hits, {cache.misses} misses)"
+    )
     return result
 
 
@@ -280,36 +582,72 @@ def get_accounts_by_category(
     return categorized
 
 
-def get_category_totals(
+def summarize_categories(
     data: Dict[str, Any], section: Optional[str] = None
-) -> Dict[str, float]:
+) -> Dict[str, Any]:
     """
-    Calculate total values for each category.
+    Total and count the accounts of each category in a single pass.
+
+    Unlike ``get_accounts_by_category``, accounts are read in place rather
+    than copied.
 
     Args:
         data: The profit and loss data dictionary with categorized accounts.
         section: Optional section name to filter accounts.
 
     Returns:
-        Dictionary with categories as keys and total values as values.
+        Dictionary with the ``total`` and ``count`` of each category across
+        all sections under ``categories``, and per section under ``sections``.
     """
-    categorized = get_accounts_by_category(data, section)
-    totals = {}
+    overall: Dict[str, Dict[str, Any]] = {}
+    by_section: Dict[str, Dict[str, Dict[str, Any]]] = {}
+    sections = data.get("sections", {})
+
+    # Process specified section or all sections
+    section_items = (
+        [(section, sections.get(section, {}))] if section else sections.items()
+    )
+
+    for section_name, section_data in section_items:
+        if not (isinstance(section_data, dict) and "accounts" in section_data):
+            continue
+
+        section_summary = by_section.setdefault(section_name, {})
+        for account in section_data["accounts"]:
+            # Get category, defaulting to 'Uncategorized' if not present
+            category = account.get("category", "Uncategorized")
+            value = account.get("value", 0)
+            for summary in (overall, section_summary):
+                entry = summary.get(category)
+                if entry is None:
+                    entry = summary[category] = {"total": 0, "count": 0}
+                entry["count"] += 1
+                try:
+                    entry["total"] += value
+                except TypeError:
+                    logger.error(
+                        f"Invalid value {value!r} for account {account.get('name', 'unknown')} "
+                        f"in section '{section_name}'"
+                    )
 
     logger.debug(
-        f"Calculating totals for {len(categorized)} categories"
-        + (f" in section '{section}'" if section else "")
+        f"Summarized {len(overall)} categories across {len(by_section)} sections"
     )
+    return {"categories": overall, "sections": by_section}
+
+
+def get_category_totals(
+    data: Dict[str, Any], section: Optional[str] = None
+) -> Dict[str, float]:
+    """
+    Calculate total values for each category.
 
-    for category, accounts in categorized.items():
-        try:
-            # Sum all account values in this category
-            category_total = sum(account.get("value", 0) for account in accounts)
-            totals[category] = category_total
-            logger.debug(f"Category '{category}' total: {category_total:.2f}")
-        except Exception as e:
-            logger.error(f"Error calculating total for category '{category}': {str(e)}")
-            # Set a default value to avoid further errors
-            totals[category] = 0.0
-
-    return totals
+    Args:
+        data: The profit and loss data dictionary with categorized accounts.
+        section: Optional section name to filter accounts.
+
+    Returns:
+        Dictionary with categories as keys and total values as values.
+    """
+    summary = summarize_categories(data, section)
+    return {category: entry["total"] for category, entry in summary["categories"].items()}
@@ -0,0 +1,262 @@
+"""
+Shared multi-keyword matching for profit and loss reports.
+
+This module compiles every keyword used by section detection, file validation
+and account categorization into a single trie-shaped regular expression at
+import time, so one scan of a row or account name returns all keyword hits.
+"""
+
+import re
+from typing import Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.utils.categorization import ACCOUNT_CATEGORIES
+
+# Keywords to identify each section of the report
+SECTION_KEYWORDS: Dict[str, List[str]] = {
+    "tradingIncome": [
+        "trading income",
+        "revenue",
+        "sales",
+        "income",
+        "operating revenue",
+    ],
+    "costOfSales": ["cost of sales", "cost of goods sold", "cogs", "direct costs"],
+    "grossProfit": ["gross profit", "gross income", "gross margin"],
+    "operatingExpenses": [
+        "operating expenses",
+        "expenses",
+        "overhead",
+        "indirect costs",
+        "administrative expenses",
+    ],
+    "netProfit": [
+        "net profit",
+        "net income",
+        "profit for the period",
+        "net earnings",
+        "net operating profit",
+    ],
+}
+
+# At least one of these keywords must be present in a valid report
+REQUIRED_KEYWORDS: List[str] = [
+    "profit",
+    "loss",
+    "income",
+    "expense",
+    "revenue",
+    "sales",
+]
+
+# Keywords the validator uses to confirm the essential P&L sections exist
+VALIDATION_SECTION_KEYWORDS: Dict[str, List[str]] = {
+    "income": [
+        "trading income",
+        "revenue",
+        "sales",
+        "income",
+        "operating revenue",
+    ],
+    "expenses": [
+        "operating expenses",
+        "expenses",
+        "overhead",
+        "indirect costs",
+    ],
+    "profit": [
+        "gross profit",
+        "net profit",
+        "net income",
+        "profit for the period",
+    ],
+}
+
+# Keywords to identify each section of a balance sheet
+BALANCE_SHEET_KEYWORDS: Dict[str, List[str]] = {
+    "currentAssets": ["current assets"],
+    "nonCurrentAssets": [
+        "non-current assets",
+        "non current assets",
+        "fixed assets",
+        "long-term assets",
+    ],
+    "totalAssets": ["total assets"],
+    "currentLiabilities": ["current liabilities"],
+    "nonCurrentLiabilities": [
+        "non-current liabilities",
+        "non current liabilities",
+        "long-term liabilities",
+    ],
+    "totalLiabilities": ["total liabilities"],
+    "equity": ["equity"],
+    "totalLiabilitiesAndEquity": [
+        "total liabilities and equity",
+        "total liabilities & equity",
+        "total equity and liabilities",
+    ],
+}
+
+# Keywords that contain a section's keyword but belong to another section
+BALANCE_SHEET_EXCLUDED_KEYWORDS: Dict[str, List[str]] = {
+    "currentAssets": ["non-current assets", "non current assets"],
+    "currentLiabilities": ["non-current liabilities", "non current liabilities"],
+    "totalLiabilities": BALANCE_SHEET_KEYWORDS["totalLiabilitiesAndEquity"],
+    "equity": BALANCE_SHEET_KEYWORDS["totalLiabilitiesAndEquity"],
+}
+
+# Name keywords of the current asset accounts holding inventory
+INVENTORY_KEYWORDS: List[str] = ["inventory", "inventories", "stock"]
+
+# Row markers for totals and the accounting basis
+TOTAL_KEYWORDS: List[str] = ["total", "subtotal"]
+BASIS_KEYWORDS: List[str] = ["accrual basis", "cash basis"]
+
+_END = ""
+
+
+def _trie_pattern(node: Dict[str, dict]) -> str:
+    """
+    Render a character trie as a regular expression.
+
+    Branches start with distinct characters, so the regex engine follows at
+    most one path per position, and optional tails are greedy so the longest
+    keyword at a position wins.
+    """
+    branches = [
+        re.escape(char) + _trie_pattern(child)
+        for char, child in sorted(node.items())
+        if char != _END
+    ]
+    if not branches:
+        return ""
+
+    body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+    if _END in node:
+        return "(?:" + body + ")?"
+    return body
+
+
+class KeywordMatcher:
+    """
+    Compiled matcher that finds every keyword occurring in a text in one pass.
+
+    Keywords are matched case-insensitively as substrings, the same way as
+    ``keyword in text.lower()``.
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        """
+        Compile the matcher.
+
+        Args:
+            keywords: Keywords to match.
+        """
+        self.keywords: FrozenSet[str] = frozenset(k.lower() for k in keywords if k)
+        self.pattern: Optional[re.Pattern] = None
+
+        trie: Dict[str, dict] = {}
+        for keyword in self.keywords:
+            node = trie
+            for char in keyword:
+                node = node.setdefault(char, {})
+            node[_END] = {}
+
+        if trie:
+            self.pattern = re.compile("(?=(" + _trie_pattern(trie) + "))")
+
+        # The regex reports the longest keyword at each position; shorter
+        # keywords starting at the same position are prefixes of it.
+        self._prefixes: Dict[str, List[str]] = {
+            keyword: [
+                other
+                for other in self.keywords
+                if other != keyword and keyword.startswith(other)
+            ]
+            for keyword in self.keywords
+        }
+
+    def find_all(self, text: str) -> FrozenSet[str]:
+        """
+        Find every keyword that occurs in the text.
+
+        Args:
+            text: The text to scan.
+
+        Returns:
+            Set of matched keywords.
+        """
+        if self.pattern is None or not text:
+            return frozenset()
+
+        hits = set()
+        for match in self.pattern.finditer(text.lower()):
+            keyword = match.group(1)
+            hits.add(keyword)
+            hits.update(self._prefixes[keyword])
+        return frozenset(hits)
+
+    def find_all_many(self, texts: Sequence[str]) -> Tuple[np.ndarray, List[str]]:
+        """
+        Find every keyword that occurs in each of many texts in one scan.
+
+        The texts are joined on newlines, which no keyword contains, and the
+        pattern runs once over the joined text instead of once per text.
+
+        Args:
+            texts: The texts to scan.
+
+        Returns:
+            Tuple of the text index of each hit and the matched keyword; a
+            keyword found several times in a text may be reported repeatedly.
+        """
+        if self.pattern is None or not len(texts):
+            return np.empty(0, dtype=np.intp), []
+
+        lowered = [text.lower() for text in texts]
+        # Offset at which each text starts in the joined text
+        starts = np.cumsum([0] + [len(text) + 1 for text in lowered[:-1]])
+
+        positions: List[int] = []
+        keywords: List[str] = []
+        for match in self.pattern.finditer("\n".join(lowered)):
+            keyword = match.group(1)
+            for hit in (keyword, *self._prefixes[keyword]):
+                positions.append(match.start())
+                keywords.append(hit)
+
+        rows = np.searchsorted(starts, np.asarray(positions, dtype=np.intp), side="right") - 1
+        return rows, keywords
+
+    def covers(self, keywords: Iterable[str]) -> bool:
+        """
+        Check whether all of the given keywords are compiled into this matcher.
+
+        Args:
+            keywords: Keywords to check.
+
+        Returns:
+            True if every keyword is known to the matcher.
+        """
+        return all(k.lower() in self.keywords for k in keywords)
+
+
+def _all_keywords() -> List[str]:
+    """Collect the keywords used across sectioning, validation and categorization."""
+    keywords: List[str] = []
+    for group in SECTION_KEYWORDS.values():
+        keywords.extend(group)
+    for group in VALIDATION_SECTION_KEYWORDS.values():
+        keywords.extend(group)
+    keywords.extend(REQUIRED_KEYWORDS)
+    keywords.extend(TOTAL_KEYWORDS)
+    keywords.extend(BASIS_KEYWORDS)
+    keywords.extend(ACCOUNT_CATEGORIES)
+    for group in BALANCE_SHEET_KEYWORDS.values():
+        keywords.extend(group)
+    return keywords
+
+
+# Shared matcher compiled once at import time
+KEYWORD_MATCHER = KeywordMatcher(_all_keywords())
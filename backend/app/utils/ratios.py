@@ -3,14 +3,349 @@ Financial ratios and metrics calculation module.
 
 This module provides functions and Pydantic models for calculating key financial ratios
 and metrics for profit and loss analysis.
+
+Every metric is declared in the METRICS registry with the figures or other
+metrics it is computed from. The evaluator orders the requested metrics by
+their dependencies and computes each, including shared intermediates such as
+gross profit, once over columnar NumPy arrays, so ratios for many
+entity-periods cost a handful of array operations; divisions by a zero
+denominator are masked to NaN. The per-statement functions are thin
+wrappers over the evaluator.
 """
 
-from typing import Optional, Dict, Any
+from functools import lru_cache
+from graphlib import TopologicalSorter
+from typing import Optional, Dict, Any, Callable, FrozenSet, Iterable, List, NamedTuple, Sequence, Tuple
+import numpy as np
+import pandas as pd
 from pydantic import BaseModel, Field, field_validator
 from app.models.financial import FinancialStatement
 # Import centralized logger
 from app.utils.logger import app_logger as logger
 
+# Statement figures the engine takes, in FinancialStatement field names
+STATEMENT_FIELDS = (
+    'revenue',
+    'cost_of_goods_sold',
+    'operating_expenses',
+    'net_income',
+    'total_assets',
+    'total_equity',
+    'current_assets',
+    'current_liabilities',
+    'inventory',
+)
+
+
+
+class Metric(NamedTuple):
+    """A metric, the figures or metrics it is computed from, and its formula."""
+    name: str
+    # Statement figures or metric names, passed to the formula in this order
+    inputs: Tuple[str, ...]
+    formula: Callable[..., np.ndarray]
+    # Reported as a percentage unless fractions are requested
+    percent: bool = False
+    # Shared intermediate that is never reported
+    internal: bool = False
+
+
+def _column(values: Optional[Sequence[float]], size: int) -> np.ndarray:
+    """Get a figure as a float array, all NaN when it is not available."""
+    if values is None:
+        return np.full(size, np.nan)
+    return np.asarray(values, dtype=float)
+
+
+def _mask_zero(denominator: np.ndarray, name: str) -> np.ndarray:
+    """Replace zero denominators with NaN, so dividing by them yields NaN."""
+    zero = denominator == 0
+    if zero.any():
+        logger.warning(f"{np.count_nonzero(zero)} statements have a zero {name}; ratios over it are not computable.")
+        return np.where(zero, np.nan, denominator)
+    return denominator
+
+
+def _nonzero(figure: str, label: str) -> Metric:
+    """Declare a figure with zeros masked, shared by the ratios dividing by it."""
+    return Metric(
+        f'nonzero_{figure}', (figure,), lambda values: _mask_zero(values, label), internal=True
+    )
+
+
+# Registry of metrics by name; declaration order does not matter
+METRICS: Dict[str, Metric] = {
+    metric.name: metric
+    for metric in (
+        _nonzero('revenue', 'revenue'),
+        _nonzero('total_equity', 'total equity'),
+        _nonzero('total_assets', 'total assets'),
+        _nonzero('current_liabilities', 'current liabilities'),
+        Metric('quick_assets', ('current_assets', 'inventory'), np.subtract, internal=True),
+        Metric('gross_profit', ('revenue', 'cost_of_goods_sold'), np.subtract),
+        Metric('operating_profit', ('gross_profit', 'operating_expenses'), np.subtract),
+        Metric('gross_margin', ('gross_profit', 'nonzero_revenue'), np.divide, percent=True),
+        Metric('net_margin', ('net_income', 'nonzero_revenue'), np.divide, percent=True),
+        Metric('operating_margin', ('operating_profit', 'nonzero_revenue'), np.divide, percent=True),
+        Metric('return_on_equity', ('net_income', 'nonzero_total_equity'), np.divide, percent=True),
+        Metric('return_on_assets', ('net_income', 'nonzero_total_assets'), np.divide, percent=True),
+        Metric('current_ratio', ('current_assets', 'nonzero_current_liabilities'), np.divide),
+        Metric('quick_ratio', ('quick_assets', 'nonzero_current_liabilities'), np.divide),
+        Metric('cogs_ratio', ('cost_of_goods_sold', 'nonzero_revenue'), np.divide, percent=True),
+        Metric('expense_ratio', ('operating_expenses', 'nonzero_revenue'), np.divide, percent=True),
+    )
+}
+
+# Statement figure for each ratio input of a balance sheet's ``figures``
+BALANCE_SHEET_FIGURES = {
+    'totalAssets': 'total_assets',
+    'totalEquity': 'total_equity',
+    'currentAssets': 'current_assets',
+    'currentLiabilities': 'current_liabilities',
+    'inventory': 'inventory',
+}
+
+# Ratios reported by calculate_all_ratios
+RATIO_NAMES = (
+    'gross_margin',
+    'net_margin',
+    'operating_margin',
+    'return_on_equity',
+    'return_on_assets',
+    'current_ratio',
+    'quick_ratio',
+)
+# Every reportable metric, in the order calculate_financial_metrics reports them
+METRIC_NAMES = RATIO_NAMES + ('gross_profit', 'operating_profit', 'cogs_ratio', 'expense_ratio')
+
+
+@lru_cache(maxsize=64)
+def evaluation_order(fields: Tuple[str, ...]) -> Tuple[Metric, ...]:
+    """
+    Get the metrics needed for a selection, each after the metrics it uses.
+
+    Args:
+        fields: Names of the requested metrics.
+
+    Returns:
+        The requested metrics and their intermediates in evaluation order.
+
+    Raises:
+        ValueError: If a metric is unknown or the registry has a cycle.
+    """
+    graph: Dict[str, List[str]] = {}
+    pending = list(fields)
+    while pending:
+        name = pending.pop()
+        if name in graph or name in STATEMENT_FIELDS:
+            continue
+        if name not in METRICS:
+            raise ValueError(f"Unknown metric or figure: {name}")
+        graph[name] = [i for i in METRICS[name].inputs if i not in STATEMENT_FIELDS]
+        pending.extend(METRICS[name].inputs)
+
+    # Raises graphlib.CycleError, a ValueError, on circular definitions
+    return tuple(METRICS[name] for name in TopologicalSorter(graph).static_order())
+
+
+# Fail at import time on a metric with an unknown input or a circular definition
+evaluation_order(METRIC_NAMES)
+
+
+@lru_cache(maxsize=None)
+def required_figures(name: str) -> FrozenSet[str]:
+    """
+    Get the statement figures a metric is ultimately computed from.
+
+    Args:
+        name: A metric name.
+
+    Returns:
+        Names of the statement figures the metric depends on.
+    """
+    return frozenset(
+        figure
+        for metric in evaluation_order((name,))
+        for figure in metric.inputs
+        if figure in STATEMENT_FIELDS
+    )
+
+
+def unknown_metrics(fields: Iterable[str]) -> List[str]:
+    """
+    Find the names in a selection that are not reportable metrics.
+
+    Args:
+        fields: Requested metric names.
+
+    Returns:
+        The unknown names, in request order.
+    """
+    return [name for name in fields if name not in METRIC_NAMES]
+
+
+def evaluate_metrics(
+    figures: Dict[str, np.ndarray],
+    fields: Optional[Iterable[str]] = None,
+    as_percent: bool = True,
+) -> Dict[str, np.ndarray]:
+    """
+    Evaluate the requested metrics over columnar statement figures.
+
+    Only the requested metrics and the intermediates they depend on are
+    computed, each once.
+
+    Args:
+        figures: Float array per statement figure in STATEMENT_FIELDS, all of
+            the same length.
+        fields: Names of the metrics to report; every metric in METRIC_NAMES
+            when not given.
+        as_percent: Report margins, returns and the COGS and expense ratios
+            as percentages rather than fractions.
+
+    Returns:
+        Dict[str, np.ndarray]: Array per requested metric, in request order.
+
+    Raises:
+        ValueError: If a requested metric is unknown.
+    """
+    fields = METRIC_NAMES if fields is None else tuple(dict.fromkeys(fields))
+    unknown = unknown_metrics(fields)
+    if unknown:
+        raise ValueError(f"Unknown metrics: {', '.join(unknown)}")
+
+    values = dict(figures)
+    for metric in evaluation_order(fields):
+        values[metric.name] = metric.formula(*(values[name] for name in metric.inputs))
+
+    return {
+        name: values[name] * 100 if as_percent and METRICS[name].percent else values[name]
+        for name in fields
+    }
+
+
+def ratio_arrays(
+    revenue: Sequence[float],
+    cost_of_goods_sold: Optional[Sequence[float]] = None,
+    operating_expenses: Optional[Sequence[float]] = None,
+    net_income: Optional[Sequence[float]] = None,
+    total_assets: Optional[Sequence[float]] = None,
+    total_equity: Optional[Sequence[float]] = None,
+    current_assets: Optional[Sequence[float]] = None,
+    current_liabilities: Optional[Sequence[float]] = None,
+    inventory: Optional[Sequence[float]] = None,
+    as_percent: bool = True,
+    fields: Optional[Iterable[str]] = None,
+) -> Dict[str, np.ndarray]:
+    """
+    Calculate ratios and metrics for many statements at once.
+
+    Each argument holds one figure for all statements, aligned by position.
+    Figures that are not given, and NaN entries, are treated as unavailable
+    and make the ratios depending on them NaN. Ratios with a zero
+    denominator are NaN as well.
+
+    Args:
+        revenue: Total revenue per statement.
+        cost_of_goods_sold: Cost of goods sold per statement.
+        operating_expenses: Operating expenses per statement.
+        net_income: Net income per statement.
+        total_assets: Total assets per statement.
+        total_equity: Total equity per statement.
+        current_assets: Current assets per statement.
+        current_liabilities: Current liabilities per statement.
+        inventory: Inventory per statement.
+        as_percent: Express margins, returns and the COGS and expense ratios
+            as percentages, as in calculate_all_ratios, rather than fractions.
+        fields: Names of the metrics to calculate; all of METRIC_NAMES when
+            not given.
+
+    Returns:
+        Dict[str, np.ndarray]: Array per requested metric.
+    """
+    revenue = np.asarray(revenue, dtype=float)
+    size = revenue.shape[0]
+    figures = {
+        'revenue': revenue,
+        'cost_of_goods_sold': _column(cost_of_goods_sold, size),
+        'operating_expenses': _column(operating_expenses, size),
+        'net_income': _column(net_income, size),
+        'total_assets': _column(total_assets, size),
+        'total_equity': _column(total_equity, size),
+        'current_assets': _column(current_assets, size),
+        'current_liabilities': _column(current_liabilities, size),
+        'inventory': _column(inventory, size),
+    }
+    return evaluate_metrics(figures, fields, as_percent)
+
+
+def calculate_ratios_batch(
+    revenue: Sequence[float],
+    cost_of_goods_sold: Optional[Sequence[float]] = None,
+    operating_expenses: Optional[Sequence[float]] = None,
+    net_income: Optional[Sequence[float]] = None,
+    total_assets: Optional[Sequence[float]] = None,
+    total_equity: Optional[Sequence[float]] = None,
+    current_assets: Optional[Sequence[float]] = None,
+    current_liabilities: Optional[Sequence[float]] = None,
+    inventory: Optional[Sequence[float]] = None,
+    index: Optional[Sequence[Any]] = None,
+    fields: Optional[Iterable[str]] = None,
+) -> pd.DataFrame:
+    """
+    Calculate ratios and metrics for many statements as a DataFrame.
+
+    Args:
+        revenue: Total revenue per statement.
+        cost_of_goods_sold: Cost of goods sold per statement.
+        operating_expenses: Operating expenses per statement.
+        net_income: Net income per statement.
+        total_assets: Total assets per statement.
+        total_equity: Total equity per statement.
+        current_assets: Current assets per statement.
+        current_liabilities: Current liabilities per statement.
+        inventory: Inventory per statement.
+        index: Labels of the statements, e.g. (entity, period) pairs.
+        fields: Names of the metrics to calculate; all of METRIC_NAMES when
+            not given.
+
+    Returns:
+        pd.DataFrame: One row per statement and one column per requested
+        metric, with NaN where a value is not computable.
+    """
+    arrays = ratio_arrays(
+        revenue,
+        cost_of_goods_sold,
+        operating_expenses,
+        net_income,
+        total_assets,
+        total_equity,
+        current_assets,
+        current_liabilities,
+        inventory,
+        fields=fields,
+    )
+    return pd.DataFrame(arrays, index=index)
+
+
+def _statement_ratios(
+    fs: FinancialStatement, as_percent: bool = True, fields: Optional[Iterable[str]] = None
+) -> Dict[str, Optional[float]]:
+    """Run the batch engine on one statement, with None for values not computable."""
+    arrays = ratio_arrays(
+        **{field: [getattr(fs, field)] for field in STATEMENT_FIELDS},
+        as_percent=as_percent,
+        fields=fields,
+    )
+    scalars = {name: values.item() for name, values in arrays.items()}
+    # NaN is the only value not equal to itself
+    return {name: None if value != value else value for name, value in scalars.items()}
+
+
+def _fraction(fs: FinancialStatement, name: str) -> Optional[float]:
+    """Get one ratio of a statement as a fraction rather than a percentage."""
+    return _statement_ratios(fs, as_percent=False, fields=(name,))[name]
+
 
 def gross_margin_ratio(fs: FinancialStatement) -> Optional[float]:
     """
@@ -20,15 +355,7 @@ def gross_margin_ratio(fs: FinancialStatement) -> Optional[float]:
     Returns:
         Optional[float]: Gross margin ratio, or None if not computable.
     """
-    try:
-        if fs.revenue == 0:
-            logger.warning("Revenue is zero, cannot compute gross margin ratio.")
-            return None
-        gross_profit = fs.revenue - fs.cost_of_goods_sold
-        return gross_profit / fs.revenue
-    except Exception as e:
-        logger.error(f"Error calculating gross margin ratio: {e}")
-        return None
+    return _fraction(fs, 'gross_margin')
 
 def net_margin_ratio(fs: FinancialStatement) -> Optional[float]:
     """
@@ -38,14 +365,7 @@ def net_margin_ratio(fs: FinancialStatement) -> Optional[float]:
     Returns:
         Optional[float]: Net margin ratio, or None if not computable.
     """
-    try:
-        if fs.revenue == 0:
-            logger.warning("Revenue is zero, cannot compute net margin ratio.")
-            return None
-        return fs.net_income / fs.revenue
-    except Exception as e:
-        logger.error(f"Error calculating net margin ratio: {e}")
-        return None
+    return _fraction(fs, 'net_margin')
 
 def operating_margin_ratio(fs: FinancialStatement) -> Optional[float]:
     """
@@ -55,15 +375,7 @@ def operating_margin_ratio(fs: FinancialStatement) -> Optional[float]:
     Returns:
         Optional[float]: Operating margin ratio, or None if not computable.
     """
-    try:
-        if fs.revenue == 0:
-            logger.warning("Revenue is zero, cannot compute operating margin ratio.")
-            return None
-        op_profit = fs.revenue - fs.cost_of_goods_sold - fs.operating_expenses
-        return op_profit / fs.revenue
-    except Exception as e:
-        logger.error(f"Error calculating operating margin ratio: {e}")
-        return None
+    return _fraction(fs, 'operating_margin')
 
 def return_on_equity(fs: FinancialStatement) -> Optional[float]:
     """
@@ -73,14 +385,7 @@ def return_on_equity(fs: FinancialStatement) -> Optional[float]:
     Returns:
         Optional[float]: ROE, or None if not computable.
     """
-    try:
-        if fs.total_equity == 0:
-            logger.warning("Total equity is zero, cannot compute ROE.")
-            return None
-        return fs.net_income / fs.total_equity
-    except Exception as e:
-        logger.error(f"Error calculating ROE: {e}")
-        return None
+    return _fraction(fs, 'return_on_equity')
 
 def return_on_assets(fs: FinancialStatement) -> Optional[float]:
     """
@@ -90,14 +395,7 @@ def return_on_assets(fs: FinancialStatement) -> Optional[float]:
     Returns:
         Optional[float]: ROA, or None if not computable.
     """
-    try:
-        if fs.total_assets == 0:
-            logger.warning("Total assets is zero, cannot compute ROA.")
-            return None
-        return fs.net_income / fs.total_assets
-    except Exception as e:
-        logger.error(f"Error calculating ROA: {e}")
-        return None
+    return _fraction(fs, 'return_on_assets')
 
 def current_ratio(fs: FinancialStatement) -> Optional[float]:
     """
@@ -107,14 +405,7 @@ def current_ratio(fs: FinancialStatement) -> Optional[float]:
     Returns:
         Optional[float]: Current ratio, or None if not computable.
     """
-    try:
-        if fs.current_liabilities == 0:
-            logger.warning("Current liabilities is zero, cannot compute current ratio.")
-            return None
-        return fs.current_assets / fs.current_liabilities
-    except Exception as e:
-        logger.error(f"Error calculating current ratio: {e}")
-        return None
+    return _fraction(fs, 'current_ratio')
 
 def quick_ratio(fs: FinancialStatement) -> Optional[float]:
     """
@@ -126,27 +417,22 @@ def quick_ratio(fs: FinancialStatement) -> Optional[float]:
     Returns:
         Optional[float]: Quick ratio, or None if not computable.
     """
-    try:
-        if fs.current_liabilities == 0:
-            logger.warning("Current liabilities is zero, cannot compute quick ratio.")
-            return None
-        quick_assets = fs.current_assets - fs.inventory
-        return quick_assets / fs.current_liabilities
-    except Exception as e:
-        logger.error(f"Error calculating quick ratio: {e}")
-        return None
+    return _fraction(fs, 'quick_ratio')
 
 
-def convert_analyzer_output_to_financial_statement(data: Dict[str, Any]) -> FinancialStatement:
+def extract_statement_figures(data: Dict[str, Any]) -> Dict[str, Optional[float]]:
     """
-    Convert analyzer output to FinancialStatement model.
-    
+    Get the statement figures of analyzer output, with None for those not available.
+
+    Balance sheet figures come from the ``balanceSheet`` paired with the
+    report, if any.
+
     Args:
         data (Dict[str, Any]): The profit and loss data dictionary from analyzer.
-        
+
     Returns:
-        FinancialStatement: A FinancialStatement object with data from analyzer output.
-        
+        Dict[str, Optional[float]]: Value per figure in STATEMENT_FIELDS.
+
     Raises:
         ValueError: If required fields are missing from the analyzer output.
     """
@@ -157,27 +443,35 @@ def convert_analyzer_output_to_financial_statement(data: Dict[str, Any]) -> Fina
         raise ValueError("Missing required field 'tradingIncome' in analyzer output")
     
     # Extract values with defaults
-    revenue = sections.get('tradingIncome', {}).get('total', 0)
-    cost_of_goods_sold = sections.get('costOfSales', {}).get('total', 0)
-    operating_expenses = sections.get('operatingExpenses', {}).get('total', 0)
-    net_income = sections.get('netProfit', 0)
+    figures: Dict[str, Optional[float]] = {
+        'revenue': sections.get('tradingIncome', {}).get('total', 0),
+        'cost_of_goods_sold': sections.get('costOfSales', {}).get('total', 0),
+        'operating_expenses': sections.get('operatingExpenses', {}).get('total', 0),
+        'net_income': sections.get('netProfit', 0),
+    }
+
+    # Balance sheet items are only available when a balance sheet was paired
+    balance_sheet = (data.get('balanceSheet') or {}).get('figures') or {}
+    for name, field in BALANCE_SHEET_FIGURES.items():
+        figures[field] = balance_sheet.get(name)
+    return figures
+
+
+def convert_analyzer_output_to_financial_statement(data: Dict[str, Any]) -> FinancialStatement:
+    """
+    Convert analyzer output to FinancialStatement model.
     
-    # Create FinancialStatement object
-    return FinancialStatement(
-        revenue=revenue,
-        cost_of_goods_sold=cost_of_goods_sold,
-        operating_expenses=operating_expenses,
-        net_income=net_income,
-        # Balance sheet items are not available in P&L data
-        # but we include them with None values for completeness
-        total_assets=None,
-        total_equity=None,
-        current_assets=None,
-        current_liabilities=None,
-        cash=None,
-        inventory=None,
-        accounts_receivable=None
-    )
+    Args:
+        data (Dict[str, Any]): The profit and loss data dictionary from analyzer.
+        
+    Returns:
+        FinancialStatement: A FinancialStatement object with data from analyzer output.
+        
+    Raises:
+        ValueError: If required fields are missing from the analyzer output.
+    """
+    # Figures that are not available become zero in the model
+    return FinancialStatement(**extract_statement_figures(data))
 
 
 def calculate_all_ratios(fs: FinancialStatement) -> Dict[str, Optional[float]]:
@@ -190,25 +484,12 @@ def calculate_all_ratios(fs: FinancialStatement) -> Dict[str, Optional[float]]:
     Returns:
         Dict[str, Optional[float]]: Dictionary of all calculated ratios.
     """
-    ratios = {
-        'gross_margin': gross_margin_ratio(fs),
-        'net_margin': net_margin_ratio(fs),
-        'operating_margin': operating_margin_ratio(fs),
-        'return_on_equity': return_on_equity(fs),
-        'return_on_assets': return_on_assets(fs),
-        'current_ratio': current_ratio(fs),
-        'quick_ratio': quick_ratio(fs)
-    }
-    
-    # Convert to percentages for margin ratios
-    for key in ['gross_margin', 'net_margin', 'operating_margin', 'return_on_equity', 'return_on_assets']:
-        if ratios[key] is not None:
-            ratios[key] = ratios[key] * 100
-    
-    return ratios
+    return _statement_ratios(fs, fields=RATIO_NAMES)
 
 
-def calculate_financial_metrics(data: Dict[str, Any]) -> Dict[str, Any]:
+def calculate_financial_metrics(
+    data: Dict[str, Any], fields: Optional[Iterable[str]] = None
+) -> Dict[str, Any]:
     """
     Calculate financial metrics from analyzer output.
     
@@ -216,27 +497,84 @@ def calculate_financial_metrics(data: Dict[str, Any]) -> Dict[str, Any]:
     
     Args:
         data (Dict[str, Any]): The profit and loss data dictionary from analyzer.
+        fields (Iterable[str], optional): Names of the metrics to calculate; all of
+            METRIC_NAMES when not given.
         
     Returns:
         Dict[str, Any]: Dictionary containing all financial metrics and ratios.
     """
     try:
-        # Convert analyzer output to FinancialStatement
-        fs = convert_analyzer_output_to_financial_statement(data)
-        
-        # Calculate all ratios
-        ratios = calculate_all_ratios(fs)
-        
-        # Add additional metrics
-        metrics = {
-            'gross_profit': fs.revenue - fs.cost_of_goods_sold,
-            'operating_profit': fs.revenue - fs.cost_of_goods_sold - fs.operating_expenses,
-            'cogs_ratio': (fs.cost_of_goods_sold / fs.revenue * 100) if fs.revenue != 0 else None,
-            'expense_ratio': (fs.operating_expenses / fs.revenue * 100) if fs.revenue != 0 else None
-        }
-        
-        # Combine ratios and metrics
-        return {**ratios, **metrics}
+        figures = extract_statement_figures(data)
+        selected = METRIC_NAMES if fields is None else tuple(dict.fromkeys(fields))
+
+        # Metrics whose figures are not available are skipped rather than
+        # computed from zeros and discarded
+        available = {name for name, value in figures.items() if value is not None}
+        computable = [name for name in selected if required_figures(name) <= available]
+        skipped = [name for name in selected if name not in computable]
+        if skipped:
+            logger.debug(f"Skipping metrics without the figures they need: {skipped}")
+
+        arrays = ratio_arrays(
+            **{name: [value] for name, value in figures.items() if value is not None},
+            fields=computable,
+        )
+        metrics: Dict[str, Any] = dict.fromkeys(selected)
+        for name, values in arrays.items():
+            value = values.item()
+            # NaN is the only value not equal to itself
+            metrics[name] = None if value != value else value
+        return metrics
     except Exception as e:
         logger.error(f"Error calculating financial metrics: {e}")
         return {}
+
+
+def _section_total(sections: Dict[str, Any], section: str) -> float:
+    """Get the total of a section of analyzer output, or NaN when it is missing."""
+    value = sections.get(section)
+    if isinstance(value, dict):
+        value = value.get('total')
+    return np.nan if value is None else value
+
+
+def calculate_metrics_batch(
+    reports: List[Dict[str, Any]],
+    index: Optional[Sequence[Any]] = None,
+    fields: Optional[Iterable[str]] = None,
+) -> pd.DataFrame:
+    """
+    Calculate financial metrics for many analyzer outputs at once.
+
+    Missing cost of sales and operating expenses count as zero, as in
+    calculate_financial_metrics; a missing revenue, net profit or balance
+    sheet figure makes the ratios depending on it NaN.
+
+    Args:
+        reports (List[Dict[str, Any]]): Profit and loss data dictionaries from analyzer.
+        index (Sequence, optional): Labels of the reports, e.g. (entity, period) pairs.
+        fields (Iterable[str], optional): Names of the metrics to calculate; all of
+            METRIC_NAMES when not given.
+
+    Returns:
+        pd.DataFrame: One row per report and one column per requested metric.
+    """
+    sections = [report.get('sections', {}) for report in reports]
+    figures = {
+        name: np.array([_section_total(s, section) for s in sections], dtype=float)
+        for name, section in (
+            ('revenue', 'tradingIncome'),
+            ('cost_of_goods_sold', 'costOfSales'),
+            ('operating_expenses', 'operatingExpenses'),
+            ('net_income', 'netProfit'),
+        )
+    }
+    for name in ('cost_of_goods_sold', 'operating_expenses'):
+        figures[name] = np.nan_to_num(figures[name], nan=0.0)
+
+    balance_sheets = [(report.get('balanceSheet') or {}).get('figures') or {} for report in reports]
+    for name, field in BALANCE_SHEET_FIGURES.items():
+        figures[field] = np.array(
+            [np.nan if b.get(name) is None else b[name] for b in balance_sheets], dtype=float
+        )
+    return calculate_ratios_batch(**figures, index=index, fields=fields)
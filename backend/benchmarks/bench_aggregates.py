@@ -0,0 +1,65 @@
+"""
+Benchmark for the incrementally maintained aggregates.
+
+Times storing one new month of metrics for organizations with short and
+long histories. The incremental update should cost the same whatever the
+history length, where recomputing YTD and TTM figures from the stored rows
+grows with it.
+
+Run from the backend directory:
+    python -m benchmarks.bench_aggregates
+"""
+
+import logging
+import os
+import random
+import tempfile
+import time
+from typing import Any, Dict, List
+
+from app.core.aggregates import AggregateStore
+
+METRICS = 10
+HISTORIES = (12, 120, 1200)
+REPEATS = 20
+
+
+def month_rows(organization_id: str, month: int, rnd: random.Random) -> List[Dict[str, Any]]:
+    """Build the metric rows of one month, counted from January 2000."""
+    label = f"{2000 + month // 12}-{month % 12 + 1:02d}"
+    return [
+        {
+            "organization_id": organization_id,
+            "period": label,
+            "metric_name": f"metric_{metric}",
+            "metric_value": rnd.uniform(1e3, 1e6),
+        }
+        for metric in range(METRICS)
+    ]
+
+
+def main() -> None:
+    logging.disable(logging.CRITICAL)
+    rnd = random.Random(0)
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = AggregateStore(os.path.join(directory, "aggregates.sqlite3"))
+        for months in HISTORIES:
+            organization_id = f"history_{months}"
+            store.apply(
+                [row for month in range(months) for row in month_rows(organization_id, month, rnd)]
+            )
+
+            # Each run stores the next month, moving the TTM window forward
+            timings = []
+            for month in range(months, months + REPEATS):
+                rows = month_rows(organization_id, month, rnd)
+                start = time.perf_counter()
+                store.apply(rows)
+                timings.append(time.perf_counter() - start)
+
+            print(f"history {months:5d} months: {min(timings) * 1000:6.2f} ms per new month")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Benchmark for bulk chart-of-accounts categorization.
+
+Compares categorizing accounts one at a time through ``Categorizer.match``
+against ``Categorizer.match_many`` on a columnar chart of accounts, and
+reports the throughput of each in accounts per second.
+
+Run from the backend directory:
+    python -m benchmarks.bench_categorizer
+"""
+
+import logging
+import random
+import time
+from typing import List, Optional, Tuple
+
+from app.utils.categorization import SECTION_CATEGORIES, Categorizer
+from benchmarks.synthetic import ACCOUNT_NAMES
+
+ACCOUNTS = 100_000
+REPEATS = 5
+
+
+def make_chart_of_accounts(
+    accounts: int = ACCOUNTS, seed: int = 0
+) -> Tuple[List[str], List[Optional[str]], List[str]]:
+    """
+    Build a columnar chart of accounts with distinct account names.
+
+    About half of the accounts have a code; some codes fall outside every
+    code range so their names decide the category.
+
+    Args:
+        accounts: Number of accounts.
+        seed: Random seed for reproducible charts.
+
+    Returns:
+        Tuple of the account names, codes and sections.
+    """
+    rnd = random.Random(seed)
+    sections = list(SECTION_CATEGORIES)
+    names, codes, account_sections = [], [], []
+    for i in range(accounts):
+        names.append(f"{rnd.choice(ACCOUNT_NAMES)} - {i}")
+        codes.append(str(rnd.randint(100, 12000)) if rnd.random() < 0.5 else None)
+        account_sections.append(rnd.choice(sections))
+    return names, codes, account_sections
+
+
+def per_account(categorizer: Categorizer, names, codes, sections) -> None:
+    """Categorize the accounts one call at a time."""
+    for name, code, section in zip(names, codes, sections):
+        categorizer.match(name, code, section)
+
+
+def bulk(categorizer: Categorizer, names, codes, sections) -> None:
+    """Categorize the accounts in one call."""
+    categorizer.match_many(names, codes, sections)
+
+
+def best_of(func, *args) -> float:
+    """Return the best wall-clock time of several runs, each with a cold memo."""
+    timings = []
+    for _ in range(REPEATS):
+        categorizer = Categorizer()
+        start = time.perf_counter()
+        func(categorizer, *args)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    logging.disable(logging.CRITICAL)
+
+    names, codes, sections = make_chart_of_accounts()
+
+    single = best_of(per_account, names, codes, sections)
+    batched = best_of(bulk, names, codes, sections)
+
+    print(f"accounts: {len(names)}")
+    print(f"per-account match: {single * 1000:8.1f} ms ({len(names) / single:10,.0f} accounts/s)")
+    print(f"bulk match_many:   {batched * 1000:8.1f} ms ({len(names) / batched:10,.0f} accounts/s)")
+    print(f"speedup:           {single / batched:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""
+Benchmark for the Excel reader engines available on this host.
+
+Times every installed engine that can read each workbook format and prints
+the fastest, which is what the ``EXCEL_ENGINE_BENCHMARK`` startup option
+selects. A synthetic .xlsx workbook is used unless samples are given; .xls is
+only timed when a sample is passed, since pandas cannot write legacy files.
+
+Run from the backend directory:
+    python -m benchmarks.bench_engines [--xlsx sample.xlsx] [--xls sample.xls]
+"""
+
+import argparse
+import logging
+
+from app.core.engines import benchmark_engines
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--xlsx", help="Sample .xlsx workbook")
+    parser.add_argument("--xls", help="Sample .xls workbook")
+    parser.add_argument("--repeats", type=int, default=3, help="Runs per engine")
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+
+    samples = {fmt: path for fmt, path in ((".xlsx", args.xlsx), (".xls", args.xls)) if path}
+    results = benchmark_engines(samples, repeats=args.repeats, apply=False)
+
+    for fmt, timings in results.items():
+        if not timings:
+            print(f"{fmt}: no engine available")
+            continue
+        fastest = min(timings, key=timings.get)
+        for engine, seconds in sorted(timings.items(), key=lambda item: item[1]):
+            print(f"{fmt:5} {engine:10} {seconds * 1000:8.1f} ms")
+        print(f"{fmt:5} fastest: {fastest} (set EXCEL_ENGINE_{fmt[1:].upper()}={fastest})")
+
+
+if __name__ == "__main__":
+    main()
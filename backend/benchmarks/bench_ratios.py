@@ -0,0 +1,84 @@
+"""
+Benchmark for the batch ratio engine.
+
+Compares computing the metrics of many entity-periods one report at a time
+through ``calculate_financial_metrics`` against a single
+``calculate_metrics_batch`` call over the same reports.
+
+Run from the backend directory:
+    python -m benchmarks.bench_ratios
+"""
+
+import logging
+import random
+import time
+from typing import Any, Dict, List
+
+from app.utils.ratios import calculate_financial_metrics, calculate_metrics_batch
+
+STATEMENTS = 500
+REPEATS = 5
+
+
+def make_reports(statements: int = STATEMENTS, seed: int = 0) -> List[Dict[str, Any]]:
+    """
+    Build analyzer-shaped reports with random section totals.
+
+    Args:
+        statements: Number of reports.
+        seed: Random seed for reproducible totals.
+
+    Returns:
+        List of profit and loss data dictionaries.
+    """
+    rnd = random.Random(seed)
+    reports = []
+    for _ in range(statements):
+        revenue = rnd.choice([0.0, rnd.uniform(1e4, 1e7)])
+        cogs = rnd.uniform(0, revenue)
+        opex = rnd.uniform(0, revenue)
+        reports.append(
+            {
+                "sections": {
+                    "tradingIncome": {"total": revenue},
+                    "costOfSales": {"total": cogs},
+                    "operatingExpenses": {"total": opex},
+                    "netProfit": revenue - cogs - opex,
+                }
+            }
+        )
+    return reports
+
+
+def best_of(func, *args) -> float:
+    """Return the best wall-clock time of several runs."""
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def per_report(reports: List[Dict[str, Any]]) -> None:
+    """Compute the metrics one report at a time."""
+    for report in reports:
+        calculate_financial_metrics(report)
+
+
+def main() -> None:
+    logging.disable(logging.CRITICAL)
+
+    reports = make_reports()
+
+    single = best_of(per_report, reports)
+    batched = best_of(calculate_metrics_batch, reports)
+
+    print(f"statements: {len(reports)}")
+    print(f"per-report metrics: {single * 1000:8.2f} ms")
+    print(f"batch metrics:      {batched * 1000:8.2f} ms")
+    print(f"speedup:            {single / batched:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Benchmark for the vectorized row-text index used by section detection.
+
+Compares the previous approach, where every stage rebuilt the joined row
+string with ``df.iloc[i]``, against a single IngestionContext shared by
+validation, header extraction, section detection and account extraction.
+
+Run from the backend directory:
+    python -m benchmarks.bench_row_index
+"""
+
+import logging
+import time
+
+import pandas as pd
+
+from app.core.analyzer import (
+    extract_company_and_period,
+    find_section_boundaries,
+    identify_basis_type,
+)
+from app.core.ingestion import IngestionContext
+from app.core.validation import ProfitLossExcelValidator
+from app.utils.keywords import SECTION_KEYWORDS, TOTAL_KEYWORDS
+from benchmarks.synthetic import make_general_ledger_pnl
+
+REPEATS = 5
+
+
+def row_string(df: pd.DataFrame, i: int) -> str:
+    """Join one row the way the pre-index code did."""
+    return " ".join(str(x) for x in df.iloc[i] if pd.notna(x)).lower()
+
+
+def legacy_row_scans(df: pd.DataFrame, validator: ProfitLossExcelValidator) -> None:
+    """Replay the per-stage row joins and keyword loops of the old pipeline."""
+    for i in range(min(20, len(df))):
+        row_str = row_string(df, i)
+        [k for k in validator.required_keywords if k in row_str]
+    for i in range(min(30, len(df))):
+        row_str = row_string(df, i)
+        for keywords in validator.section_keywords.values():
+            any(k in row_str for k in keywords)
+    for i in range(min(10, len(df))):
+        row_string(df, i)
+    for i in range(min(15, len(df))):
+        row_string(df, i)
+    for i in range(len(df)):
+        row_str = row_string(df, i)
+        for keywords in SECTION_KEYWORDS.values():
+            any(k in row_str for k in keywords)
+    for i in range(len(df)):
+        row_str = row_string(df, i)
+        any(k in row_str for k in ["total", "subtotal"])
+
+
+def indexed_row_scans(df: pd.DataFrame, validator: ProfitLossExcelValidator) -> None:
+    """Run the same stages against one shared ingestion context."""
+    context = IngestionContext.from_dataframe(df)
+    validator.validate_content(df, context)
+    extract_company_and_period(df, context)
+    identify_basis_type(df, context)
+    find_section_boundaries(df, context)
+    context.keyword_hits(TOTAL_KEYWORDS)
+
+
+def best_of(func, *args) -> float:
+    """Return the best wall-clock time of several runs."""
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    logging.disable(logging.CRITICAL)
+
+    df = make_general_ledger_pnl(rows=5000, periods=3)
+    # Skip the file existence check; only the keyword defaults are needed
+    validator = ProfitLossExcelValidator.model_construct(file_path="benchmark.xlsx")
+
+    legacy = best_of(legacy_row_scans, df, validator)
+    indexed = best_of(indexed_row_scans, df, validator)
+
+    print(f"rows: {len(df)}, columns: {len(df.columns)}")
+    print(f"legacy per-stage row joins: {legacy * 1000:8.1f} ms")
+    print(f"shared row-text index:      {indexed * 1000:8.1f} ms")
+    print(f"speedup:                    {legacy / indexed:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Synthetic profit and loss data for benchmarks.
+
+This module builds general-ledger-style P&L frames shaped like the output of
+``pd.read_excel`` on a Xero export, so benchmarks can run without fixtures.
+"""
+
+import random
+from typing import List, Optional
+
+import pandas as pd
+
+ACCOUNT_NAMES = [
+    "Sales",
+    "Service Revenue",
+    "Freight Inwards",
+    "Materials",
+    "Wages and Salaries",
+    "Rent",
+    "Software Subscriptions",
+    "Bank Fees",
+    "Travel - National",
+    "Office Supplies",
+    "Consulting",
+    "Telephone & Internet",
+]
+
+
+def make_general_ledger_pnl(rows: int = 5000, periods: int = 3, seed: int = 0) -> pd.DataFrame:
+    """
+    Build a general-ledger-style profit and loss frame.
+
+    Args:
+        rows: Approximate number of account rows across all sections.
+        periods: Number of value columns.
+        seed: Random seed for reproducible values.
+
+    Returns:
+        DataFrame laid out like a parsed Xero P&L export.
+    """
+    rnd = random.Random(seed)
+    width = 2 + periods
+
+    def row(*values) -> List[Optional[object]]:
+        cells: List[Optional[object]] = [None] * width
+        cells[: len(values)] = values
+        return cells
+
+    data = [
+        row("Demo Holdings Pty Ltd"),
+        row("For the year ended 30 June 2025"),
+        row("Accrual Basis"),
+        row(),
+        row("Account", "Code", *[f"Period {p + 1}" for p in range(periods)]),
+        row(),
+    ]
+
+    section_rows = rows // 3
+    sections = [
+        ("Trading Income", 4000),
+        ("Cost of Sales", 5000),
+        ("Operating Expenses", 6000),
+    ]
+    totals = {}
+    for title, base_code in sections:
+        data.append(row(title))
+        section_total = [0.0] * periods
+        for i in range(section_rows):
+            values = [round(rnd.uniform(-100, 10000), 2) for _ in range(periods)]
+            section_total = [t + v for t, v in zip(section_total, values)]
+            name = f"{rnd.choice(ACCOUNT_NAMES)} {i}"
+            data.append(row(name, str(base_code + i % 900), *values))
+        data.append(row(f"Total {title}", None, *[round(t, 2) for t in section_total]))
+        data.append(row())
+        totals[title] = section_total
+
+        if title == "Cost of Sales":
+            gross = [
+                round(a - b, 2)
+                for a, b in zip(totals["Trading Income"], totals["Cost of Sales"])
+            ]
+            data.append(row("Gross Profit", None, *gross))
+            data.append(row())
+
+    net = [
+        round(a - b - c, 2)
+        for a, b, c in zip(
+            totals["Trading Income"],
+            totals["Cost of Sales"],
+            totals["Operating Expenses"],
+        )
+    ]
+    data.append(row("Net Profit", None, *net))
+
+    columns = ["Profit and Loss"] + [f"Unnamed: {i}" for i in range(1, width)]
+    return pd.DataFrame(data, columns=columns)
@@ -1,8 +1,11 @@
+import asyncio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.routes import router
 from app.utils.logger import app_logger
 from app.core.config import settings
+from app.core.engines import benchmark_engines
+from app.core.executor import analysis_executor
 
 # Configure module-specific logger
 logger = app_logger.getChild('main')
@@ -63,6 +66,17 @@ app.openapi_security = {"JWT": []}
 # Include API routes
 app.include_router(router, prefix=settings.API_PREFIX)
 
+@app.on_event("startup")
+async def pick_excel_engines():
+    """Benchmark the installed Excel reader engines if enabled."""
+    if settings.EXCEL_ENGINE_BENCHMARK:
+        await asyncio.to_thread(benchmark_engines)
+
+@app.on_event("shutdown")
+async def shutdown_analysis_pool():
+    """Stop the analysis worker processes."""
+    analysis_executor.shutdown()
+
 @app.get("/")
 async def root():
     return {"message": "Welcome to the Profit & Loss Dashboard API"}
\ No newline at end of file
@@ -0,0 +1,144 @@
+"""
+Tests for the incrementally maintained metric aggregates.
+"""
+import random
+import sqlite3
+
+import pandas as pd
+import pytest
+
+from app.core.aggregates import AggregateStore, fiscal_year, is_additive
+from app.core.time_series import parse_period
+
+
+@pytest.fixture
+def store(tmp_path):
+    return AggregateStore(str(tmp_path / "aggregates.sqlite3"))
+
+
+def store_values(store, metric, values):
+    store.apply(
+        [
+            {"organization_id": "org", "period": period, "metric_name": metric, "metric_value": value}
+            for period, value in values
+        ]
+    )
+
+
+def test_restored_period_replaces_value(store):
+    store_values(store, "total_amount", [("Jan 2024", 10), ("Feb 2024", 20)])
+    store_values(store, "total_amount", [("2024-01", 15)])
+
+    aggregates = store.get("org")["metrics"]["total_amount"]
+    assert aggregates["ytd"]["monthly"]["2024"] == {"total": 35, "count": 2}
+    assert aggregates["ttm"] == {"endPeriod": "2024-02", "total": 35, "count": 2}
+
+
+def test_frequencies_are_aggregated_apart(store):
+    store_values(
+        store,
+        "total_amount",
+        [("Jan 2024", 10), ("Feb 2024", 10), ("Mar 2024", 10), ("Q1 2024", 30), ("FY2024", 30)],
+    )
+
+    ytd = store.get("org")["metrics"]["total_amount"]["ytd"]
+    assert ytd == {
+        "monthly": {"2024": {"total": 30, "count": 3}},
+        "quarterly": {"2024": {"total": 30, "count": 1}},
+        "annual": {"2024": {"total": 30, "count": 1}},
+    }
+
+
+def test_ratios_are_averaged(store):
+    store_values(store, "gross_margin", [("Jan 2024", 40), ("Feb 2024", 50)])
+    store_values(store, "gross_profit", [("Jan 2024", 400), ("Feb 2024", 500)])
+
+    metrics = store.get("org")["metrics"]
+    assert metrics["gross_margin"]["additive"] is False
+    assert metrics["gross_margin"]["ytd"]["monthly"]["2024"] == {"average": 45, "count": 2}
+    assert metrics["gross_margin"]["ttm"]["average"] == 45
+    assert metrics["gross_profit"]["additive"] is True
+    assert metrics["gross_profit"]["ytd"]["monthly"]["2024"] == {"total": 900, "count": 2}
+
+
+@pytest.mark.parametrize(
+    "metric, additive",
+    [
+        ("gross_profit", True),
+        ("net_margin", False),
+        ("current_ratio", False),
+        ("total_amount", True),
+        ("average_amount", False),
+    ],
+)
+def test_is_additive(metric, additive):
+    assert is_additive(metric) is additive
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_ttm_window_matches_recomputation(tmp_path, seed):
+    rnd = random.Random(seed)
+    start_month = rnd.choice([1, 4, 7])
+    store = AggregateStore(str(tmp_path / "aggregates.sqlite3"), start_month)
+    latest = {}
+    for _ in range(80):
+        month = pd.Period(year=rnd.randint(2020, 2024), month=rnd.randint(1, 12), freq="M")
+        label = rnd.choice([str(month), month.strftime("%b %Y")])
+        value = round(rnd.uniform(-100, 100), 2)
+        store_values(store, "total_amount", [(label, value)])
+        latest[month.ordinal] = value
+
+    aggregates = store.get("org")["metrics"]["total_amount"]
+    end = max(latest)
+    window = [value for ordinal, value in latest.items() if ordinal > end - 12]
+    assert aggregates["ttm"]["endPeriod"] == str(pd.Period(ordinal=end, freq="M"))
+    assert aggregates["ttm"]["total"] == pytest.approx(sum(window))
+    assert aggregates["ttm"]["count"] == len(window)
+
+    years = {}
+    for ordinal, value in latest.items():
+        year = fiscal_year(pd.Period(ordinal=ordinal, freq="M"), start_month)
+        total, count = years.get(year, (0.0, 0))
+        years[year] = (total + value, count + 1)
+    monthly = aggregates["ytd"]["monthly"]
+    assert set(monthly) == {str(year) for year in years}
+    for year, (total, count) in years.items():
+        assert monthly[str(year)]["total"] == pytest.approx(total)
+        assert monthly[str(year)]["count"] == count
+
+
+def test_labels_that_are_not_periods_are_skipped(store):
+    store_values(store, "total_amount", [("YTD", 100), ("Jan 2024", 10)])
+
+    assert store.get("org")["metrics"]["total_amount"]["ytd"]["monthly"]["2024"]["total"] == 10
+
+
+@pytest.mark.parametrize(
+    "label, start_month, year",
+    [("Jun 2024", 7, 2024), ("Jul 2024", 7, 2025), ("Q4 2024", 10, 2025), ("FY2024", 7, 2024)],
+)
+def test_fiscal_year(label, start_month, year):
+    assert fiscal_year(parse_period(label), start_month) == year
+
+
+def test_category_totals_replace_on_restore(store):
+    store.apply_categories("org", "Jan 2024", {"Revenue": 100.0})
+    store.apply_categories("org", "2024-01", {"Revenue": 120.0})
+    store.apply_categories("org", "Feb 2024", {"Revenue": 50.0})
+
+    assert store.get("org")["categories"] == {"Revenue": {"total": 170.0, "count": 2}}
+
+
+def test_older_schema_is_rebuilt(tmp_path):
+    path = str(tmp_path / "aggregates.sqlite3")
+    with sqlite3.connect(path) as conn:
+        conn.execute("CREATE TABLE aggregate_ytd (organization_id TEXT, metric_name TEXT, fiscal_year INTEGER)")
+        conn.execute("CREATE TABLE aggregate_organizations (organization_id TEXT PRIMARY KEY, seeded_at REAL)")
+        conn.execute("INSERT INTO aggregate_organizations VALUES ('org', 0)")
+        conn.execute("PRAGMA user_version = 1")
+
+    store = AggregateStore(path)
+
+    assert not store.is_seeded("org")
+    store_values(store, "total_amount", [("Jan 2024", 10)])
+    assert store.get("org")["metrics"]["total_amount"]["ytd"]["monthly"]["2024"]["total"] == 10
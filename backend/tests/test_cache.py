@@ -0,0 +1,106 @@
+"""
+Tests for the analysis result cache and how cached results are returned.
+"""
+import asyncio
+import hashlib
+import os
+import time
+
+import pytest
+
+from app.api.endpoints import upload
+from app.core import cache
+from app.core.cache import ResultCache, content_key, digest_key
+from app.core.uploads import UploadedWorkbook
+
+
+def result(source="first.xlsx", upload_date="2020-01-01"):
+    return {
+        "companyName": "Acme",
+        "sections": {"netProfit": 10.0},
+        "metadata": {"uploadDate": upload_date, "source": source, "currency": "USD"},
+    }
+
+
+def test_key_depends_on_content_and_options():
+    digest = hashlib.sha256(b"workbook").hexdigest()
+
+    assert content_key(b"workbook") == digest_key(digest)
+    assert content_key(b"workbook", multi_period=True) == digest_key(digest, multi_period=True)
+    assert content_key(b"workbook", a=1, b=2) == content_key(b"workbook", b=2, a=1)
+    assert content_key(b"workbook", multi_period=True) != content_key(b"workbook")
+    assert content_key(b"workbook", rules="x") != content_key(b"workbook", rules="y")
+    assert content_key(b"other") != content_key(b"workbook")
+
+
+def test_key_depends_on_versions(monkeypatch):
+    before = content_key(b"workbook")
+    monkeypatch.setattr(cache, "ANALYZER_VERSION", "changed")
+
+    assert content_key(b"workbook") != before
+
+
+@pytest.mark.parametrize("tiered", [False, True])
+def test_results_are_copied(tmp_path, tiered):
+    store = ResultCache(cache_dir=str(tmp_path) if tiered else None)
+    stored = result()
+    store.set("key", stored)
+
+    stored["sections"]["netProfit"] = 0.0
+    returned = store.get("key")
+    assert returned["sections"]["netProfit"] == 10.0
+
+    returned["metadata"]["source"] = "changed.xlsx"
+    assert store.get("key")["metadata"]["source"] == "first.xlsx"
+
+
+def test_memory_entries_expire(monkeypatch):
+    store = ResultCache(ttl_seconds=60)
+    store.set("key", result())
+    now = time.time()
+
+    monkeypatch.setattr(cache.time, "time", lambda: now + 59)
+    assert store.get("key") is not None
+    monkeypatch.setattr(cache.time, "time", lambda: now + 61)
+    assert store.get("key") is None
+
+
+def test_disk_tier_survives_restart_until_expiry(tmp_path):
+    ResultCache(cache_dir=str(tmp_path)).set("key", result())
+
+    assert ResultCache(cache_dir=str(tmp_path)).get("key") == result()
+
+    path = tmp_path / "key.json"
+    stale = time.time() - 120
+    os.utime(path, (stale, stale))
+    assert ResultCache(ttl_seconds=60, cache_dir=str(tmp_path)).get("key") is None
+    assert not path.exists()
+
+
+def test_lru_evicts_oldest():
+    store = ResultCache(max_entries=2)
+    for key in ("a", "b", "c"):
+        store.set(key, result())
+
+    assert store.get("a") is None
+    assert store.get("c") is not None
+
+
+def test_cache_hit_carries_this_upload_metadata(monkeypatch):
+    store = ResultCache()
+    monkeypatch.setattr(upload, "result_cache", store)
+    workbook = UploadedWorkbook("second.xlsx", hashlib.sha256(b"workbook").hexdigest(), 8, content=b"workbook")
+    key = digest_key(
+        workbook.digest,
+        multi_period=False,
+        rules=upload.validation_rule_sets.digest_for(None),
+        mappings=None,
+    )
+    store.set(key, result())
+
+    returned = asyncio.run(upload.analyze_upload(workbook))
+
+    assert returned["metadata"]["source"] == "second.xlsx"
+    assert returned["metadata"]["uploadDate"] == time.strftime("%Y-%m-%d")
+    assert returned["metadata"]["currency"] == "USD"
+    assert store.get(key)["metadata"]["source"] == "first.xlsx"
@@ -0,0 +1,74 @@
+"""
+Tests for account categorization.
+"""
+import random
+
+import numpy as np
+import pytest
+
+from app.utils.categorization import (
+    CODE_RANGES,
+    MAX_CODE_DIGITS,
+    Categorizer,
+    normalize_code,
+)
+
+NAMES = ["Sales", "Rent", "Wages and Salaries", "Bank Fees", "Purchases", "Sundry", ""]
+SECTIONS = ["tradingIncome", "costOfSales", "operatingExpenses", "other"]
+
+
+def random_code(rnd: random.Random):
+    """Draw an account code of any of the forms the API and analyzer may pass."""
+    kind = rnd.randrange(8)
+    if kind == 0:
+        return None
+    if kind == 1:
+        return rnd.randint(0, 99999)
+    if kind == 2:
+        return str(rnd.randint(0, 99999))
+    if kind == 3:
+        return f"{rnd.randint(0, 9)}-{rnd.randint(0, 999):03d}"
+    if kind == 4:
+        return rnd.choice(["", "abc", "  ", "x-y"])
+    if kind == 5:
+        return "9" * rnd.randint(MAX_CODE_DIGITS - 1, MAX_CODE_DIGITS + 5)
+    if kind == 6:
+        return int("1" * rnd.randint(MAX_CODE_DIGITS - 1, MAX_CODE_DIGITS + 5))
+    return rnd.choice([np.int64(rnd.randint(0, 99999)), 4000.0, True])
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_match_many_agrees_with_match(seed):
+    rnd = random.Random(seed)
+    count = 1000
+    names = [rnd.choice(NAMES) for _ in range(count)]
+    codes = [random_code(rnd) for _ in range(count)]
+    sections = [rnd.choice(SECTIONS) for _ in range(count)]
+    categorizer = Categorizer()
+
+    categories, rules = categorizer.match_many(names, codes, sections)
+
+    expected = [categorizer.match(n, c, s) for n, c, s in zip(names, codes, sections)]
+    assert categories == [match.category for match in expected]
+    assert rules == [match.rule for match in expected]
+
+
+def test_match_many_agrees_with_match_on_unbounded_ranges():
+    ranges = {(-(10 ** 30), -1): "Negative", (0, 999): "Low", (10 ** 17, 10 ** 30): "Huge"}
+    categorizer = Categorizer(code_ranges=ranges)
+    codes = [5, "5", -5, 10 ** 17, str(10 ** 17), "9" * MAX_CODE_DIGITS, 10 ** 25, None]
+    names = ["Sundry"] * len(codes)
+    sections = ["other"] * len(codes)
+
+    categories, _ = categorizer.match_many(names, codes, sections)
+
+    assert categories == [categorizer.categorize(n, c, s) for n, c, s in zip(names, codes, sections)]
+
+
+def test_integer_and_string_codes_normalize_alike():
+    start, end = next(iter(CODE_RANGES))
+    assert normalize_code(start) == normalize_code(str(start)) == start
+    assert normalize_code("4-000") == 4000
+    assert normalize_code(True) is None
+    assert normalize_code(4000.0) is None
+    assert normalize_code("9" * (MAX_CODE_DIGITS + 1)) is None
@@ -0,0 +1,105 @@
+"""
+Tests for the bounded analysis executor and how its failures reach the API.
+"""
+import asyncio
+import os
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.endpoints import upload
+from app.core.executor import AnalysisExecutor, AnalysisQueueFullError, AnalysisTimeoutError
+
+
+def slow_analysis(*args, **kwargs):
+    time.sleep(1)
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(upload.router)
+    return TestClient(app)
+
+
+def post_workbook(client):
+    # Fresh bytes each time, so the result cache never answers
+    content = os.urandom(64)
+    return client.post("/", files=[("file", ("report.xlsx", content, "application/octet-stream"))])
+
+
+def test_queue_full_returns_503(client, monkeypatch):
+    executor = AnalysisExecutor(workers=0, queue_size=0)
+    monkeypatch.setattr(upload, "analysis_executor", executor)
+    # Occupy the only slot
+    executor._slots.acquire()
+
+    response = post_workbook(client)
+
+    assert response.status_code == 503
+
+
+def test_timeout_returns_504(client, monkeypatch):
+    executor = AnalysisExecutor(workers=0, queue_size=0, timeout_seconds=0.1)
+    monkeypatch.setattr(upload, "analysis_executor", executor)
+    monkeypatch.setattr(upload, "analyze_profit_loss", slow_analysis)
+
+    response = post_workbook(client)
+
+    assert response.status_code == 504
+    executor.shutdown()
+
+
+def test_timed_out_job_frees_its_slot_once_its_worker_is_terminated():
+    async def scenario():
+        executor = AnalysisExecutor(workers=1, queue_size=0, timeout_seconds=0.5)
+        try:
+            assert await executor.run(pow, 2, 5) == 32
+            with pytest.raises(AnalysisTimeoutError):
+                await executor.run(time.sleep, 60)
+
+            # The only slot is free again once the stuck worker is terminated
+            deadline = time.monotonic() + 10
+            while True:
+                try:
+                    return await executor.run(pow, 3, 3)
+                except AnalysisQueueFullError:
+                    if time.monotonic() > deadline:
+                        raise
+                    await asyncio.sleep(0.05)
+        finally:
+            executor.shutdown()
+
+    started = time.monotonic()
+    assert asyncio.run(scenario()) == 27
+    assert time.monotonic() - started < 30
+
+
+def test_jobs_finishing_after_a_timeout_run_to_completion():
+    async def scenario():
+        executor = AnalysisExecutor(workers=2, queue_size=1, timeout_seconds=4)
+        try:
+            # Start both workers, which are spawned on demand
+            await asyncio.gather(
+                executor.run(_sleep_and_return, 0.5, None), executor.run(_sleep_and_return, 0.5, None)
+            )
+            stuck = asyncio.ensure_future(executor.run(time.sleep, 60))
+            await asyncio.sleep(3)
+            # Still running when the stuck job times out
+            other = asyncio.ensure_future(executor.run(_sleep_and_return, 1.5, "done"))
+            with pytest.raises(AnalysisTimeoutError):
+                await stuck
+            # New jobs go to a fresh pool while the retired one finishes its work
+            fresh = await executor.run(pow, 2, 3)
+            return await other, fresh
+        finally:
+            executor.shutdown()
+
+    assert asyncio.run(scenario()) == ("done", 8)
+
+
+def _sleep_and_return(seconds, value):
+    time.sleep(seconds)
+    return value
@@ -0,0 +1,68 @@
+"""
+Tests for the upload job store.
+"""
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.endpoints import upload
+from app.core.jobs import JOB_COMPLETED, JOB_FAILED, JOB_QUEUED, JOB_RUNNING, JobStore
+
+
+def age(store, job_id, seconds):
+    with store._connect() as conn:
+        conn.execute("UPDATE upload_jobs SET created_at = created_at - ? WHERE id = ?", (seconds, job_id))
+
+
+@pytest.fixture
+def store(tmp_path):
+    return JobStore(str(tmp_path / "jobs.sqlite3"), deadline_seconds=60)
+
+
+@pytest.mark.parametrize("status", [JOB_QUEUED, JOB_RUNNING])
+def test_unfinished_job_fails_past_deadline(store, status):
+    job_id = store.create("report.xlsx")
+    store.update(job_id, status=status)
+
+    assert store.get(job_id)["status"] == status
+    age(store, job_id, 61)
+
+    job = store.get(job_id)
+    assert job["status"] == JOB_FAILED
+    assert job["status_code"] == 500
+    assert store.get(job_id)["status"] == JOB_FAILED
+
+
+def test_finished_job_is_kept_past_deadline(store):
+    job_id = store.create("report.xlsx")
+    store.update(job_id, status=JOB_COMPLETED, result={"ok": True}, status_code=200)
+    age(store, job_id, 61)
+
+    job = store.get(job_id)
+    assert job["status"] == JOB_COMPLETED
+    assert job["result"] == {"ok": True}
+
+
+def test_no_deadline_waits_indefinitely(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    job_id = store.create("report.xlsx")
+    age(store, job_id, 10 ** 6)
+
+    assert store.get(job_id)["status"] == JOB_QUEUED
+
+
+def test_event_stream_ends_for_abandoned_job(store, monkeypatch):
+    monkeypatch.setattr(upload, "job_store", store)
+    app = FastAPI()
+    app.include_router(upload.router)
+    job_id = store.create("report.xlsx")
+    store.update(job_id, status=JOB_RUNNING, stage="parse")
+    age(store, job_id, 61)
+
+    started = time.monotonic()
+    response = TestClient(app).get(f"/jobs/{job_id}/events")
+
+    assert time.monotonic() - started < 5
+    assert "event: failed" in response.text
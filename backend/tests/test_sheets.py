@@ -0,0 +1,83 @@
+"""
+Tests for finding the profit and loss sheets of a workbook.
+"""
+import json
+
+import openpyxl
+import pytest
+
+from app.core import sheets
+from app.core.validation import ValidationRuleSets
+
+
+def write_workbook(path):
+    """Write a report sheet, a notes sheet mentioning a loss and a ledger without P&L keywords."""
+    contents = {
+        "Entity A": [
+            ["Profit and Loss", "Amount"],
+            ["Trading Income", None],
+            ["Sales", 100.0],
+            ["Cost of Sales", None],
+            ["Purchases", 40.0],
+            ["Operating Expenses", None],
+            ["Rent", 10.0],
+            ["Net Profit", 50.0],
+        ],
+        "Notes": [["Notes", None], ["An impairment loss was reversed in March.", None]],
+        "Ledger": [["Account", "Amount"], ["Ledger summary", None], ["Wages", 20.0], ["Overhead", 5.0]],
+    }
+    workbook = openpyxl.Workbook()
+    workbook.remove(workbook.active)
+    for title, rows in contents.items():
+        sheet = workbook.create_sheet(title)
+        for row in rows:
+            sheet.append(row)
+    workbook.save(path)
+    return str(path)
+
+
+@pytest.fixture
+def rule_sets(tmp_path, monkeypatch):
+    path = tmp_path / "rules.json"
+    path.write_text(
+        json.dumps(
+            {
+                "organizations": {
+                    "ledger-org": {"options": {"required_keywords": ["ledger"]}},
+                    "lenient-org": {"rules": {"section_keywords": {"enabled": False}}},
+                }
+            }
+        )
+    )
+    rule_sets = ValidationRuleSets(str(path))
+    monkeypatch.setattr(sheets, "validation_rule_sets", rule_sets)
+    return rule_sets
+
+
+def test_default_rules_pick_report_sheets(tmp_path, rule_sets):
+    path = write_workbook(tmp_path / "book.xlsx")
+
+    assert sheets.find_profit_loss_sheets(path) == ["Entity A"]
+
+
+def test_organization_required_keywords_apply(tmp_path, rule_sets):
+    path = write_workbook(tmp_path / "book.xlsx")
+
+    assert sheets.find_profit_loss_sheets(path, organization_id="ledger-org") == ["Ledger"]
+
+
+def test_disabled_section_rule_no_longer_required(tmp_path, rule_sets):
+    path = write_workbook(tmp_path / "book.xlsx")
+
+    assert sheets.find_profit_loss_sheets(path, organization_id="lenient-org") == ["Entity A", "Notes"]
+
+
+def test_analyze_sheets_reports_failures_as_messages(tmp_path, rule_sets):
+    path = write_workbook(tmp_path / "book.xlsx")
+
+    results = sheets.analyze_sheets(path)
+
+    assert [result["sheetName"] for result in results] == ["Entity A"]
+    # Too few rows for the validator's minimum
+    assert "data" not in results[0]
+    assert "validation failed" in results[0]["error"]
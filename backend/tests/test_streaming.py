@@ -0,0 +1,100 @@
+"""
+Tests for the streaming analysis of .xlsx workbooks against the in-memory path.
+"""
+import json
+import re
+import zipfile
+from pathlib import Path
+
+import openpyxl
+import pytest
+
+from app.core import streaming
+from app.core.analyzer import analyze_profit_loss
+
+SAMPLE_WORKBOOK = Path(__file__).resolve().parents[2] / "frontend" / "public" / "Sample_Profit_and_Loss_Report.xlsx"
+
+
+def write_statement(path, accounts_per_section=30, trailing=True, extra_columns=0):
+    """Write a profit and loss statement with coded accounts in three sections."""
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.append(["Acme Trading Ltd"])
+    sheet.append(["Profit and Loss"])
+    sheet.append(["For the month ended 31 January 2024"])
+    sheet.append(["Account", "Code", "Jan 2024"])
+    sections = [("Trading Income", 4000), ("Cost of Sales", 5000), ("Operating Expenses", 6000)]
+    for number, (section, base) in enumerate(sections):
+        sheet.append([section])
+        for i in range(accounts_per_section):
+            sheet.append([f"{section} account {i}", str(base + i), round(100 + i * 1.25, 2)] + [None] * extra_columns)
+        sheet.append([f"Total {section}", None, round(accounts_per_section * 100.0, 2)])
+        if number == 1:
+            sheet.append(["Gross Profit", None, 1234.5])
+    if not trailing:
+        sheet.append(["Net Profit", None, 999.0])
+    workbook.save(path)
+    return str(path)
+
+
+def comparable(result):
+    result = json.loads(json.dumps(result, default=str))
+    result["metadata"].pop("engine", None)
+    return result
+
+
+def assert_parity(path):
+    expected = comparable(analyze_profit_loss(path, streaming=False))
+    assert comparable(analyze_profit_loss(path, streaming=True)) == expected
+    return expected
+
+
+def test_sample_workbook_parity():
+    if not SAMPLE_WORKBOOK.exists():
+        pytest.skip("sample workbook not available")
+    assert_parity(str(SAMPLE_WORKBOOK))
+
+
+@pytest.mark.parametrize("trailing", [True, False])
+def test_statement_parity(tmp_path, trailing):
+    assert_parity(write_statement(tmp_path / "statement.xlsx", trailing=trailing))
+
+
+@pytest.mark.parametrize("window", [21, 25, 97])
+@pytest.mark.parametrize("trailing", [True, False])
+def test_section_window_flush_parity(tmp_path, monkeypatch, window, trailing):
+    path = write_statement(tmp_path / "statement.xlsx", accounts_per_section=150, trailing=trailing)
+    flushes = []
+    flush = streaming.StreamingProfitLossReader._flush_section
+    monkeypatch.setattr(streaming, "SECTION_WINDOW_ROWS", window)
+    monkeypatch.setattr(
+        streaming.StreamingProfitLossReader,
+        "_flush_section",
+        lambda self, section: flushes.append(section.name) or flush(self, section),
+    )
+
+    assert_parity(path)
+    assert flushes
+
+
+def test_wrong_dimension_is_ignored(tmp_path):
+    source = write_statement(tmp_path / "statement.xlsx")
+    target = tmp_path / "dimension.xlsx"
+    with zipfile.ZipFile(source) as zin, zipfile.ZipFile(target, "w", zipfile.ZIP_DEFLATED) as zout:
+        for item in zin.infolist():
+            data = zin.read(item.filename)
+            if item.filename.startswith("xl/worksheets/"):
+                data = re.sub(rb"<dimension ref=\"[^\"]*\"\s*/>", b'<dimension ref="A1"/>', data)
+            zout.writestr(item, data)
+
+    result = assert_parity(str(target))
+    assert len(result["sections"]["tradingIncome"]["accounts"]) == 30
+
+
+def test_rows_wider_than_header(tmp_path):
+    path = write_statement(tmp_path / "statement.xlsx")
+    workbook = openpyxl.load_workbook(path)
+    workbook.active.cell(row=10, column=6, value="note")
+    workbook.save(path)
+
+    assert_parity(path)
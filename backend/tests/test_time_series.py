@@ -0,0 +1,123 @@
+"""
+Tests for period label parsing and time-series analytics.
+"""
+import pandas as pd
+import pytest
+
+from app.core.time_series import compute_time_series_analytics, parse_period
+
+
+def row(period, value, metric="revenue", created_at=0):
+    return {"period": period, "metric_name": metric, "metric_value": value, "created_at": created_at}
+
+
+@pytest.mark.parametrize(
+    "label, expected",
+    [
+        ("Jan 2024", "2024-01"),
+        ("January 2024", "2024-01"),
+        ("Jan-24", "2024-01"),
+        ("2024-01", "2024-01"),
+        ("01/2024", "2024-01"),
+        ("31/05/2025", "2025-05"),
+        ("For the month ended May 31, 2025", "2025-05"),
+        ("Q1 2024", "2024Q1"),
+        ("2024 Q1", "2024Q1"),
+        ("q3 fy24", "2024Q3"),
+        ("FY2024", "2024"),
+        ("FY2023/24", "2024"),
+        ("2024", "2024"),
+    ],
+)
+def test_parse_period(label, expected):
+    assert str(parse_period(label)) == expected
+
+
+@pytest.mark.parametrize("label", ["YTD", "Total", "13/2024", ""])
+def test_labels_that_are_not_periods(label):
+    assert parse_period(label) is None
+
+
+def test_quarter_and_year_frequencies():
+    assert parse_period("Q2 2024") == pd.Period(year=2024, quarter=2, freq="Q")
+    assert parse_period("FY2024") == pd.Period(year=2024, freq="Y")
+
+
+def test_periods_are_ordered_by_calendar():
+    result = compute_time_series_analytics(
+        [row("Mar 2024", 99.0), row("Jan 2024", 100.0), row("Feb 2024", 110.0), row("YTD", 309.0)]
+    )
+
+    assert result["periods"] == ["2024-01", "2024-02", "2024-03"]
+    assert result["frequency"] == "monthly"
+    assert result["unparsedPeriods"] == ["YTD"]
+    revenue = result["metrics"]["revenue"]
+    assert revenue["values"] == [100.0, 110.0, 99.0]
+    assert revenue["momGrowth"] == pytest.approx([None, 10.0, -10.0])
+
+
+def test_growth_compares_calendar_periods():
+    result = compute_time_series_analytics(
+        [row("Jan 2023", 80.0), row("Jan 2024", 100.0), row("Mar 2024", 90.0)]
+    )
+
+    revenue = result["metrics"]["revenue"]
+    # February is missing, so March has no month-over-month growth
+    assert revenue["momGrowth"] == [None, None, None]
+    assert revenue["yoyGrowth"] == pytest.approx([None, 25.0, None])
+
+
+def test_growth_from_a_negative_value():
+    result = compute_time_series_analytics([row("FY2023", -100.0), row("FY2024", -50.0)])
+
+    assert result["metrics"]["revenue"]["yoyGrowth"] == pytest.approx([None, 50.0])
+
+
+def test_annual_cagr_and_volatility():
+    result = compute_time_series_analytics(
+        [row("FY2020", 100.0), row("FY2022", 144.0), row("FY2021", 110.0)]
+    )
+
+    revenue = result["metrics"]["revenue"]
+    assert result["frequency"] == "annual"
+    assert revenue["yoyGrowth"] == pytest.approx([None, 10.0, 340 / 11])
+    assert revenue["cagr"] == pytest.approx(20.0)
+    # Sample standard deviation of the two growth rates
+    assert revenue["volatility"] == pytest.approx((340 / 11 - 10) / 2 ** 0.5)
+    assert revenue["rollingMean"] == pytest.approx([None, None, 118.0])
+
+
+def test_cagr_annualizes_the_span_in_months():
+    result = compute_time_series_analytics([row("Jan 2023", 80.0), row("Mar 2024", 90.0)])
+
+    assert result["metrics"]["revenue"]["cagr"] == pytest.approx(((90 / 80) ** (12 / 14) - 1) * 100)
+
+
+@pytest.mark.parametrize(
+    "rows",
+    [
+        # Less than a year apart
+        [row("Jan 2024", 100.0), row("Jun 2024", 200.0)],
+        # No growth compounds from a loss
+        [row("FY2020", -100.0), row("FY2022", 121.0)],
+        [row("FY2020", 0.0), row("FY2022", 121.0)],
+        [row("FY2022", 121.0)],
+    ],
+)
+def test_cagr_undefined(rows):
+    assert compute_time_series_analytics(rows)["metrics"]["revenue"]["cagr"] is None
+
+
+def test_mixed_frequencies_compare_month_ends():
+    result = compute_time_series_analytics([row("Q1 2024", 300.0), row("Apr 2024", 110.0)])
+
+    assert result["frequency"] == "monthly"
+    assert result["periods"] == ["2024-03", "2024-04"]
+
+
+def test_latest_stored_value_wins():
+    result = compute_time_series_analytics(
+        [row("Jan 2024", 120.0, created_at=2), row("Jan 2024", 100.0, created_at=1)]
+    )
+
+    assert result["metrics"]["revenue"]["values"] == [120.0]
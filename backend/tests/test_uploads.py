@@ -0,0 +1,153 @@
+"""
+Tests for receiving uploaded workbooks and releasing them after analysis.
+"""
+import hashlib
+import io
+import os
+import zipfile
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.endpoints import upload
+from app.core.config import settings
+from app.core.uploads import ArchiveLimitError, UploadedWorkbook, _WorkbookSpooler, extract_workbooks
+
+
+def archive(members):
+    """Build an in-memory ZIP archive upload from a mapping of member names to bytes."""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zf:
+        for name, data in members.items():
+            zf.writestr(name, data)
+    content = buffer.getvalue()
+    return UploadedWorkbook("batch.zip", hashlib.sha256(content).hexdigest(), len(content), content=content)
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(upload.router)
+    return TestClient(app)
+
+
+def test_extract_skips_non_workbooks():
+    workbooks = extract_workbooks(
+        archive(
+            {
+                "north/report.xlsx": b"north",
+                "south.xls": b"south",
+                "readme.txt": b"text",
+                "~$report.xlsx": b"lock",
+                ".hidden.xlsx": b"hidden",
+                "__MACOSX/._report.xlsx": b"metadata",
+            }
+        )
+    )
+
+    assert [(w.filename, w.content, w.size) for w in workbooks] == [
+        ("north/report.xlsx", b"north", 5),
+        ("south.xls", b"south", 5),
+    ]
+    assert workbooks[0].digest == hashlib.sha256(b"north").hexdigest()
+
+
+def test_extract_spools_large_members_to_disk():
+    [workbook] = extract_workbooks(archive({"report.xlsx": b"x" * 100}), memory_limit=10)
+
+    assert workbook.content is None
+    assert os.path.basename(workbook.path) == "report.xlsx"
+    with open(workbook.path, "rb") as f:
+        assert f.read() == b"x" * 100
+    directory = os.path.dirname(workbook.path)
+    workbook.close()
+    assert not os.path.exists(directory)
+
+
+@pytest.mark.parametrize(
+    "limits",
+    [{"max_files": 2}, {"max_files": 0}, {"max_bytes": 29}, {"max_bytes": -1}],
+)
+def test_extract_rejects_archives_over_the_limits(limits):
+    members = {f"report{i}.xlsx": b"x" * 10 for i in range(3)}
+
+    with pytest.raises(ArchiveLimitError):
+        extract_workbooks(archive(members), **limits)
+
+
+def test_extract_accepts_archives_at_the_limits():
+    members = {f"report{i}.xlsx": b"x" * 10 for i in range(3)}
+
+    assert len(extract_workbooks(archive(members), max_files=3, max_bytes=30)) == 3
+
+
+def test_member_growing_past_its_declared_size_is_rejected():
+    spooler = _WorkbookSpooler("report.xlsx", memory_limit=4, max_size=8)
+    spooler.write(b"x" * 6)
+    path = spooler.path
+
+    with pytest.raises(ArchiveLimitError):
+        spooler.write(b"x" * 3)
+    spooler.abort()
+    assert not os.path.exists(os.path.dirname(path))
+
+
+@pytest.mark.parametrize("setting, value", [("BATCH_MAX_FILES", 2), ("BATCH_MAX_EXTRACTED_MB", 0)])
+def test_batch_rejects_archives_over_the_limits(client, monkeypatch, setting, value):
+    monkeypatch.setattr(settings, setting, value)
+    members = {f"report{i}.xlsx": b"x" * 10 for i in range(3)}
+
+    response = client.post(
+        "/batch", files=[("files", ("batch.zip", archive(members).content, "application/zip"))]
+    )
+
+    assert response.status_code == 400
+    assert "batch.zip" in response.json()["detail"]
+
+
+def test_batch_limits_count_earlier_files(client, monkeypatch):
+    monkeypatch.setattr(settings, "BATCH_MAX_FILES", 3)
+    members = {f"report{i}.xlsx": b"x" * 10 for i in range(2)}
+
+    response = client.post(
+        "/batch",
+        files=[
+            ("files", ("first.xlsx", b"x" * 10, "application/octet-stream")),
+            ("files", ("second.xlsx", b"x" * 10, "application/octet-stream")),
+            ("files", ("batch.zip", archive(members).content, "application/zip")),
+        ],
+    )
+
+    assert response.status_code == 400
+    assert "more than the 1 still allowed" in response.json()["detail"]
+
+
+def test_failed_balance_sheet_releases_spooled_report(client, monkeypatch):
+    monkeypatch.setattr(settings, "UPLOAD_MEMORY_LIMIT_MB", 0)
+    received = []
+    receive_upload = upload.receive_upload
+
+    async def failing_balance_sheet(file):
+        if file.filename == "balance.xlsx":
+            raise OSError("disk full")
+        workbook = await receive_upload(file)
+        received.append((workbook, workbook.path))
+        return workbook
+
+    monkeypatch.setattr(upload, "receive_upload", failing_balance_sheet)
+    client = TestClient(client.app, raise_server_exceptions=False)
+
+    response = client.post(
+        "/",
+        files=[
+            ("file", ("report.xlsx", b"report bytes", "application/octet-stream")),
+            ("balance_sheet", ("balance.xlsx", b"balance bytes", "application/octet-stream")),
+        ],
+    )
+
+    assert response.status_code == 500
+    [(workbook, path)] = received
+    assert path is not None
+    assert workbook.path is None
+    assert not os.path.exists(os.path.dirname(path))
@@ -0,0 +1,120 @@
+"""
+Tests for the validation rule registry and per-organization rule sets.
+"""
+import json
+
+import pandas as pd
+import pytest
+
+from app.core.ingestion import IngestionContext
+from app.core.validation import (
+    SEVERITY_WARNING,
+    VALIDATION_RULES,
+    ProfitLossExcelValidator,
+    RuleOverride,
+    ValidationRuleSets,
+)
+
+
+def statement_context(rows=15, keywords=True):
+    """Build the context of a small statement, with or without P&L keywords."""
+    labels = ["Profit and Loss", "Revenue", "Cost of Sales", "Operating Expenses", "Net Profit"]
+    data = []
+    for i in range(rows):
+        label = labels[i % len(labels)] if keywords else f"Line {i}"
+        data.append([label, float(i * 10)])
+    return IngestionContext.from_dataframe(pd.DataFrame(data))
+
+
+def validator(**options):
+    return ProfitLossExcelValidator(file_path="report.xlsx", in_memory=True, **options)
+
+
+def test_rules_run_cheapest_first():
+    result = validator().validate(statement_context())
+
+    assert result.is_valid
+    expected = sorted(VALIDATION_RULES, key=lambda name: VALIDATION_RULES[name].cost)
+    assert list(result.timings) == expected
+
+
+def test_cost_override_changes_order():
+    rules = {"numeric_data": RuleOverride(cost=0)}
+
+    names = [rule.name for rule in validator(rules=rules).active_rules()]
+
+    assert names[0] == "numeric_data"
+
+
+def test_fatal_rule_stops_validation():
+    result = validator(min_rows=100).validate(statement_context())
+
+    assert not result.is_valid
+    assert list(result.timings) == ["dimensions"]
+    assert len(result.errors) == 1
+
+
+def test_severity_override_turns_failure_into_warning():
+    rules = {"required_keywords": RuleOverride(severity=SEVERITY_WARNING)}
+
+    result = validator(rules=rules).validate(statement_context(keywords=False))
+
+    assert "required_keywords" in result.timings
+    assert "numeric_data" in result.timings
+    assert any("required keywords" in warning for warning in result.warnings)
+    assert not any("required keywords" in error for error in result.errors)
+
+
+def test_disabled_rule_does_not_run():
+    rules = {"required_keywords": RuleOverride(enabled=False)}
+
+    result = validator(rules=rules).validate(statement_context(keywords=False))
+
+    assert "required_keywords" not in result.timings
+
+
+@pytest.fixture
+def rules_file(tmp_path):
+    path = tmp_path / "rules.json"
+    path.write_text(
+        json.dumps(
+            {
+                "default": {"rules": {"empty_cells": {"severity": "warning"}}},
+                "organizations": {
+                    "org": {
+                        "rules": {"section_keywords": {"enabled": False}, "unknown": {}},
+                        "options": {"min_rows": 5, "not_an_option": 1},
+                    }
+                },
+            }
+        )
+    )
+    return path
+
+
+def test_organization_rules_merge_over_default(rules_file):
+    rule_sets = ValidationRuleSets(str(rules_file))
+
+    config = rule_sets.config_for("org")
+
+    assert config.rules["empty_cells"].severity == SEVERITY_WARNING
+    assert config.rules["section_keywords"].enabled is False
+    assert "unknown" not in config.rules
+    assert config.options == {"min_rows": 5}
+    assert rule_sets.name_for("other") == "default"
+    assert rule_sets.config_for("other") is rule_sets.default
+
+
+def test_digest_follows_rule_contents(rules_file):
+    rule_sets = ValidationRuleSets(str(rules_file))
+    before = rule_sets.digest_for("org")
+    assert rule_sets.digest_for("org") == before
+    assert rule_sets.digest_for(None) != before
+
+    data = json.loads(rules_file.read_text())
+    data["organizations"]["org"]["options"]["min_rows"] = 6
+    rules_file.write_text(json.dumps(data))
+
+    assert ValidationRuleSets(str(rules_file)).digest_for("org") != before
+    rule_sets.load()
+    assert rule_sets.digest_for("org") != before